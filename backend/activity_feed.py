@@ -0,0 +1,142 @@
+# backend/activity_feed.py
+"""Keyset-paginated activity feeds for the admin and owner dashboards.
+
+Feeds are ordered newest first on (timestamp, id), so a page is one index
+range scan no matter how deep the client has paged. Cursors are opaque
+strings "<iso timestamp>_<id>":
+
+  ?limit=N            newest N (capped at max_limit)
+  ?cursor=C           the page older than C; each response has ``nextCursor``
+                      (null on the last page)
+  ?since=N            incremental polling: entries with id > N, oldest first,
+                      with ``latestCursor`` to pass as the next ``since``
+
+The ``since`` cursor is the activity id alone: buffered entries are
+stamped when recorded but inserted later, so a timestamp cursor could step
+past rows that land behind it. Ids are not committed in order either -- a
+long transaction (a bulk import) can commit a lower id after a higher one
+is visible -- so a poll stops short of the first entry recorded within
+SINCE_SETTLE and the cursor waits there; only a transaction left open
+longer than that after recording its entries can still be skipped. The
+first page's ``latestCursor`` is held back the same way,
+so a poll may return entries that page already showed; dedupe by id.
+Older clients may still send "<iso>_<id>" (its id is used) or a bare ISO
+timestamp (resolved once to the newest id at or before it).
+
+Owner names come from one outer join with users instead of a lazy load per row.
+"""
+from datetime import datetime, timedelta, timezone
+
+from flask import request
+from sqlalchemy import and_, func, or_
+
+from models import db, Activity, User
+from streaming import stream_json_array, wants_stream
+
+# entries recorded more recently than this are held back from ?since= polls
+# until transactions that took lower ids have had time to commit
+SINCE_SETTLE = timedelta(seconds=30)
+
+
+def encode_cursor(timestamp, activity_id):
+    return f"{timestamp.isoformat()}_{activity_id}"
+
+
+def decode_cursor(raw, name="cursor"):
+    """'<iso>_<id>' -> (datetime, id). A bare ISO timestamp gives id 0."""
+    ts, _, activity_id = raw.rpartition("_") if "_" in raw else (raw, "", "0")
+    try:
+        ts = datetime.fromisoformat(ts.rstrip("Z"))
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)  # stored as naive UTC
+        return ts, int(activity_id)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}'")
+
+
+def decode_since(raw):
+    """?since= value -> the activity id to poll after."""
+    if raw.isdigit():
+        return int(raw)
+    ts, activity_id = decode_cursor(raw, "since")
+    if "_" in raw:
+        return activity_id
+    return db.session.query(func.max(Activity.id)).filter(Activity.timestamp <= ts).scalar() or 0
+
+
+def _first_unsettled_id(after_id=0):
+    """Lowest id above after_id recorded within SINCE_SETTLE, or None (a range on the timestamp index)."""
+    settled = datetime.utcnow() - SINCE_SETTLE
+    return db.session.query(func.min(Activity.id)).filter(
+        Activity.id > after_id, Activity.timestamp >= settled
+    ).scalar()
+
+
+def _before(position):
+    ts, activity_id = position
+    return or_(Activity.timestamp < ts, and_(Activity.timestamp == ts, Activity.id < activity_id))
+
+
+def feed_query(owner_id=None):
+    """(Activity, owner name) rows, optionally for one owner."""
+    q = db.session.query(Activity, User.name).outerjoin(User, User.id == Activity.owner_id)
+    if owner_id is not None:
+        q = q.filter(Activity.owner_id == owner_id)
+    return q
+
+
+def _to_json(row):
+    activity, owner_name = row
+    return activity.to_json(owner_name=owner_name or "Unknown")
+
+
+def activity_feed(owner_id=None, default_limit=50, max_limit=500):
+    """Build the response body for the current request's feed params.
+
+    Returns a Flask response for ``stream=1`` (whole feed, oldest first),
+    otherwise a dict. Raises ValueError for bad params.
+    """
+    args = request.args
+
+    if wants_stream():
+        q = feed_query(owner_id).order_by(Activity.timestamp.asc(), Activity.id.asc())
+        return stream_json_array("activities", q, _to_json)
+
+    try:
+        limit = int(args.get("limit") or default_limit)
+    except ValueError:
+        raise ValueError("Invalid value for 'limit'")
+    limit = max(1, min(limit, max_limit))
+
+    q = feed_query(owner_id)
+    since = args.get("since")
+    if since:
+        after_id = decode_since(since)
+        q = q.filter(Activity.id > after_id)
+        unsettled = _first_unsettled_id(after_id)
+        if unsettled is not None:
+            q = q.filter(Activity.id < unsettled)
+        rows = q.order_by(Activity.id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        latest = str(rows[-1][0].id if rows else after_id)
+        return {"activities": [_to_json(r) for r in rows], "latestCursor": latest, "hasMore": has_more}
+
+    cursor = args.get("cursor")
+    if cursor:
+        q = q.filter(_before(decode_cursor(cursor)))
+    rows = q.order_by(Activity.timestamp.desc(), Activity.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    body = {"activities": [_to_json(r) for r in rows]}
+    body["nextCursor"] = encode_cursor(rows[-1][0].timestamp, rows[-1][0].id) if has_more else None
+    if not cursor:
+        # what to pass as ?since= to poll for anything newer than this page: the
+        # highest settled id (a late-inserted row may sort below the page)
+        unsettled = _first_unsettled_id()
+        if unsettled is not None:
+            body["latestCursor"] = str(unsettled - 1)
+        else:
+            body["latestCursor"] = str(db.session.query(func.max(Activity.id)).scalar() or 0)
+    return body
@@ -0,0 +1,174 @@
+# backend/activity_log.py
+"""Owner activity (audit) records without a commit of their own.
+
+``activity_log.record(...)`` is called before the mutation it describes is
+committed. What happens next depends on Config.ACTIVITY_LOG_MODE:
+
+"transaction" (default)
+    The Activity row is added to the caller's session and commits with the
+    mutation: one transaction, and the log is exactly as durable as the
+    change itself.
+
+"buffered"
+    Write-behind. The record is held on the session until the caller's
+    commit succeeds (a rollback discards it), then moved to an in-memory
+    buffer that a background thread writes with one executemany INSERT when
+    ACTIVITY_FLUSH_SIZE records are waiting or every
+    ACTIVITY_FLUSH_INTERVAL seconds. ``stop()`` (registered with atexit)
+    flushes what is left. A crash can lose up to one interval of records;
+    at most ACTIVITY_BUFFER_MAX are kept while the database is unavailable.
+"""
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from events import publish_after_commit
+from models import db, Accommodation, Activity
+
+_PENDING_KEY = "pending_activities"
+
+
+class ActivitySink:
+    def __init__(self):
+        self.mode = "transaction"
+        self.app = None
+        self.flush_size = 100
+        self.flush_interval = 1.0
+        self.buffer_max = 10000
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, app):
+        cfg = app.config
+        self.app = app
+        self.mode = cfg.get("ACTIVITY_LOG_MODE", "transaction")
+        if self.mode not in ("transaction", "buffered"):
+            raise ValueError(f"Unknown ACTIVITY_LOG_MODE '{self.mode}'")
+        self.flush_size = cfg.get("ACTIVITY_FLUSH_SIZE", self.flush_size)
+        self.flush_interval = cfg.get("ACTIVITY_FLUSH_INTERVAL", self.flush_interval)
+        self.buffer_max = cfg.get("ACTIVITY_BUFFER_MAX", self.buffer_max)
+
+    def record(self, owner_id, action, accommodation_id=None, accommodation_title=None, details=None):
+        values = {
+            "owner_id": owner_id,
+            "action": action,
+            "accommodation_id": accommodation_id,
+            "accommodation_title": accommodation_title,
+            "details": details,
+            "timestamp": datetime.utcnow(),
+        }
+        publish_after_commit("activity", {
+            "ownerId": owner_id,
+            "action": action,
+            "accommodationId": accommodation_id,
+            "accommodationTitle": accommodation_title,
+            "details": details,
+            "timestamp": values["timestamp"].isoformat() + "Z",
+        }, owner_id=owner_id)
+
+        if self.mode == "transaction":
+            act = Activity(**values)
+            db.session.add(act)
+            return act
+
+        # buffered: only once the caller's transaction commits
+        session = db.session()
+        if not session.in_transaction():
+            session.begin()  # so a rollback before any SQL still discards it
+        session.info.setdefault(_PENDING_KEY, []).append(values)
+        return None
+
+    # ------------------------------------------------------------------
+    # Write-behind buffer
+    # ------------------------------------------------------------------
+    def _committed(self, rows):
+        with self._lock:
+            self._buffer.extend(rows)
+            overflow = len(self._buffer) - self.buffer_max
+            if overflow > 0:
+                del self._buffer[:overflow]
+            full = len(self._buffer) >= self.flush_size
+        if overflow > 0 and self.app is not None:
+            self.app.logger.error("Activity buffer full; dropped %s oldest records", overflow)
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write every buffered record now (needs an app context). Returns how many were written."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+
+        # a separate session: the request/worker session may be mid-transaction
+        with Session(db.engine) as session:
+            try:
+                session.execute(insert(Activity), rows)
+                session.commit()
+            except IntegrityError:
+                # an accommodation was deleted before its records were flushed
+                session.rollback()
+                ids = {r["accommodation_id"] for r in rows if r["accommodation_id"] is not None}
+                alive = {i for (i,) in session.query(Accommodation.id).filter(Accommodation.id.in_(ids))}
+                for r in rows:
+                    if r["accommodation_id"] not in alive:
+                        r["accommodation_id"] = None
+                session.execute(insert(Activity), rows)
+                session.commit()
+            except Exception:
+                session.rollback()
+                with self._lock:
+                    self._buffer[:0] = rows  # keep them for the next attempt
+                raise
+        return len(rows)
+
+    def start(self, app):
+        self.configure(app)
+        if self.mode != "buffered" or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the flusher and write whatever is still buffered."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        if self._buffer and self.app is not None:
+            with self.app.app_context():
+                self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                self.app.logger.exception("Activity flush failed; will retry")
+
+
+activity_log = ActivitySink()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        activity_log._committed(rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:  # outermost transaction only, not savepoints
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,244 @@
+# backend/activity_retention.py
+"""Retention for the activities table: daily rollups, then archival.
+
+update_rollups() folds activities into ActivityDailyRollup (count per
+day/owner/action) incrementally, following a high-water mark on
+Activity.id, so each row is counted exactly once. Dashboards read the
+rollups instead of scanning raw history.
+
+archive_old_activities() then moves rows older than
+Config.ACTIVITY_RETENTION_DAYS, and only ones already rolled up, into
+gzip-compressed NDJSON files under Config.ACTIVITY_ARCHIVE_DIR:
+
+    <dir>/<YYYY-MM>/activities-<first id>-<last id>.ndjson.gz
+
+Each batch is written and fsynced before its rows are deleted by primary
+key in a short transaction of its own, so the table is never locked for
+long and a crash in between only means the same file is written again.
+
+    python activity_retention.py                  # roll up + archive everything due
+    python activity_retention.py --max-batches 10 --pause 0.5
+    python activity_retention.py --background     # hand it to the job workers
+"""
+import gzip
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Activity, ActivityDailyRollup, MaintenanceMark
+
+ROLLUP_MARK = "activity_rollup"
+ROLLUP_CHUNK = 50000
+# rows newer than this are left for the next run, so ids of transactions
+# still in flight (or buffered activity not yet flushed) are never skipped
+ROLLUP_LAG = timedelta(minutes=5)
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _rollup_mark():
+    mark = db.session.get(MaintenanceMark, ROLLUP_MARK)
+    if mark is None:
+        try:
+            with db.session.begin_nested():
+                mark = MaintenanceMark(name=ROLLUP_MARK, value=0)
+                db.session.add(mark)
+        except IntegrityError:
+            mark = db.session.get(MaintenanceMark, ROLLUP_MARK)
+    return mark
+
+
+def update_rollups(max_rows=None):
+    """Fold activities added since the last run into the daily rollups. Returns rows counted."""
+    total = 0
+    while max_rows is None or total < max_rows:
+        mark = _rollup_mark()
+        start = mark.value
+        settled = datetime.utcnow() - ROLLUP_LAG
+        # the next ROLLUP_CHUNK rows by count, not by id range: ids have gaps
+        # (rollbacks, archived rows), so a range could hold anything from 0 rows up
+        chunk = (
+            db.session.query(Activity.id)
+            .filter(Activity.id > start, Activity.timestamp < settled)
+            .order_by(Activity.id)
+            .limit(ROLLUP_CHUNK)
+            .subquery()
+        )
+        end = db.session.query(func.max(chunk.c.id)).scalar()
+        if end is None:
+            db.session.commit()
+            return total
+
+        day = func.date(Activity.timestamp)
+        groups = (
+            db.session.query(day, Activity.owner_id, Activity.action, func.count(Activity.id))
+            .filter(Activity.id > start, Activity.id <= end)
+            .group_by(day, Activity.owner_id, Activity.action)
+            .all()
+        )
+        rows = 0
+        for day_value, owner_id, action, n in groups:
+            if isinstance(day_value, str):  # SQLite's date() returns text
+                day_value = date.fromisoformat(day_value)
+            rows += n
+            updated = db.session.execute(
+                update(ActivityDailyRollup)
+                .where(
+                    ActivityDailyRollup.day == day_value,
+                    ActivityDailyRollup.owner_id == owner_id,
+                    ActivityDailyRollup.action == action,
+                )
+                .values(count=ActivityDailyRollup.count + n)
+            ).rowcount
+            if not updated:
+                db.session.add(ActivityDailyRollup(day=day_value, owner_id=owner_id, action=action, count=n))
+
+        # advance the mark in the same transaction; losing a race means another run counted these
+        moved = db.session.execute(
+            update(MaintenanceMark)
+            .where(MaintenanceMark.name == ROLLUP_MARK, MaintenanceMark.value == start)
+            .values(value=end)
+        ).rowcount
+        if not moved:
+            db.session.rollback()
+            return total
+        db.session.commit()
+        total += rows
+    return total
+
+
+def _archive_path(archive_dir, first):
+    month = first.timestamp.strftime("%Y-%m")
+    return os.path.join(archive_dir, month, f"activities-{first.id}-{{last}}.ndjson.gz")
+
+
+def _write_archive(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for a in rows:
+                gz.write(json.dumps({
+                    "id": a.id,
+                    "owner_id": a.owner_id,
+                    "action": a.action,
+                    "accommodation_id": a.accommodation_id,
+                    "accommodation_title": a.accommodation_title,
+                    "details": a.details,
+                    "timestamp": a.timestamp.isoformat() + "Z",
+                }).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+
+
+def archive_old_activities(archive_dir, retention_days, batch_size=DEFAULT_BATCH_SIZE,
+                           max_batches=None, pause=0.0, logger=None):
+    """Archive and delete rolled-up activities older than retention_days. Returns stats."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    stats = {"archived": 0, "files": 0, "done": False}
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        rolled_up_to = _rollup_mark().value
+        rows = (
+            Activity.query
+            .filter(Activity.timestamp < cutoff, Activity.id <= rolled_up_to)
+            .order_by(Activity.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            db.session.commit()
+            stats["done"] = True
+            break
+
+        path = _archive_path(archive_dir, rows[0]).format(last=rows[-1].id)
+        _write_archive(path, rows)
+
+        ids = [a.id for a in rows]
+        db.session.expunge_all()
+        Activity.query.filter(Activity.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+        stats["archived"] += len(ids)
+        stats["files"] += 1
+        batches += 1
+        if logger:
+            logger.info("Archived %s activities to %s", len(ids), path)
+        if pause:
+            time.sleep(pause)
+
+    return stats
+
+
+def run_retention(app_config, batch_size=DEFAULT_BATCH_SIZE, max_batches=None, pause=0.0, logger=None):
+    rolled_up = update_rollups()
+    stats = archive_old_activities(
+        app_config["ACTIVITY_ARCHIVE_DIR"],
+        app_config["ACTIVITY_RETENTION_DAYS"],
+        batch_size=batch_size,
+        max_batches=max_batches,
+        pause=pause,
+        logger=logger,
+    )
+    stats["rolledUp"] = rolled_up
+    return stats
+
+
+def register_job(job_queue):
+    """Register the "activity_retention" job; it re-enqueues itself until the backlog is archived."""
+    from flask import current_app
+
+    @job_queue.handler("activity_retention")
+    def _activity_retention_job(payload):
+        stats = run_retention(
+            current_app.config,
+            batch_size=payload.get("batch_size", DEFAULT_BATCH_SIZE),
+            max_batches=payload.get("max_batches", 20),
+            pause=payload.get("pause", 0.0),
+            logger=current_app.logger,
+        )
+        current_app.logger.info("Activity retention pass: %s", stats)
+        if not stats["done"]:
+            job_queue.enqueue("activity_retention", payload, delay=5)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from main import create_app
+
+    parser = argparse.ArgumentParser(description="Roll up activities and archive those past retention.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--background", action="store_true", help="enqueue an activity_retention job instead")
+    args = parser.parse_args()
+
+    app = create_app(start_workers=False)
+    with app.app_context():
+        if args.background:
+            from jobs import job_queue
+
+            job = job_queue.enqueue("activity_retention", {
+                "batch_size": args.batch_size,
+                "max_batches": args.max_batches or 20,
+                "pause": args.pause,
+            })
+            db.session.commit()
+            print(f"Enqueued activity_retention job {job.id}")
+            raise SystemExit(0)
+
+        result = run_retention(
+            app.config,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            pause=args.pause,
+            logger=app.logger,
+        )
+    print(result)
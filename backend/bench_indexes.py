@@ -0,0 +1,97 @@
+# backend/bench_indexes.py
+"""Show query plans and timings for the hot lookups before/after ensure_indexes().
+
+Builds a throwaway SQLite database with the pre-index schema, fills it,
+then prints EXPLAIN QUERY PLAN and timings for each query on both sides.
+
+    python bench_indexes.py [n_accommodations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+from migrations import ensure_indexes
+from models import db
+
+QUERIES = {
+    "accommodations by owner": "SELECT id FROM accommodations WHERE owner_id = :n",
+    "features by accommodation": "SELECT feature_id FROM accommodation_features WHERE accommodation_id = :n",
+    "amenities by accommodation": "SELECT amenity_id FROM accommodation_amenities WHERE accommodation_id = :n",
+    "images by accommodation": "SELECT image_id FROM accommodation_images WHERE accommodation_id = :n",
+    "image reference count": "SELECT count(*) FROM accommodation_images WHERE image_id = :n",
+    "nearby, over the cell cap": (
+        "SELECT id, latitude, longitude FROM accommodations"
+        " WHERE latitude BETWEEN -35.6 AND -32.0 AND longitude BETWEEN 149.0 AND 153.4"
+    ),
+    "owner activity feed": (
+        "SELECT id FROM activities WHERE owner_id = :n ORDER BY timestamp DESC LIMIT 20"
+    ),
+}
+
+
+def _populate(engine, n):
+    owners = max(1, n // 20)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, name, username, email, password_hash, role, status) VALUES "
+            + ",".join(f"({u}, 'u{u}', 'u{u}', 'u{u}@x', 'x', 'Owner', 'Active')" for u in range(1, owners + 1))
+        )
+        conn.execute(
+            text(
+                "INSERT INTO accommodations (id, owner_id, title, location, capacity, description,"
+                " accommodation_type, bedrooms, bathrooms, gender, status, latitude, longitude)"
+                " VALUES (:id, :o, 't', 'l', 1, 'd', 'House', 1, 1, 'Any', 'available', :lat, :lon)"
+            ),
+            # spread over Australia's east coast
+            [{"id": i, "o": i % owners + 1, "lat": -10.0 - (i % 300) / 10, "lon": 140.0 + (i % 137) / 10}
+             for i in range(1, n + 1)],
+        )
+        conn.execute(text("INSERT INTO images (id, name) VALUES (:id, 'x')"),
+                     [{"id": i} for i in range(1, n * 3 + 1)])
+        links = [{"a": i, "x": i * 3 - k} for i in range(1, n + 1) for k in range(3)]
+        for table, col in (("accommodation_features", "feature_id"),
+                           ("accommodation_amenities", "amenity_id"),
+                           ("accommodation_images", "image_id")):
+            conn.execute(text(f"INSERT INTO {table} (accommodation_id, {col}) VALUES (:a, :x)"), links)
+        conn.execute(
+            text("INSERT INTO activities (owner_id, action, timestamp) VALUES (:o, 'edit', '2025-01-01 00:00:00')"),
+            [{"o": i % owners + 1} for i in range(n * 5)],
+        )
+
+
+def _report(engine, label, probe, repeat=200):
+    print(f"\n== {label} ==")
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + sql), {"n": probe}).fetchall()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), {"n": probe}).fetchall()
+            per_query_ms = (time.perf_counter() - start) * 1000 / repeat
+            print(f"{name:28s} {per_query_ms:8.3f} ms  " + " | ".join(row[-1] for row in plan))
+
+
+def main(n):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+
+    # Pre-index schema: create the tables, then drop what ensure_indexes() adds
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name != "ix_rooms_accommodation_id":
+                    conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+    _populate(engine, n)
+    _report(engine, f"before ({n} accommodations)", probe=n // 2)
+    created = ensure_indexes(engine)
+    print("\ncreated: " + ", ".join(created))
+    _report(engine, "after", probe=n // 2)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
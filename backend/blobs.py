@@ -0,0 +1,141 @@
+# backend/blobs.py
+"""Content-addressed storage for uploaded images.
+
+Uploads are hashed (SHA-256) while they are read from the request into a
+spooled temp file. The bytes land in uploads/_blobs/<aa>/<sha256>.<ext>
+only when that content is new; a repeat upload just gains a reference to
+the existing Blob and writes nothing under UPLOAD_FOLDER. Every Image row
+created for a blob counts as one reference; release() drops references
+when Image rows are deleted and hands back the files to remove once a
+blob is no longer used.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from image_variants import VARIANT_SIZES, variant_rel_path
+from models import db, Blob, Image, ImageVariant
+
+BLOB_DIR = "_blobs"
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX = 4 * 1024 * 1024  # uploads below this never touch the disk until stored
+
+
+def blob_rel_path(sha256, ext):
+    return (Path("uploads") / BLOB_DIR / sha256[:2] / f"{sha256}.{ext}").as_posix()
+
+
+def store_upload(stream, ext, uploads_root):
+    """Hash stream and store it as a blob. Returns (blob, created).
+
+    The returned blob already carries the reference for the Image row the
+    caller is about to add; the caller commits.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX) as spool:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
+        sha256 = digest.hexdigest()
+
+        blob = Blob.query.filter_by(sha256=sha256).first()
+        if blob is not None:
+            _add_ref(blob)
+            return blob, False
+
+        rel_path = blob_rel_path(sha256, ext)
+        abs_path = os.path.join(uploads_root, os.path.relpath(rel_path, "uploads"))
+        # always (re)write, even if a file is already there: it may be the
+        # leftover of a deleted blob with a "delete_files" job still queued,
+        # and the fresh mtime tells that job to leave it alone
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        tmp_path = f"{abs_path}.{os.getpid()}.tmp"
+        spool.seek(0)
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(spool, out, CHUNK_SIZE)
+        os.replace(tmp_path, abs_path)
+
+    blob = Blob(sha256=sha256, name=rel_path, size=size, ref_count=1)
+    try:
+        with db.session.begin_nested():
+            db.session.add(blob)
+    except IntegrityError:
+        # a concurrent upload stored the same content first
+        blob = Blob.query.filter_by(sha256=sha256).one()
+        _add_ref(blob)
+        return blob, False
+    return blob, True
+
+
+def _add_ref(blob):
+    db.session.execute(update(Blob).where(Blob.id == blob.id).values(ref_count=Blob.ref_count + 1))
+    db.session.refresh(blob)
+
+
+def delete_images(image_ids):
+    """Delete Image rows (and their variants), dropping their blob references.
+
+    Returns the relative paths of files nothing references any more: the
+    original and variants of each plain (non-blob) image, plus those of any
+    blob whose last reference just went. The caller commits and then removes
+    the files (e.g. with a "delete_files" job).
+    """
+    image_ids = list({i for i in image_ids if i is not None})
+    if not image_ids:
+        return []
+
+    rows = db.session.query(Image.id, Image.name, Image.blob_id).filter(Image.id.in_(image_ids)).all()
+    plain_ids = [image_id for image_id, _, blob_id in rows if blob_id is None]
+    paths = [name for _, name, blob_id in rows if blob_id is None]
+    if plain_ids:
+        paths += [
+            name for (name,) in
+            db.session.query(ImageVariant.name).filter(ImageVariant.image_id.in_(plain_ids))
+        ]
+
+    blob_refs = {}
+    for _, _, blob_id in rows:
+        if blob_id is not None:
+            blob_refs[blob_id] = blob_refs.get(blob_id, 0) + 1
+
+    ImageVariant.query.filter(ImageVariant.image_id.in_(image_ids)).delete(synchronize_session=False)
+    Image.query.filter(Image.id.in_(image_ids)).delete(synchronize_session=False)
+
+    if blob_refs:
+        for blob_id, n in blob_refs.items():
+            db.session.execute(update(Blob).where(Blob.id == blob_id).values(ref_count=Blob.ref_count - n))
+        dead = (
+            db.session.query(Blob.id, Blob.name)
+            .filter(Blob.id.in_(list(blob_refs)), Blob.ref_count <= 0)
+            .all()
+        )
+        for _, name in dead:
+            paths.append(name)
+            paths += [variant_rel_path(name, size) for size in VARIANT_SIZES]
+        if dead:
+            Blob.query.filter(Blob.id.in_([blob_id for blob_id, _ in dead])).delete(synchronize_session=False)
+
+    return paths
+
+
+def referenced_paths(rel_paths):
+    """The subset of rel_paths (blob files or their variants) whose blob has a Blob row."""
+    by_sha = {}
+    for rel_path in rel_paths:
+        parts = Path(rel_path).parts
+        if BLOB_DIR in parts:
+            by_sha.setdefault(parts[-1].split(".", 1)[0], []).append(rel_path)
+    if not by_sha:
+        return set()
+    live = db.session.query(Blob.sha256).filter(Blob.sha256.in_(list(by_sha)))
+    return {rel_path for (sha256,) in live for rel_path in by_sha[sha256]}
@@ -0,0 +1,241 @@
+# backend/bulk_import.py
+"""Bulk accommodation import from CSV or NDJSON.
+
+Rows are parsed and validated up front (referenced feature/amenity/image
+ids are checked with one IN query per table), then accommodations, their
+links, rooms and activity rows are written with batched executemany
+INSERTs inside a single transaction.
+
+CSV columns use the same names as the JSON API; list columns (features,
+amenities, images) are ';'-separated ids and rooms is a ';'-separated list
+of "number" or "number:status".
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from geo import cell_for
+from models import (
+    db,
+    Accommodation,
+    AccommodationAmenity,
+    AccommodationFeature,
+    AccommodationImage,
+    Activity,
+    Amenity,
+    Feature,
+    Image,
+    Room,
+)
+
+MAX_ROWS = 10000
+
+REQUIRED_FIELDS = [
+    "title",
+    "location",
+    "capacity",
+    "description",
+    "accommodationType",
+    "bedrooms",
+    "bathrooms",
+    "gender",
+    "status",
+]
+INT_FIELDS = ("capacity", "bedrooms", "bathrooms")
+ROOM_STATUSES = ("vacant", "occupied", "maintenance")
+
+
+class BulkImportError(ValueError):
+    """Whole-file problem (unreadable input, too many rows)."""
+
+
+def parse_rows(raw, fmt):
+    """Parse CSV/NDJSON text into a list of dicts."""
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(raw)))
+    elif fmt == "ndjson":
+        rows = []
+        for line_no, line in enumerate(raw.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                raise BulkImportError(f"Line {line_no}: invalid JSON")
+            if not isinstance(row, dict):
+                raise BulkImportError(f"Line {line_no}: expected a JSON object")
+            rows.append(row)
+    else:
+        raise BulkImportError("Unsupported format; use csv or ndjson")
+
+    if len(rows) > MAX_ROWS:
+        raise BulkImportError(f"Too many rows (max {MAX_ROWS})")
+    return rows
+
+
+def _id_list(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = [v for v in value.split(";") if v.strip()]
+    if not isinstance(value, list):
+        raise ValueError
+    return [int(v) for v in value]
+
+
+def _rooms(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = [v for v in value.split(";") if v.strip()]
+    rooms = []
+    for item in value:
+        if isinstance(item, dict):
+            number, status = item.get("roomNumber"), item.get("status") or "vacant"
+        else:
+            number, _, status = str(item).partition(":")
+            status = status or "vacant"
+        if status not in ROOM_STATUSES:
+            raise ValueError
+        rooms.append({"room_number": str(number).strip() if number is not None else None, "status": status})
+    return rooms
+
+
+def validate_rows(rows):
+    """Return (clean_rows, errors); errors is [{"row": n, "errors": [...]}] (1-based)."""
+    clean, errors = [], []
+
+    # gather every referenced id first so existence checks are one query per table
+    refs = {"features": set(), "amenities": set(), "images": set()}
+    for row in rows:
+        for key in refs:
+            try:
+                refs[key].update(_id_list(row.get(key)))
+            except (TypeError, ValueError):
+                pass
+    known = {
+        "features": _existing_ids(Feature, refs["features"]),
+        "amenities": _existing_ids(Amenity, refs["amenities"]),
+        "images": _existing_ids(Image, refs["images"]),
+    }
+
+    for n, row in enumerate(rows, start=1):
+        row_errors = []
+        out = {}
+
+        missing = [f for f in REQUIRED_FIELDS if row.get(f) in (None, "")]
+        if missing:
+            row_errors.append("Missing required fields: " + ", ".join(missing))
+
+        for f in INT_FIELDS:
+            if row.get(f) in (None, ""):
+                continue
+            try:
+                out[f] = int(row[f])
+            except (TypeError, ValueError):
+                row_errors.append(f"'{f}' must be an integer")
+
+        for key in ("features", "amenities", "images"):
+            try:
+                ids = _id_list(row.get(key))
+            except (TypeError, ValueError):
+                row_errors.append(f"'{key}' must be a list of ids")
+                continue
+            unknown = [i for i in ids if i not in known[key]]
+            if unknown:
+                row_errors.append(f"Unknown {key}: " + ", ".join(map(str, unknown)))
+            out[key] = ids
+
+        try:
+            out["rooms"] = _rooms(row.get("rooms"))
+        except (TypeError, ValueError):
+            row_errors.append("'rooms' must list room numbers with status vacant/occupied/maintenance")
+
+        lat, lon = row.get("latitude"), row.get("longitude")
+        out["latitude"] = out["longitude"] = None
+        if lat not in (None, "") or lon not in (None, ""):
+            try:
+                lat, lon = float(lat), float(lon)
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    raise ValueError
+                out["latitude"], out["longitude"] = lat, lon
+            except (TypeError, ValueError):
+                row_errors.append("Invalid coordinates")
+
+        if row_errors:
+            errors.append({"row": n, "errors": row_errors})
+            continue
+
+        for f in REQUIRED_FIELDS:
+            if f not in INT_FIELDS:
+                out[f] = str(row[f])
+        clean.append(out)
+
+    return clean, errors
+
+
+def _existing_ids(model, ids):
+    if not ids:
+        return set()
+    return {i for (i,) in db.session.query(model.id).filter(model.id.in_(ids))}
+
+
+def insert_rows(owner_id, rows):
+    """Insert validated rows with executemany batches. Caller commits. Returns new ids."""
+    if not rows:
+        return []
+
+    acc_values = [
+        {
+            "owner_id": owner_id,
+            "title": r["title"],
+            "location": r["location"],
+            "capacity": r["capacity"],
+            "description": r["description"],
+            "accommodation_type": r["accommodationType"],
+            "bedrooms": r["bedrooms"],
+            "bathrooms": r["bathrooms"],
+            "gender": r["gender"],
+            "status": r["status"],
+            "latitude": r["latitude"],
+            "longitude": r["longitude"],
+            "geo_cell": cell_for(r["latitude"], r["longitude"]) if r["latitude"] is not None else None,
+        }
+        for r in rows
+    ]
+    result = db.session.execute(
+        insert(Accommodation).returning(Accommodation.id, sort_by_parameter_order=True),
+        acc_values,
+    )
+    ids = [row[0] for row in result]
+
+    features, amenities, images, rooms, activities = [], [], [], [], []
+    now = datetime.utcnow()
+    for acc_id, r in zip(ids, rows):
+        features += [{"accommodation_id": acc_id, "feature_id": i} for i in r["features"]]
+        amenities += [{"accommodation_id": acc_id, "amenity_id": i} for i in r["amenities"]]
+        images += [{"accommodation_id": acc_id, "image_id": i} for i in r["images"]]
+        rooms += [dict(room, accommodation_id=acc_id) for room in r["rooms"]]
+        activities.append({
+            "owner_id": owner_id,
+            "action": "add",
+            "accommodation_id": acc_id,
+            "accommodation_title": r["title"],
+            "details": "Imported accommodation",
+            "timestamp": now,
+        })
+
+    for model, values in (
+        (AccommodationFeature, features),
+        (AccommodationAmenity, amenities),
+        (AccommodationImage, images),
+        (Room, rooms),
+        (Activity, activities),
+    ):
+        if values:
+            db.session.execute(insert(model), values)
+
+    return ids
@@ -0,0 +1,81 @@
+# backend/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, MaintenanceMark
+
+VERSION_MARK = "listing_version"
+
+
+class ListingCache:
+    """Response cache for the public listing.
+
+    Bodies are kept per process, keyed by (data version, request key). The
+    version is a row in maintenance_marks, so every worker process sees a
+    write as soon as it commits: write paths (routes and jobs) call
+    ``bump()`` inside their transaction, and readers fetch
+    ``current_version()`` (one primary-key SELECT) before each lookup.
+    Entries also expire after ``ttl`` seconds, as a backstop for a write
+    that forgets to bump; stale entries then age out of the LRU.
+    """
+
+    def __init__(self, max_entries=256):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (version, key) -> (expires, etag, body)
+        self.max_entries = max_entries
+
+    def current_version(self):
+        """The shared data version, read in the caller's session (so a replica read sees the replica's)."""
+        value = db.session.query(MaintenanceMark.value).filter(MaintenanceMark.name == VERSION_MARK).scalar()
+        return value or 0
+
+    def bump(self):
+        """Invalidate every cached body once the caller's transaction commits."""
+        for _ in range(2):
+            bumped = db.session.execute(
+                update(MaintenanceMark)
+                .where(MaintenanceMark.name == VERSION_MARK)
+                .values(value=MaintenanceMark.value + 1)
+            ).rowcount
+            if bumped:
+                return
+            try:
+                with db.session.begin_nested():
+                    db.session.add(MaintenanceMark(name=VERSION_MARK, value=1))
+                return
+            except IntegrityError:
+                pass  # created concurrently; increment that row instead
+
+    def get(self, key, version):
+        """Return (etag, body) for key at version, or None."""
+        with self._lock:
+            entry = self._entries.get((version, key))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(version, key)]
+                return None
+            self._entries.move_to_end((version, key))
+            return entry[1], entry[2]
+
+    def set(self, key, body, version, ttl):
+        """Store body (bytes) for ttl seconds and return its ETag.
+
+        Pass the ``version`` read before building the body, so that a write
+        landing mid-build leaves the body under the older, unreachable key.
+        """
+        etag = f"v{version}-{hashlib.sha1(body).hexdigest()}"
+        with self._lock:
+            self._entries[(version, key)] = (time.monotonic() + ttl, etag, body)
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+
+listing_cache = ListingCache()
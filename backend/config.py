@@ -18,6 +18,77 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Optional read replica for @read_only views (see db_routing.py); a client
+    # that just wrote gets a cookie keeping its reads on the primary for
+    # READ_YOUR_WRITES_SECONDS
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    SQLALCHEMY_BINDS = {"replica": REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    READ_YOUR_WRITES_SECONDS = 5
+
+    # Engine profile (see db_engine.py). Postgres connection pool per process:
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = 10       # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800     # seconds before a connection is replaced
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    # SQLite pragmas (WAL is always on)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB = 64 * 1024
+
+    # Geocoder used to fill lat/lon from Accommodation.location:
+    # "none", "stub" (offline, for tests), "nominatim" or "module:Class"
+    GEOCODER = os.getenv("GEOCODER", "none")
+
+    # Background job workers (threads per process); 0 disables them
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL = 2.0
+
+    # Processes used to render image thumbnails / WebP variants (needs Pillow; 0 = inline)
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+    # Let a fronting web server stream /uploads: "", "x-sendfile" or "x-accel-redirect".
+    # For nginx, UPLOADS_ACCEL_PREFIX must be an `internal` location aliased to UPLOAD_FOLDER.
+    UPLOADS_SENDFILE = os.getenv("UPLOADS_SENDFILE", "")
+    UPLOADS_ACCEL_PREFIX = os.getenv("UPLOADS_ACCEL_PREFIX", "/_protected_uploads/")
+
+    # Password hashing: worker processes (0 = inline), max hashes queued or running
+    # before logins get 503, and how long a request waits for its hash
+    HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+    HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "16"))
+    HASH_TIMEOUT = 5.0
+
+    # Login attempts allowed per minute (and burst) per username and per client IP
+    LOGIN_USER_RATE = 5
+    LOGIN_USER_BURST = 10
+    LOGIN_IP_RATE = 30
+    LOGIN_IP_BURST = 30
+
+    # Activity log: "transaction" (written with the change it records) or
+    # "buffered" (write-behind, batched; may lose up to one interval on a crash)
+    ACTIVITY_LOG_MODE = os.getenv("ACTIVITY_LOG_MODE", "transaction")
+    ACTIVITY_FLUSH_SIZE = 100
+    ACTIVITY_FLUSH_INTERVAL = 1.0
+    ACTIVITY_BUFFER_MAX = 10000
+
+    # Server-Sent Events (/api/sda_owner/events, /api/admin/events): events kept
+    # for Last-Event-ID replay, open streams per process, per-stream backlog
+    SSE_REPLAY_SIZE = 1000
+    SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "200"))
+    SSE_QUEUE_SIZE = 500
+    SSE_TOKEN_SECONDS = 60     # how long a stream token can be used to open a stream
+
+    # Activities older than this are archived (gzip NDJSON) by activity_retention.py
+    ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "365"))
+    ACTIVITY_ARCHIVE_DIR = os.getenv("ACTIVITY_ARCHIVE_DIR", os.path.join(BASE_DIR, "archives", "activities"))
+
+    # Seconds a cached public listing page is served before it is rebuilt,
+    # even if no write bumped the listing version (see cache.py)
+    LISTING_CACHE_TTL = 30
+
+    # Seconds a users-table lookup for a changed/claimless token is reused
+    IDENTITY_CACHE_TTL = 60
+
     # You can override this with an env var in production
     SECRET_KEY = os.getenv("SECRET_KEY", "test_dev123")
 
@@ -0,0 +1,86 @@
+# backend/db_engine.py
+"""Engine settings per database backend, applied by create_app().
+
+Postgres: a sized connection pool with pre-ping and recycling (stale
+connections after a failover or idle timeout are replaced, not handed to a
+request) and a server-side statement_timeout so one slow query cannot hold
+a worker forever.
+
+SQLite: pragmas run on every new connection. WAL lets readers proceed while
+a writer commits; busy_timeout makes a second writer wait for the lock
+instead of failing with "database is locked"; synchronous=NORMAL is safe
+under WAL and saves an fsync per commit; mmap_size and cache_size keep hot
+pages in memory.
+
+Every value comes from Config (DB_* / SQLITE_*). Options already present in
+SQLALCHEMY_ENGINE_OPTIONS win over the profile; binds given as a plain URL
+(the read replica) get the profile of their own backend.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+_sqlite_pragmas = []
+
+
+def engine_options(config, uri=None):
+    """SQLAlchemy create_engine() keyword arguments for uri (default: the primary database)."""
+    backend = make_url(uri or config["SQLALCHEMY_DATABASE_URI"]).get_backend_name()
+
+    if backend == "postgresql":
+        options = {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "pool_timeout": config["DB_POOL_TIMEOUT"],
+            "pool_recycle": config["DB_POOL_RECYCLE"],
+            "pool_pre_ping": True,
+        }
+        if config.get("DB_STATEMENT_TIMEOUT_MS"):
+            options["connect_args"] = {"options": f"-c statement_timeout={int(config['DB_STATEMENT_TIMEOUT_MS'])}"}
+        return options
+
+    if backend == "sqlite":
+        # the driver's own lock wait, in seconds; the busy_timeout pragma covers the rest
+        return {"connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000.0}}
+
+    return {}
+
+
+def sqlite_pragmas(config):
+    return [
+        ("journal_mode", "WAL"),
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("synchronous", "NORMAL"),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("cache_size", -int(config["SQLITE_CACHE_SIZE_KB"])),  # negative = KiB
+    ]
+
+
+def configure(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS from the profile; call before db.init_app(app)."""
+    options = engine_options(app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    # binds given as a plain URL (e.g. the read replica) get their own backend's profile
+    uris = [app.config["SQLALCHEMY_DATABASE_URI"]]
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for key, bind in binds.items():
+        if isinstance(bind, str):
+            binds[key] = {"url": bind, **engine_options(app.config, bind)}
+            uris.append(bind)
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+    if any(make_url(uri).get_backend_name() == "sqlite" for uri in uris):
+        _sqlite_pragmas[:] = sqlite_pragmas(app.config)
+
+
+@event.listens_for(Engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not _sqlite_pragmas or type(dbapi_connection).__module__.split(".")[0] not in ("sqlite3", "pysqlite2"):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in _sqlite_pragmas:
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
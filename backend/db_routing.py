@@ -0,0 +1,152 @@
+# backend/db_routing.py
+"""Read/write split between the primary database and an optional replica.
+
+Set REPLICA_DATABASE_URL and create_app() registers it as the "replica"
+bind. Views decorated with ``@read_only`` then send their SELECTs to the
+replica; anything that writes (INSERT/UPDATE/DELETE, ORM flushes) and
+every undecorated view keep using the primary. Without a replica the
+decorator does nothing.
+
+Read-your-writes: a response to a request that committed a write sets a
+short-lived "rw_until" cookie (expiry as a Unix time). @read_only views
+read from the primary while the client's cookie is unexpired, so an owner
+never sees their listing "revert" while the replica catches up. The pin
+travels with the client, so it holds whichever worker or host serves the
+next request, and clients behind one address (NAT, proxy) do not pin each
+other. Any committed INSERT/UPDATE/DELETE counts as a write, whether it
+came from a flush or a bulk session.execute(). The browser only returns
+the cookie if its requests carry credentials to the origin that set it;
+the SPA sends every call to one VITE_API_BASE_URL with credentials.
+configure(app) registers the hook that sets the cookie.
+
+Local testing with two SQLite files:
+
+    DATABASE_URL=sqlite:///primary.db REPLICA_DATABASE_URL=sqlite:///replica.db python main.py
+    python db_routing.py      # copy primary.db into replica.db (re-run to "replicate")
+"""
+import functools
+import math
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+REPLICA_BIND = "replica"
+RW_COOKIE = "rw_until"
+
+
+def _has_replica():
+    return REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {})
+
+
+def _pinned_to_primary(now):
+    """True while the client's rw_until cookie is unexpired (and not further out than one window)."""
+    try:
+        until = float(request.cookies.get(RW_COOKIE) or 0)
+    except ValueError:
+        return False
+    window = current_app.config.get("READ_YOUR_WRITES_SECONDS", 0)
+    return now < until <= now + window
+
+
+def read_only(view):
+    """Route this view's reads to the replica unless the caller wrote recently."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if _has_replica():
+            g.db_use_replica = not _pinned_to_primary(time.time())
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _set_rw_cookie(response):
+    until = g.pop("rw_until", None)
+    if until is not None:
+        response.set_cookie(
+            RW_COOKIE,
+            f"{until:.3f}",
+            max_age=math.ceil(current_app.config["READ_YOUR_WRITES_SECONDS"]),
+            httponly=True,
+            secure=request.is_secure,
+            samesite="Lax",
+        )
+    return response
+
+
+def configure(app):
+    """Register the hook that hands writers their read-your-writes cookie."""
+    app.after_request(_set_rw_cookie)
+
+
+class RoutingSession(FlaskSession):
+    """Flask-SQLAlchemy session that sends plain SELECTs to the replica inside @read_only views."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get("db_use_replica")
+            and (clause is None or isinstance(clause, Select))
+        ):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _orm_execute(state):
+    # bulk statements (session.execute(insert(...)), Query.delete()) never flush
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if not session.info.pop("wrote", False) or not has_request_context():
+        return
+    window = current_app.config.get("READ_YOUR_WRITES_SECONDS", 0)
+    if window and _has_replica():
+        g.rw_until = time.time() + window
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("wrote", None)
+
+
+def sync_sqlite_replica(primary_path, replica_path):
+    """Copy a SQLite primary into the replica file (local stand-in for replication)."""
+    import sqlite3
+
+    src = sqlite3.connect(primary_path)
+    dst = sqlite3.connect(replica_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+if __name__ == "__main__":
+    from sqlalchemy.engine import make_url
+
+    from config import Config
+
+    if not Config.REPLICA_DATABASE_URL:
+        raise SystemExit("REPLICA_DATABASE_URL is not set")
+    primary, replica = make_url(Config.SQLALCHEMY_DATABASE_URI), make_url(Config.REPLICA_DATABASE_URL)
+    if primary.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite":
+        raise SystemExit("Only SQLite primaries/replicas can be synced this way")
+    sync_sqlite_replica(primary.database, replica.database)
+    print(f"Copied {primary.database} -> {replica.database}")
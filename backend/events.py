@@ -0,0 +1,191 @@
+# backend/events.py
+"""Server-Sent Events push for dashboards (activity and listing changes).
+
+Write paths call ``publish_after_commit(event, data, owner_id)`` inside
+their transaction; the event is handed to the in-process ``broadcaster``
+only if that transaction commits. Each SSE connection subscribes with an
+optional owner filter and gets its own bounded queue, so one slow client
+never holds up the others (it is disconnected instead and resumes).
+
+Event ids are "<process token>-<sequence>". A reconnecting EventSource
+sends the last one in the Last-Event-ID header; events after it are
+replayed from a ring buffer of the most recent SSE_REPLAY_SIZE. If the id
+is from another process or has fallen out of the buffer, a "reset" event
+tells the client to reload through the REST feeds once and carry on.
+
+EventSource cannot send an Authorization header, so a client first trades
+its access token for a stream token (issue_stream_token): signed, good only
+for opening that owner's stream, and only for SSE_TOKEN_SECONDS. Putting
+the access token itself in the URL would leave it in access logs.
+
+The broadcaster lives in one process: with several workers, a client only
+sees changes committed by the worker it is connected to. Every open stream
+also occupies a server thread, so serve it from a threaded or async worker.
+"""
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db
+
+_PENDING_KEY = "pending_events"
+HEARTBEAT_SECONDS = 15
+STREAM_TOKEN_SALT = "sse-stream"
+
+
+class Subscriber:
+    def __init__(self, owner_id, max_queue):
+        self.owner_id = owner_id
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def wants(self, evt):
+        return self.owner_id is None or evt["owner_id"] == self.owner_id
+
+
+class EventBroadcaster:
+    def __init__(self, replay_size=1000, max_subscribers=200, max_queue=500):
+        self.token = f"{os.getpid():x}{int(time.time()):x}"
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+
+    def configure(self, app):
+        cfg = app.config
+        self._recent = deque(self._recent, maxlen=cfg.get("SSE_REPLAY_SIZE", self._recent.maxlen))
+        self.max_subscribers = cfg.get("SSE_MAX_SUBSCRIBERS", self.max_subscribers)
+        self.max_queue = cfg.get("SSE_QUEUE_SIZE", self.max_queue)
+
+    def publish(self, name, data, owner_id=None):
+        with self._lock:
+            evt = {"id": f"{self.token}-{next(self._seq)}", "event": name, "owner_id": owner_id, "data": data}
+            self._recent.append(evt)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if not sub.wants(evt):
+                continue
+            try:
+                sub.queue.put_nowait(evt)
+            except queue.Full:
+                sub.overflowed = True
+
+    def subscribe(self, owner_id=None, last_event_id=None):
+        """Returns (subscriber, events to replay first, reset needed); None when at capacity."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            sub = Subscriber(owner_id, self.max_queue)
+            self._subscribers.add(sub)
+            backlog, reset = self._replay_after(last_event_id, sub)
+        return sub, backlog, reset
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def _replay_after(self, last_event_id, sub):
+        if not last_event_id:
+            return [], False
+        token, _, seq = last_event_id.rpartition("-")
+        if token != self.token or not seq.isdigit():
+            return [], True
+        seq = int(seq)
+        recent = list(self._recent)
+        oldest = int(recent[0]["id"].rpartition("-")[2]) if recent else seq + 1
+        if seq + 1 < oldest:
+            return [], True  # fell out of the replay buffer
+        return [e for e in recent if int(e["id"].rpartition("-")[2]) > seq and sub.wants(e)], False
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+broadcaster = EventBroadcaster()
+
+
+def publish_after_commit(name, data, owner_id=None):
+    """Queue an event on the current session; it is broadcast once the transaction commits."""
+    session = db.session()
+    if not session.in_transaction():
+        session.begin()
+    session.info.setdefault(_PENDING_KEY, []).append((name, data, owner_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for name, data, owner_id in session.info.pop(_PENDING_KEY, ()):
+        broadcaster.publish(name, data, owner_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _stream_serializer(app):
+    return URLSafeTimedSerializer(app.config["SECRET_KEY"], salt=STREAM_TOKEN_SALT)
+
+
+def issue_stream_token(app, owner_id):
+    """A short-lived token that opens owner_id's event stream and nothing else."""
+    return _stream_serializer(app).dumps({"owner_id": owner_id})
+
+
+def read_stream_token(app, token):
+    """The owner id a stream token was issued for, or None if it is forged or expired."""
+    try:
+        claims = _stream_serializer(app).loads(token, max_age=app.config.get("SSE_TOKEN_SECONDS", 60))
+    except BadSignature:  # includes SignatureExpired
+        return None
+    return claims.get("owner_id") if isinstance(claims, dict) else None
+
+
+def _format(evt):
+    return f"id: {evt['id']}\nevent: {evt['event']}\ndata: {json.dumps(evt['data'])}\n\n"
+
+
+def sse_response(app, owner_id=None, last_event_id=None):
+    """A text/event-stream response for one subscriber (owner_id=None: every owner)."""
+    subscription = broadcaster.subscribe(owner_id, last_event_id)
+    if subscription is None:
+        resp = app.response_class('{"message": "Too many event streams, poll instead"}', status=503,
+                                  mimetype="application/json")
+        resp.headers["Retry-After"] = "30"
+        return resp
+    sub, backlog, reset = subscription
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                yield f"event: reset\ndata: {json.dumps({'reason': 'resume point unavailable'})}\n\n"
+            for evt in backlog:
+                yield _format(evt)
+            while not sub.overflowed:
+                try:
+                    evt = sub.queue.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format(evt)
+            # too far behind: drop the connection, the client resumes from its last id
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    resp = app.response_class(generate(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return resp
@@ -0,0 +1,246 @@
+# backend/gc_uploads.py
+"""Incremental garbage collector for files under UPLOAD_FOLDER.
+
+Walks the uploads tree in a stable (sorted) order, a batch of files at a
+time, and checks each batch against Image.name, ImageVariant.name and
+Blob.name with one IN query per table, plus the Blob rows behind any
+_blobs/ paths (a live blob's variants stay with it). Files nothing
+references, and older than a grace period (so in-flight uploads are never
+touched), are removed.
+
+A walk that starts from the beginning first reclaims Image rows that no
+accommodation links to (uploads whose form was never saved) once they are
+older than the same grace period, via blobs.delete_images(). Their files
+and dropped blobs are then unreferenced, so the walk removes them too.
+
+Every run returns a cursor (the last path examined), so work can be spread
+over many short runs. As a background job it re-enqueues itself with that
+cursor until the whole tree has been covered:
+
+    python gc_uploads.py --dry-run                 # report only
+    python gc_uploads.py --batch-size 200 --rate 100 --max-batches 50
+    python gc_uploads.py --background --rate 100   # hand it to the job workers
+    python gc_uploads.py --files-only              # keep unlinked Image rows
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+import blobs
+from models import db, AccommodationImage, Blob, Image, ImageVariant
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MIN_AGE = 3600  # seconds; younger files are never collected
+
+
+def _walk(root, parts=(), after=None):
+    """Yield file path-part tuples below root in sorted order, strictly after ``after``."""
+    try:
+        entries = sorted(os.scandir(os.path.join(root, *parts)), key=lambda e: e.name)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        entry_parts = parts + (entry.name,)
+        if entry.is_dir(follow_symlinks=False):
+            # skip whole directories that sort entirely before the cursor
+            if after is not None and entry_parts < after[:len(entry_parts)]:
+                continue
+            yield from _walk(root, entry_parts, after)
+        elif entry.is_file(follow_symlinks=False):
+            if after is not None and entry_parts <= after:
+                continue
+            yield entry_parts
+
+
+def _referenced(names):
+    names = list(names)
+    found = set()
+    for column in (Image.name, ImageVariant.name, Blob.name):
+        found.update(n for (n,) in db.session.query(column).filter(column.in_(names)))
+    # a live blob keeps its variants too, even before any ImageVariant row names them
+    found.update(blobs.referenced_paths(names))
+    return found
+
+
+def collect_unlinked_images(min_age=DEFAULT_MIN_AGE, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, logger=None):
+    """Delete Image rows no accommodation links to and older than min_age. Returns how many.
+
+    Rows from before Image.created_at existed (null) count as old. Each
+    batch commits on its own; the files are left for the walk.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=min_age)
+    linked = db.session.query(AccommodationImage.id).filter(AccommodationImage.image_id == Image.id).exists()
+    reclaimed, last_id = 0, 0
+    while True:
+        ids = [
+            image_id for (image_id,) in
+            db.session.query(Image.id)
+            .filter(Image.id > last_id, ~linked, or_(Image.created_at.is_(None), Image.created_at < cutoff))
+            .order_by(Image.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            db.session.rollback()
+            return reclaimed
+        last_id = ids[-1]
+        if dry_run:
+            db.session.rollback()
+            if logger:
+                logger.info("GC (dry run) would delete %s unlinked images", len(ids))
+        else:
+            blobs.delete_images(ids)
+            db.session.commit()
+        reclaimed += len(ids)
+
+
+def collect_garbage(uploads_root, cursor=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None,
+                    dry_run=False, rate_limit=None, min_age=DEFAULT_MIN_AGE, reclaim_images=True, logger=None):
+    """Scan up to max_batches batches starting after cursor; delete unreferenced files.
+
+    A run without a cursor first reclaims unlinked Image rows (see
+    collect_unlinked_images) unless reclaim_images is False. rate_limit caps
+    files examined per second. Returns a dict with the new ``cursor`` (None
+    once the walk is complete), ``done`` and counters.
+    """
+    after = tuple(cursor.split("/")) if cursor else None
+    stats = {"images": 0, "scanned": 0, "orphans": 0, "deleted": 0, "bytes": 0, "cursor": cursor, "done": False}
+    if cursor is None and reclaim_images:
+        stats["images"] = collect_unlinked_images(min_age, batch_size, dry_run, logger)
+    now = time.time()
+    walker = _walk(uploads_root, after=after)
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        started = time.monotonic()
+        batch = []
+        for parts in walker:
+            batch.append(parts)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            stats["cursor"], stats["done"] = None, True
+            break
+
+        names = {"uploads/" + "/".join(parts): parts for parts in batch}
+        referenced = _referenced(names)
+        db.session.rollback()  # release the read transaction between batches
+
+        for name, parts in names.items():
+            if name in referenced:
+                continue
+            abs_path = os.path.join(uploads_root, *parts)
+            try:
+                st = os.stat(abs_path)
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime < min_age:
+                continue
+            stats["orphans"] += 1
+            stats["bytes"] += st.st_size
+            if dry_run:
+                if logger:
+                    logger.info("GC (dry run) would delete %s", name)
+                continue
+            try:
+                os.remove(abs_path)
+                stats["deleted"] += 1
+                _prune_empty_dirs(uploads_root, parts[:-1])
+            except OSError:
+                if logger:
+                    logger.exception("GC failed to delete %s", abs_path)
+
+        stats["scanned"] += len(batch)
+        stats["cursor"] = "/".join(batch[-1])
+        batches += 1
+
+        if rate_limit:
+            min_duration = len(batch) / float(rate_limit)
+            elapsed = time.monotonic() - started
+            if elapsed < min_duration:
+                time.sleep(min_duration - elapsed)
+
+    return stats
+
+
+def _prune_empty_dirs(uploads_root, parts):
+    while parts:
+        try:
+            os.rmdir(os.path.join(uploads_root, *parts))
+        except OSError:
+            return  # not empty (or already gone)
+        parts = parts[:-1]
+
+
+def register_job(job_queue):
+    """Register the "gc_uploads" job; each run covers max_batches and then re-enqueues itself."""
+    from flask import current_app
+
+    @job_queue.handler("gc_uploads")
+    def _gc_uploads_job(payload):
+        stats = collect_garbage(
+            current_app.config["UPLOAD_FOLDER"],
+            cursor=payload.get("cursor"),
+            batch_size=payload.get("batch_size", DEFAULT_BATCH_SIZE),
+            max_batches=payload.get("max_batches", 20),
+            dry_run=payload.get("dry_run", False),
+            rate_limit=payload.get("rate_limit"),
+            min_age=payload.get("min_age", DEFAULT_MIN_AGE),
+            reclaim_images=payload.get("reclaim_images", True),
+            logger=current_app.logger,
+        )
+        current_app.logger.info("Uploads GC pass: %s", stats)
+        if not stats["done"]:
+            job_queue.enqueue("gc_uploads", dict(payload, cursor=stats["cursor"]), delay=payload.get("pause", 5))
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from main import create_app
+
+    parser = argparse.ArgumentParser(description="Delete unlinked images and files under UPLOAD_FOLDER that nothing references.")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+    parser.add_argument("--rate", type=float, default=None, help="max files examined per second")
+    parser.add_argument("--cursor", default=None, help="resume after this path (printed by a previous run)")
+    parser.add_argument("--min-age", type=int, default=DEFAULT_MIN_AGE, help="skip files younger than this (s)")
+    parser.add_argument("--files-only", action="store_true", help="don't delete unlinked Image rows")
+    parser.add_argument("--background", action="store_true", help="enqueue a resumable gc_uploads job instead")
+    args = parser.parse_args()
+
+    app = create_app(start_workers=False)
+    with app.app_context():
+        if args.background:
+            from jobs import job_queue
+
+            job = job_queue.enqueue("gc_uploads", {
+                "cursor": args.cursor,
+                "batch_size": args.batch_size,
+                "max_batches": args.max_batches or 20,
+                "dry_run": args.dry_run,
+                "rate_limit": args.rate,
+                "min_age": args.min_age,
+                "reclaim_images": not args.files_only,
+            })
+            db.session.commit()
+            print(f"Enqueued gc_uploads job {job.id}")
+            raise SystemExit(0)
+
+        result = collect_garbage(
+            app.config["UPLOAD_FOLDER"],
+            cursor=args.cursor,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            dry_run=args.dry_run,
+            rate_limit=args.rate,
+            min_age=args.min_age,
+            reclaim_images=not args.files_only,
+            logger=app.logger,
+        )
+    print(result)
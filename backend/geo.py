@@ -0,0 +1,111 @@
+# backend/geo.py
+"""Coordinates, grid cells and geocoding for proximity search.
+
+Listings carry an optional latitude/longitude plus a ``geo_cell`` key on a
+fixed GRID_DEGREES grid. Radius and bounding-box queries first narrow the
+candidates to the (indexed) cells that overlap the box, then compute exact
+distances only for those rows. Boxes spanning more than MAX_GRID_CELLS fall
+back to a latitude range scan on the (latitude, longitude) index.
+"""
+import importlib
+import json
+import math
+import urllib.parse
+import urllib.request
+
+GRID_DEGREES = 0.1          # ~11 km north-south
+EARTH_RADIUS_KM = 6371.0
+MAX_GRID_CELLS = 400        # beyond this, range-scan the lat/lon index instead
+
+
+def cell_for(lat, lon):
+    """Grid cell key for a coordinate, e.g. '1236:3311'."""
+    row = int(math.floor((lat + 90.0) / GRID_DEGREES))
+    col = int(math.floor((lon + 180.0) / GRID_DEGREES))
+    return f"{row}:{col}"
+
+
+def cells_for_bbox(min_lat, min_lon, max_lat, max_lon):
+    """All cell keys overlapping the box, or None if there are more than MAX_GRID_CELLS."""
+    row0, col0 = (int(v) for v in cell_for(min_lat, min_lon).split(":"))
+    row1, col1 = (int(v) for v in cell_for(max_lat, max_lon).split(":"))
+    if (row1 - row0 + 1) * (col1 - col0 + 1) > MAX_GRID_CELLS:
+        return None
+    return [f"{r}:{c}" for r in range(row0, row1 + 1) for c in range(col0, col1 + 1)]
+
+
+def bbox_around(lat, lon, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle of radius_km."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+    return (max(-90.0, lat - dlat), max(-180.0, lon - dlon),
+            min(90.0, lat + dlat), min(180.0, lon + dlon))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# ----------------------------
+# Geocoders
+# ----------------------------
+class StubGeocoder:
+    """Offline geocoder with a fixed table of places; for tests and local dev."""
+
+    PLACES = {
+        "sydney": (-33.8688, 151.2093),
+        "parramatta": (-33.8150, 151.0011),
+        "blacktown": (-33.7710, 150.9063),
+        "penrith": (-33.7507, 150.6877),
+        "liverpool": (-33.9200, 150.9238),
+        "newcastle": (-32.9283, 151.7817),
+        "wollongong": (-34.4278, 150.8931),
+        "melbourne": (-37.8136, 144.9631),
+        "brisbane": (-27.4698, 153.0251),
+    }
+
+    def geocode(self, location):
+        text = (location or "").lower()
+        for name, coords in self.PLACES.items():
+            if name in text:
+                return coords
+        return None
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim lookup. Mind the usage policy (1 req/s, real User-Agent)."""
+
+    URL = "https://nominatim.openstreetmap.org/search"
+
+    def __init__(self, user_agent="nurseassist247", timeout=5):
+        self.user_agent = user_agent
+        self.timeout = timeout
+
+    def geocode(self, location):
+        if not location:
+            return None
+        query = urllib.parse.urlencode({"q": location, "format": "json", "limit": 1})
+        req = urllib.request.Request(f"{self.URL}?{query}", headers={"User-Agent": self.user_agent})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            results = json.load(resp)
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+_GEOCODERS = {"stub": StubGeocoder, "nominatim": NominatimGeocoder}
+
+
+def load_geocoder(name):
+    """Build the geocoder named by config: 'none', 'stub', 'nominatim' or 'module:Class'."""
+    if not name or name == "none":
+        return None
+    if name in _GEOCODERS:
+        return _GEOCODERS[name]()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
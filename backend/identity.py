@@ -0,0 +1,112 @@
+# backend/identity.py
+"""Who is making an authenticated request, without a users-table lookup.
+
+Access tokens already carry ``username``, ``role``, ``name`` and ``status``
+claims (see /api/auth/login), so ``current_identity()`` normally builds the
+identity straight from them. ``invalidate(user_id)``, called by
+update_user/delete_user, marks tokens issued before the change as stale.
+For those (and for tokens without the claims) the user is loaded from the
+database once and kept in a small TTL/LRU cache.
+
+Invalidation is per process: other workers see a change when their cached
+row expires (IDENTITY_CACHE_TTL) and otherwise trust claims until the token
+expires.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+from models import db, User
+
+Identity = namedtuple("Identity", ["id", "username", "name", "role", "status"])
+
+
+class IdentityCache:
+    def __init__(self, max_entries=1024):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user id -> (expires, Identity or None)
+        self._changed = OrderedDict()  # user id -> time of last update/delete
+        self.max_entries = max_entries
+
+    def get(self, user_id):
+        """Return (hit, identity); identity is None for a cached missing user."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return False, None
+            self._entries.move_to_end(user_id)
+            return True, entry[1]
+
+    def set(self, user_id, identity, ttl):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def changed_since(self, user_id, issued_at):
+        """True if the user was updated/deleted after a token issued at ``issued_at`` (epoch s)."""
+        with self._lock:
+            changed = self._changed.get(user_id)
+        return changed is not None and (issued_at is None or changed >= issued_at)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._changed.pop(user_id, None)
+            self._changed[user_id] = time.time()
+            # marks only matter while tokens issued before them can still be used
+            while len(self._changed) > self.max_entries * 8:
+                self._changed.popitem(last=False)
+
+
+identity_cache = IdentityCache()
+
+
+def _user_id(identity):
+    # identity may be a dict {"id": 1, "role": "Owner"} or the user id as a string/int
+    if isinstance(identity, dict):
+        identity = identity.get("id")
+    try:
+        return int(identity)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_identity(user_id):
+    """Identity for user_id from the cache or the database (None if the user is gone)."""
+    hit, identity = identity_cache.get(user_id)
+    if hit:
+        return identity
+
+    row = (
+        db.session.query(User.id, User.username, User.name, User.role, User.status)
+        .filter(User.id == user_id)
+        .first()
+    )
+    identity = Identity(*row) if row else None
+    identity_cache.set(user_id, identity, current_app.config.get("IDENTITY_CACHE_TTL", 60))
+    return identity
+
+
+def current_identity():
+    """Identity of the user behind the current JWT (call inside @jwt_required)."""
+    user_id = _user_id(get_jwt_identity())
+    if user_id is None:
+        return None
+
+    claims = get_jwt()
+    if claims.get("username") and not identity_cache.changed_since(user_id, claims.get("iat")):
+        return Identity(user_id, claims["username"], claims.get("name"), claims.get("role"), claims.get("status"))
+    return load_identity(user_id)
+
+
+def invalidate(user_id):
+    """Forget what we know about user_id; call after committing an update or delete."""
+    identity_cache.invalidate(user_id)
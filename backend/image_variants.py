@@ -0,0 +1,97 @@
+# backend/image_variants.py
+"""Thumbnail / resized WebP derivatives for uploaded images.
+
+upload_image enqueues an "image_variants" job; the job hands the CPU-heavy
+resize to a process pool and records one ImageVariant row per output.
+Variants live next to the original as ``<stem>.<size>.webp`` so they move
+and get deleted together with it, and /uploads/<path>?size=<size> can find
+them without a DB lookup. Originals are never modified.
+
+Pillow is optional: without it the pipeline is disabled and originals are
+served for every size. With IMAGE_WORKERS = 0 the job renders inline, in
+the job worker itself.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image as PILImage, ImageOps
+except ImportError:  # optional dependency
+    PILImage = None
+
+# size name -> (width, height, mode); "cover" crops to exactly that box,
+# "fit" scales down to fit inside it keeping the aspect ratio
+VARIANT_SIZES = {
+    "thumb": (320, 240, "cover"),
+    "medium": (800, 800, "fit"),
+    "large": (1600, 1600, "fit"),
+}
+VARIANT_FORMAT = "webp"
+
+_pool = None
+
+
+def enabled():
+    return PILImage is not None
+
+
+def variant_rel_path(rel_path, size):
+    """'uploads/a/b/x_photo.png' -> 'uploads/a/b/x_photo.thumb.webp'."""
+    stem, _ = os.path.splitext(rel_path)
+    return f"{stem}.{size}.{VARIANT_FORMAT}"
+
+
+def render_variants(src_abs):
+    """Write every variant of src_abs next to it. Runs in a worker process.
+
+    Returns [{"size", "format", "width", "height", "bytes"}].
+    """
+    out = []
+    stem, _ = os.path.splitext(src_abs)
+    with PILImage.open(src_abs) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+        for size, (w, h, mode) in VARIANT_SIZES.items():
+            if mode == "cover":
+                variant = ImageOps.fit(im, (w, h), PILImage.LANCZOS)
+            else:
+                variant = im.copy()
+                variant.thumbnail((w, h), PILImage.LANCZOS)
+            dest = f"{stem}.{size}.{VARIANT_FORMAT}"
+            tmp = dest + ".tmp"
+            variant.save(tmp, "WEBP", quality=80, method=4)
+            os.replace(tmp, dest)
+            out.append({
+                "size": size,
+                "format": VARIANT_FORMAT,
+                "width": variant.width,
+                "height": variant.height,
+                "bytes": os.path.getsize(dest),
+            })
+    return out
+
+
+def get_pool(workers):
+    global _pool
+    if _pool is None:
+        # never fork: this process runs job/SSE/flusher threads, and a lock
+        # held by one of them at fork time would stay locked in the child
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def render(src_abs, workers, timeout=300):
+    """render_variants(src_abs) in the pool, or inline when workers <= 0."""
+    if workers <= 0:
+        return render_variants(src_abs)
+    return get_pool(workers).submit(render_variants, src_abs).result(timeout=timeout)
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
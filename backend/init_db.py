@@ -0,0 +1,90 @@
+# backend/init_db.py
+"""One-off database initialisation, kept out of create_app().
+
+Creates missing tables, columns and indexes (migrations.py), the search
+index (search.py), and seeds the default owner account. Run it once per
+deploy, before starting workers:
+
+    python init_db.py
+
+Concurrent runs (e.g. several containers starting at once) serialise on a
+lock: pg_advisory_lock on Postgres, an flock'd "<db file>.init.lock" on
+SQLite. Everything it does is idempotent, so the second run finds nothing
+left to do.
+"""
+import contextlib
+import os
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from migrations import ensure_columns, ensure_indexes
+from models import db, User
+from search import ensure_search_index
+
+try:
+    import fcntl
+except ImportError:  # Windows: SQLite runs unlocked
+    fcntl = None
+
+ADVISORY_LOCK_KEY = 724247001  # arbitrary, unique to this app
+
+
+@contextlib.contextmanager
+def schema_lock(engine):
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        return
+
+    database = make_url(str(engine.url)).database
+    if engine.dialect.name != "sqlite" or fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(database + ".init.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def init_db(app):
+    """Create/upgrade the schema and seed the owner. Returns a summary dict."""
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+
+    with app.app_context(), schema_lock(db.engine):
+        db.create_all()
+        columns = ensure_columns(db.engine)
+        indexes = ensure_indexes(db.engine)
+        ensure_search_index(db.engine)
+
+        owner = User.query.filter_by(username="owner").first()
+        if not owner:
+            owner = User(
+                name="System Owner",
+                username="owner",
+                role="Owner",
+                email=" ",
+                status="Active"
+            )
+            owner.set_password("ownerpassword123")
+            db.session.add(owner)
+            db.session.commit()
+            print("Superadmin (owner) account created...")
+        else:
+            print(f"Owner already exists with id={owner.id}")
+
+    return {"columns": columns, "indexes": indexes}
+
+
+if __name__ == "__main__":
+    from main import create_app
+
+    result = init_db(create_app(start_workers=False))
+    print("Added columns: " + (", ".join(result["columns"]) or "none"))
+    print("Created indexes: " + (", ".join(result["indexes"]) or "none"))
@@ -0,0 +1,196 @@
+# backend/jobs.py
+"""In-process background job queue with durable state in the ``jobs`` table.
+
+Routes call ``job_queue.enqueue(...)`` inside their own transaction, so a job
+exists exactly when the change that needs it commits, then ``notify()``
+after the commit. A small pool of worker threads claims due jobs with a
+conditional UPDATE (safe across threads and processes), runs the registered
+handler and records the outcome. Failures are retried with exponential
+backoff up to ``max_attempts``. While a handler runs, a heartbeat thread
+refreshes the job's ``updated_at`` every HEARTBEAT_INTERVAL seconds, so
+only jobs whose process died stop beating; ``requeue_stale()``, which the
+first worker runs every REQUEUE_INTERVAL seconds, puts those back.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models import db, Job
+
+REQUEUE_INTERVAL = 300
+HEARTBEAT_INTERVAL = 60
+# several missed heartbeats: the process running the job is gone
+STALE_AFTER = timedelta(minutes=10)
+
+
+class JobQueue:
+    def __init__(self):
+        self._handlers = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self.app = None
+        self.poll_interval = 2.0
+
+    def handler(self, kind):
+        """Register fn(payload: dict) as the handler for jobs of this kind."""
+        def decorator(fn):
+            self._handlers[kind] = fn
+            return fn
+        return decorator
+
+    def enqueue(self, kind, payload=None, owner_id=None, max_attempts=5, delay=0):
+        """Add a job to the current session; it becomes visible when the caller commits."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            owner_id=owner_id,
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        db.session.add(job)
+        return job
+
+    def notify(self):
+        """Wake idle workers (call after committing enqueued jobs)."""
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def start(self, app, workers=2, poll_interval=2.0):
+        self.app = app
+        self.poll_interval = poll_interval
+        self._stop.clear()
+        for n in range(workers):
+            t = threading.Thread(target=self._worker, args=(n == 0,), name=f"job-worker-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _worker(self, requeues=False):
+        next_requeue = time.monotonic() if requeues else None
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    if next_requeue is not None and time.monotonic() >= next_requeue:
+                        next_requeue = time.monotonic() + REQUEUE_INTERVAL
+                        self.requeue_stale()
+                    ran = self.run_once()
+            except Exception:
+                self.app.logger.exception("Job worker loop error")
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def run_once(self):
+        """Claim and run one due job in the current app context. Returns False if none was due."""
+        job_id = self._claim()
+        if job_id is None:
+            return False
+
+        job = db.session.get(Job, job_id)
+        handler = self._handlers.get(job.kind)
+        beating = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, beating), name=f"job-heartbeat-{job_id}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind '{job.kind}'")
+            handler(json.loads(job.payload or "{}"))
+            job = db.session.get(Job, job_id)
+            job.status = "done"
+            job.last_error = None
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception("Job %s (%s) failed", job_id, job.kind)
+            job = db.session.get(Job, job_id)
+            job.last_error = f"{type(e).__name__}: {e}"[:2000]
+            if job.attempts >= job.max_attempts:
+                job.status = "failed"
+            else:
+                job.status = "pending"
+                job.run_after = datetime.utcnow() + timedelta(seconds=min(2 ** job.attempts, 300))
+            db.session.commit()
+        finally:
+            beating.set()
+            heartbeat.join()
+        return True
+
+    def _heartbeat(self, job_id, stop):
+        """Refresh a running job's updated_at until stop is set (own session, own transactions)."""
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                with self.app.app_context(), Session(db.engine) as session:
+                    session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "running")
+                        .values(updated_at=datetime.utcnow())
+                    )
+                    session.commit()
+            except Exception:
+                self.app.logger.exception("Heartbeat for job %s failed", job_id)
+
+    def run_pending(self, max_jobs=None):
+        """Drain due jobs synchronously (no worker threads). Returns how many ran."""
+        if self.app is None:
+            from flask import current_app
+            self.app = current_app._get_current_object()
+        ran = 0
+        while (max_jobs is None or ran < max_jobs) and self.run_once():
+            ran += 1
+        return ran
+
+    def _claim(self):
+        now = datetime.utcnow()
+        for _ in range(5):
+            candidate = (
+                db.session.query(Job.id)
+                .filter(Job.status == "pending", Job.run_after <= now)
+                .order_by(Job.run_after, Job.id)
+                .limit(1)
+                .scalar()
+            )
+            if candidate is None:
+                db.session.rollback()
+                return None
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == candidate, Job.status == "pending")
+                .values(status="running", attempts=Job.attempts + 1, updated_at=now)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return candidate
+            time.sleep(0.01)  # another worker won; try the next one
+        return None
+
+    def requeue_stale(self, older_than=STALE_AFTER):
+        """Return "running" jobs whose heartbeat stopped (the process died) to "pending"."""
+        cutoff = datetime.utcnow() - older_than
+        n = db.session.execute(
+            update(Job)
+            .where(Job.status == "running", Job.updated_at < cutoff)
+            .values(status="pending", updated_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        return n
+
+
+job_queue = JobQueue()
@@ -1,34 +1,62 @@
-from flask import Flask, send_from_directory
+import time
+
+_import_started = time.perf_counter()
+
+from flask import Flask
 from flask_cors import CORS
 
 from config import Config
-from models import db, User
+from models import db
+import db_engine
+import db_routing
+from init_db import init_db
+from geo import load_geocoder
+from jobs import job_queue
+from activity_log import activity_log
+from events import broadcaster
+import gc_uploads
+import activity_retention
+import image_variants
+import passwords
+from uploads import serve_upload
 from routes.user_routes import user
 from routes.admin_routes import admin
 from routes.sda_owner_routes import sda_owner
 
 from flask_jwt_extended import JWTManager
 
-import os
+import atexit
+import logging
 
+# time spent importing the app (python -X importtime main.py shows the breakdown)
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
-def create_app():
+
+def create_app(start_workers=True):
+    """Wire up the app; no database or filesystem work (that is init_db.py)."""
+    started = time.perf_counter()
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config["USE_X_SENDFILE"] = app.config.get("UPLOADS_SENDFILE") == "x-sendfile"
 
     # CORS:
     # - public APIs: open to all origins, no credentials
     # - everything else: allow credentials (for admin)
     CORS(app, supports_credentials=True)
-    
-
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
-    # init SQLAlchemy
+    # init SQLAlchemy (pool / pragma profile first)
+    db_engine.configure(app)
     db.init_app(app)
+    db_routing.configure(app)
 
     JWTManager(app)
 
+    gc_uploads.register_job(job_queue)
+    activity_retention.register_job(job_queue)
+
+    broadcaster.configure(app)
+    app.extensions["geocoder"] = load_geocoder(app.config.get("GEOCODER"))
+
     # register blueprints
     app.register_blueprint(user)
     app.register_blueprint(admin)
@@ -37,36 +65,26 @@ def create_app():
     # Serve uploaded files under /uploads/<path:filename>
     @app.route("/uploads/<path:filename>")
     def serve_uploads(filename):
-        uploads_root = app.config.get("UPLOAD_FOLDER")
-        if not uploads_root:
-            return "Uploads disabled", 404
         # Security note: ensure UPLOAD_FOLDER path is correct and you want to expose this publicly.
-        return send_from_directory(uploads_root, filename, conditional=True)
-
-    # create tables + default owner admin
-    with app.app_context():
-        db.create_all()
-
-        owner = User.query.filter_by(username="owner").first()
-        if not owner:
-            owner = User(
-                name="System Owner",
-                username="owner", 
-                role="Owner",
-                email=" ",
-                status="Active"
-            )
-            owner.set_password("ownerpassword123")
-            db.session.add(owner)
-            db.session.commit()
-            print("Superadmin (owner) account created...")
-        else:
-            print(f"Owner already exists with id={owner.id}")
-        
-
+        return serve_upload(filename)
+
+    if start_workers and app.config.get("JOB_WORKERS"):
+        job_queue.start(app, workers=app.config["JOB_WORKERS"], poll_interval=app.config["JOB_POLL_INTERVAL"])
+        atexit.register(job_queue.stop)
+    activity_log.start(app)
+    atexit.register(activity_log.stop)
+    atexit.register(image_variants.shutdown_pool)
+    atexit.register(passwords.shutdown_pool)
+
+    app.extensions["startup"] = {
+        "import_ms": round(IMPORT_SECONDS * 1000, 1),
+        "create_app_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logging.getLogger(__name__).info("App ready: %s", app.extensions["startup"])
     return app
 
 
 if __name__ == "__main__":
     app = create_app()
+    init_db(app)  # dev server convenience; deployments run init_db.py once instead
     app.run(debug=True)
@@ -0,0 +1,95 @@
+# backend/migrations.py
+"""Schema upgrades for databases created before a model change.
+
+db.create_all() skips tables that already exist, including their columns
+and indexes, so those added to models.py never reach an existing database
+on their own. ensure_columns() and ensure_indexes() add whatever is missing
+in place. init_db.py runs both once per deploy; they can also be run on
+their own:
+
+    python migrations.py          # uses Config.SQLALCHEMY_DATABASE_URI / DATABASE_URL
+"""
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from models import db
+
+
+def ensure_columns(engine):
+    """Add nullable model columns that existing tables lack. Returns "table.column" names.
+
+    Only nullable columns can be added without a table rebuild; anything
+    else needs a real migration and is reported by raising RuntimeError.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        have = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in have:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} in place")
+            col_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def ensure_indexes(engine):
+    """Create every index declared on the models that the database lacks.
+
+    Postgres builds them with CREATE INDEX CONCURRENTLY so writers are not
+    blocked; SQLite builds them inline. Returns the names created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    postgres = engine.dialect.name == "postgresql"
+
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all() will build it with its indexes
+        have = _index_names(engine, inspector, table.name)
+        for index in table.indexes:
+            if index.name in have:
+                continue
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            if postgres:
+                # CONCURRENTLY cannot run inside a transaction block
+                ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.exec_driver_sql(ddl)
+            else:
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(ddl)
+            created.append(index.name)
+    return created
+
+
+def _index_names(engine, inspector, table_name):
+    if engine.dialect.name == "sqlite":
+        # the SQLite inspector skips expression indexes such as lower(username)
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table_name,)
+            )
+            return {name for (name,) in rows}
+    return {ix["name"] for ix in inspector.get_indexes(table_name)}
+
+
+if __name__ == "__main__":
+    from sqlalchemy import create_engine
+
+    from config import Config
+
+    engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    columns = ensure_columns(engine)
+    names = ensure_indexes(engine)
+    print("Added columns: " + (", ".join(columns) if columns else "none"))
+    print("Created indexes: " + (", ".join(names) if names else "none"))
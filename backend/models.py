@@ -2,15 +2,23 @@ from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from sqlalchemy import func, text
+from sqlalchemy.orm import joinedload, selectinload
 
-db = SQLAlchemy()
+from db_routing import RoutingSession
+from geo import cell_for
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class Accommodation(db.Model):
     __tablename__ = "accommodations"
+    __table_args__ = (
+        # range scans for proximity boxes too large for the geo_cell IN list
+        db.Index("ix_accommodations_latitude_longitude", "latitude", "longitude"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    owner_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     title = db.Column(db.String(255), nullable=False)
     location = db.Column(db.String(255), nullable=False)
@@ -22,6 +30,11 @@ class Accommodation(db.Model):
     gender = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(50), nullable=False, server_default=text("'available'"))
 
+    # optional coordinates; geo_cell is the grid key from geo.cell_for()
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    geo_cell = db.Column(db.String(32), nullable=True, index=True)
+
     # relationships
     features = db.relationship(
         "AccommodationFeature",
@@ -48,6 +61,15 @@ class Accommodation(db.Model):
         passive_deletes=True
     )
 
+    def set_coordinates(self, latitude, longitude):
+        """Set lat/lon (or clear both with None) and keep geo_cell in step."""
+        if latitude is None or longitude is None:
+            self.latitude = self.longitude = self.geo_cell = None
+            return
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.geo_cell = cell_for(self.latitude, self.longitude)
+
     def available_rooms(self):
         return [r for r in self.rooms if r.status == "vacant"]
 
@@ -68,8 +90,41 @@ class Accommodation(db.Model):
             Room.status == "vacant"
         ).scalar()
 
-    def to_json(self):
-        return {
+    @classmethod
+    def room_counts(cls, accommodation_ids):
+        """Vacant/occupied room counts for a batch of listings in one GROUP BY.
+
+        Returns {accommodation_id: {"vacant": n, "occupied": m}}; ids with no
+        rooms get zeros.
+        """
+        counts = {aid: {"vacant": 0, "occupied": 0} for aid in accommodation_ids}
+        if not counts:
+            return counts
+
+        rows = (
+            db.session.query(Room.accommodation_id, Room.status, func.count(Room.id))
+            .filter(
+                Room.accommodation_id.in_(list(counts)),
+                Room.status.in_(("vacant", "occupied")),
+            )
+            .group_by(Room.accommodation_id, Room.status)
+        )
+        for accommodation_id, status, n in rows:
+            counts[accommodation_id][status] = n
+        return counts
+
+    def to_json(self, include_rooms=True, room_counts=None):
+        """Serialize the listing.
+
+        room_counts: precomputed {"vacant": n, "occupied": m} (see room_counts());
+        when omitted the counts come from the loaded rooms. With
+        include_rooms=False the "rooms" list is left out, so callers passing
+        room_counts never need the rooms loaded at all.
+        """
+        if room_counts is None:
+            room_counts = {"occupied": self.occupied_count, "vacant": self.vacant_count}
+
+        data = {
             "id": self.id,
             "title": self.title,
             "location": self.location,
@@ -80,17 +135,39 @@ class Accommodation(db.Model):
             "bathrooms": self.bathrooms,
             "gender": self.gender,
             "status": self.status,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
 
             "features": [f.feature_id for f in self.features] if self.features else [],
             "amenities": [a.amenity_id for a in self.amenities] if self.amenities else [],
             "images": [i.image.name if (i and i.image) else None for i in self.images] if self.images else [],
 
             "owner": self.owner.name if getattr(self, "owner", None) else None,
-
-            "rooms": [r.to_json() for r in self.rooms],
-            "occupiedCount": self.occupied_count,
-            "vacantCount": self.vacant_count
         }
+        if include_rooms:
+            data["rooms"] = [r.to_json() for r in self.rooms]
+        data["occupiedCount"] = room_counts["occupied"]
+        data["vacantCount"] = room_counts["vacant"]
+        return data
+
+    @classmethod
+    def listing_options(cls, include_rooms=True):
+        """Loader options covering everything to_json() touches.
+
+        Collections are fetched with one SELECT ... IN per relationship and the
+        owner is joined, so serializing N listings costs a constant number of
+        queries instead of ~6 per row. Pass include_rooms=False when counts
+        come from room_counts() and the rooms themselves are not serialized.
+        """
+        options = [
+            selectinload(cls.features),
+            selectinload(cls.amenities),
+            selectinload(cls.images).joinedload(AccommodationImage.image),
+            joinedload(cls.owner),
+        ]
+        if include_rooms:
+            options.append(selectinload(cls.rooms))
+        return tuple(options)
 
 
 class Room(db.Model):
@@ -131,6 +208,47 @@ class Image(db.Model):
     __tablename__ = "images"
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
+    # set for content-addressed uploads; name is then the shared blob path
+    blob_id = db.Column(db.Integer, db.ForeignKey("blobs.id"), nullable=True, index=True)
+    # null for rows uploaded before the column existed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=True)
+    variants = db.relationship("ImageVariant", backref="image", cascade="all, delete-orphan")
+
+
+class Blob(db.Model):
+    """Stored upload content, shared by every Image with the same bytes (see blobs.py)."""
+    __tablename__ = "blobs"
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    # number of Image rows pointing at this blob
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ImageVariant(db.Model):
+    """Derived copy of an Image (thumbnail / resized WebP), see image_variants.py."""
+    __tablename__ = "image_variants"
+    __table_args__ = (db.UniqueConstraint("image_id", "size", "format", name="uq_image_variants_image_size_format"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    image_id = db.Column(db.Integer, db.ForeignKey("images.id", ondelete="CASCADE"), nullable=False, index=True)
+    size = db.Column(db.String(32), nullable=False)
+    format = db.Column(db.String(16), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    bytes = db.Column(db.Integer, nullable=False)
+
+    def to_json(self):
+        return {
+            "size": self.size,
+            "format": self.format,
+            "path": self.name,
+            "width": self.width,
+            "height": self.height,
+        }
 
 # =========================
 # LINKING TABLES
@@ -139,22 +257,22 @@ class Image(db.Model):
 class AccommodationFeature(db.Model):
     __tablename__ = "accommodation_features"
     id = db.Column(db.Integer, primary_key=True)
-    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"))
+    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"), index=True)
     feature_id = db.Column(db.Integer, db.ForeignKey("features.id", ondelete="CASCADE"))
     feature = db.relationship("Feature")
 
 class AccommodationAmenity(db.Model):
     __tablename__ = "accommodation_amenities"
     id = db.Column(db.Integer, primary_key=True)
-    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"))
+    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"), index=True)
     amenity_id = db.Column(db.Integer, db.ForeignKey("amenities.id", ondelete="CASCADE"))
     amenity = db.relationship("Amenity")
 
 class AccommodationImage(db.Model):
     __tablename__ = "accommodation_images"
     id = db.Column(db.Integer, primary_key=True)
-    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"))
-    image_id = db.Column(db.Integer, db.ForeignKey("images.id", ondelete="CASCADE"))
+    accommodation_id = db.Column(db.Integer, db.ForeignKey("accommodations.id", ondelete="CASCADE"), index=True)
+    image_id = db.Column(db.Integer, db.ForeignKey("images.id", ondelete="CASCADE"), index=True)
     image = db.relationship("Image")
 
 
@@ -190,11 +308,30 @@ class User(db.Model):
             "status": self.status
         }
     
+
+# Admin user directory (see get_users): case-insensitive prefix search on
+# lower(...) and role/status filters. text_pattern_ops lets Postgres use the
+# index for LIKE 'prefix%' under any collation.
+db.Index("ix_users_lower_username", func.lower(User.username).label("lower_username"),
+         postgresql_ops={"lower_username": "text_pattern_ops"})
+db.Index("ix_users_lower_name", func.lower(User.name).label("lower_name"),
+         postgresql_ops={"lower_name": "text_pattern_ops"})
+db.Index("ix_users_lower_email", func.lower(User.email).label("lower_email"),
+         postgresql_ops={"lower_email": "text_pattern_ops"})
+db.Index("ix_users_role_status", User.role, User.status)
+
+
 # ======================
 # SDA OWNER ACTIVITIES
 # ===================
 class Activity(db.Model):
     __tablename__ = "activities"
+    __table_args__ = (
+        # per-owner feed: WHERE owner_id = ? ORDER BY timestamp DESC
+        db.Index("ix_activities_owner_id_timestamp", "owner_id", "timestamp"),
+        # global feed: ORDER BY timestamp DESC, id DESC with a (timestamp, id) keyset
+        db.Index("ix_activities_timestamp_id", "timestamp", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -206,16 +343,88 @@ class Activity(db.Model):
     details = db.Column(db.Text, nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     owner = db.relationship("User", backref="activities")
-    accommodation = db.relationship("Accommodation", backref="activity_entries", lazy="joined")
+    accommodation = db.relationship("Accommodation", backref="activity_entries")
 
-    def to_json(self):
+    def to_json(self, owner_name=None):
+        # feeds pass owner_name from a join (see activity_feed.py) instead of loading owner per row
+        if owner_name is None:
+            owner_name = self.owner.name if self.owner else "Unknown"
         return {
             "id": self.id,
             "ownerId": self.owner_id,
-            "ownerName": self.owner.name if self.owner else "Unknown",
+            "ownerName": owner_name,
             "action": self.action,
             "accommodationId": self.accommodation_id,
             "accommodationTitle": self.accommodation_title,
             "details": self.details,
             "timestamp": self.timestamp.isoformat() + "Z"
-        }
\ No newline at end of file
+        }
+
+class ActivityDailyRollup(db.Model):
+    """Activity counts per day/owner/action, kept after raw rows are archived (see activity_retention.py)."""
+    __tablename__ = "activity_daily_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("day", "owner_id", "action", name="uq_activity_rollup_day_owner_action"),
+        db.Index("ix_activity_rollups_owner_id_day", "owner_id", "day"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    # plain column: rollups outlive the owner's account
+    owner_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(32), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_json(self):
+        return {
+            "day": self.day.isoformat(),
+            "ownerId": self.owner_id,
+            "action": self.action,
+            "count": self.count,
+        }
+
+
+class MaintenanceMark(db.Model):
+    """Named high-water marks for incremental maintenance jobs."""
+    __tablename__ = "maintenance_marks"
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+# ======================
+# BACKGROUND JOBS
+# ===================
+class Job(db.Model):
+    """Durable record for work run off the request path (see jobs.py)."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # worker poll: WHERE status = 'pending' AND run_after <= now
+        db.Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    # pending / running / done / failed
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    # owner who triggered it; plain column so user deletion is never blocked
+    owner_id = db.Column(db.Integer, nullable=True, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    last_error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "maxAttempts": self.max_attempts,
+            "lastError": self.last_error,
+            "createdAt": self.created_at.isoformat() + "Z",
+            "updatedAt": self.updated_at.isoformat() + "Z",
+        }
@@ -0,0 +1,202 @@
+# backend/passwords.py
+"""Password hashing off the request threads.
+
+werkzeug's hashes are deliberately slow (hundreds of ms of CPU). Running
+them inline lets a burst of logins pin every web worker, so hashing goes to
+a small process pool instead:
+
+* at most Config.HASH_MAX_PENDING hashes may be queued or running; beyond
+  that ``HashingBusy`` is raised and the route answers 503 right away
+  instead of queueing work it cannot finish in time;
+* a per-username and a per-IP token bucket (``login_limiter``) reject
+  repeated attempts with 429 before any hashing happens;
+* ``hash_metrics`` keeps counters and latency for /api/admin/auth_metrics.
+
+With HASH_WORKERS = 0 hashing runs inline (still bounded and measured).
+"""
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+
+
+class HashingBusy(Exception):
+    """Too many hashes are already queued; the caller should retry later."""
+
+
+# -------------------------
+# Metrics
+# -------------------------
+class HashMetrics:
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)  # ms, most recent hashes
+        self.counts = {"hashed": 0, "rejected_busy": 0, "throttled": 0, "timeouts": 0}
+        self.in_flight = 0
+
+    def incr(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def observe(self, ms):
+        with self._lock:
+            self.counts["hashed"] += 1
+            self._latencies.append(ms)
+
+    def snapshot(self):
+        with self._lock:
+            lat = sorted(self._latencies)
+            counts = dict(self.counts)
+            in_flight = self.in_flight
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 1) if lat else None
+
+        return {
+            **counts,
+            "in_flight": in_flight,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0), "samples": len(lat)},
+        }
+
+
+hash_metrics = HashMetrics()
+
+
+# -------------------------
+# Throttling
+# -------------------------
+class TokenBucketLimiter:
+    """Token buckets keyed by arbitrary strings, kept in a bounded LRU."""
+
+    def __init__(self, rate_per_minute, burst, max_keys=10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+
+    def allow(self, key):
+        """Take one token for key. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class LoginLimiter:
+    def __init__(self):
+        self._user = None
+        self._ip = None
+
+    def _limiters(self):
+        if self._user is None:
+            cfg = current_app.config
+            self._user = TokenBucketLimiter(cfg["LOGIN_USER_RATE"], cfg["LOGIN_USER_BURST"])
+            self._ip = TokenBucketLimiter(cfg["LOGIN_IP_RATE"], cfg["LOGIN_IP_BURST"])
+        return self._user, self._ip
+
+    def check(self, username, ip):
+        """Returns 0 if this attempt may proceed, else a Retry-After in seconds."""
+        by_user, by_ip = self._limiters()
+        wait = max(by_ip.allow(ip or "-"), by_user.allow(username.lower()))
+        if wait:
+            hash_metrics.incr("throttled")
+        return wait
+
+
+login_limiter = LoginLimiter()
+
+
+# -------------------------
+# Hashing
+# -------------------------
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # never fork: the web process runs other threads, and a lock held
+            # by one of them at fork time would stay locked in the child
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _get_slots(limit):
+    global _slots
+    with _pool_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(limit)
+        return _slots
+
+
+def _run(fn, *args):
+    cfg = current_app.config
+    slots = _get_slots(cfg["HASH_MAX_PENDING"])
+    if not slots.acquire(blocking=False):
+        hash_metrics.incr("rejected_busy")
+        raise HashingBusy()
+
+    started = time.perf_counter()
+    with hash_metrics._lock:
+        hash_metrics.in_flight += 1
+
+    def release(_future=None):
+        with hash_metrics._lock:
+            hash_metrics.in_flight -= 1
+        slots.release()
+
+    if not cfg["HASH_WORKERS"]:
+        try:
+            return fn(*args)
+        finally:
+            release()
+            hash_metrics.observe((time.perf_counter() - started) * 1000)
+
+    try:
+        future = _get_pool(cfg["HASH_WORKERS"]).submit(fn, *args)
+    except Exception:
+        release()
+        raise
+    # the slot is held until the hash really finishes, even if we stop waiting for it
+    future.add_done_callback(release)
+    try:
+        return future.result(timeout=cfg["HASH_TIMEOUT"])
+    except FutureTimeout:
+        future.cancel()
+        hash_metrics.incr("timeouts")
+        raise HashingBusy()
+    finally:
+        hash_metrics.observe((time.perf_counter() - started) * 1000)
+
+
+def check_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password)
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,6 +1,16 @@
-from flask import Blueprint, request, jsonify
-from models import db, User, Activity
+from flask import Blueprint, current_app, request, jsonify
+from datetime import date
+
+from models import db, User, ActivityDailyRollup
+from sqlalchemy import and_, func, or_
 from sqlalchemy.exc import IntegrityError
+from cache import listing_cache
+from activity_feed import activity_feed
+from activity_retention import ROLLUP_CHUNK, update_rollups
+from events import sse_response
+from db_routing import read_only
+import identity
+from passwords import HashingBusy, hash_metrics, hash_password
 
 admin = Blueprint("admin", __name__)
 
@@ -8,12 +18,77 @@ admin = Blueprint("admin", __name__)
 # ADMIN USER MANAGEMENT ROUTES
 # ==========================
 
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 200
+
+
 # Get list of all admin accounts
 @admin.route("/api/admin/get_users", methods=["GET"])
+@read_only
 def get_users():
-    users = User.query.all()
-    json_users = [u.to_json() for u in users]
-    return jsonify({"users": json_users}), 200
+    """Keyset-paginated user directory, ordered by id.
+
+    Query params (all optional): q (case-insensitive prefix of username,
+    name or email), role, status, cursor (last id of the previous page),
+    limit. Responses carry ``nextCursor`` (null on the last page).
+    """
+    args = request.args
+    try:
+        limit = int(args.get("limit") or USERS_PAGE_SIZE)
+        cursor = int(args["cursor"]) if args.get("cursor") else None
+    except ValueError:
+        return jsonify({"message": "Invalid 'limit' or 'cursor'"}), 400
+    limit = max(1, min(limit, USERS_MAX_PAGE_SIZE))
+
+    q = User.query
+    term = (args.get("q") or "").strip().lower()
+    if term:
+        q = q.filter(or_(*(_prefix_match(col, term) for col in (User.username, User.name, User.email))))
+    if args.get("role"):
+        q = q.filter(User.role == args["role"])
+    if args.get("status"):
+        q = q.filter(User.status == args["status"])
+    if cursor:
+        q = q.filter(User.id > cursor)
+
+    users = q.order_by(User.id.asc()).limit(limit + 1).all()
+    has_more = len(users) > limit
+    users = users[:limit]
+    return jsonify({
+        "users": [u.to_json() for u in users],
+        "nextCursor": users[-1].id if has_more else None,
+    }), 200
+
+
+def _prefix_match(column, prefix):
+    """lower(column) starts with prefix, in a form the lower(...) indexes can serve."""
+    lowered = func.lower(column)
+    if db.engine.dialect.name == "postgresql":
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return lowered.like(escaped + "%", escape="\\")
+    # SQLite never uses an expression index for LIKE, but does for a range on lower(...)
+    return and_(lowered >= prefix, lowered < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def _uniqueness_conflict(username, email, exclude_id=None):
+    """One query for both unique fields; returns an error message or None."""
+    conditions = []
+    if username is not None:
+        conditions.append(User.username == username)
+    if email is not None:
+        conditions.append(User.email == email)
+    if not conditions:
+        return None
+
+    q = db.session.query(User.username, User.email).filter(or_(*conditions))
+    if exclude_id is not None:
+        q = q.filter(User.id != exclude_id)
+    taken = q.limit(2).all()
+    if any(u == username for u, _ in taken):
+        return "Username already exists"
+    if any(e == email for _, e in taken):
+        return "Email already exists"
+    return None
 
 
 # Create new user accounts
@@ -34,11 +109,14 @@ def add_user():
     if not all([name, username, email, password]):
         return jsonify({"message": "Missing required fields"}), 400
 
-    if User.query.filter_by(username=username).first():
-        return jsonify({"message": "Username already exists"}), 400
+    conflict = _uniqueness_conflict(username, email)
+    if conflict:
+        return jsonify({"message": conflict}), 400
 
-    if User.query.filter_by(email=email).first():
-        return jsonify({"message": "Email already exists"}), 400
+    try:
+        password_hash = hash_password(password)
+    except HashingBusy:
+        return jsonify({"message": "Server busy, please try again shortly"}), 503
 
     new_user = User(
         name=name,
@@ -46,11 +124,16 @@ def add_user():
         email=email,
         role=role,
         status=status,
+        password_hash=password_hash,
     )
-    new_user.set_password(password)
 
     db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # taken by a concurrent request since the check above
+        db.session.rollback()
+        return jsonify({"message": "Username or email already exists"}), 400
 
     return jsonify({"message": "Admin user created successfully"}), 201
 
@@ -67,6 +150,16 @@ def update_user(user_id):
 
     data = request.get_json() or {}
 
+    new_username = data.get("username")
+    new_email = data.get("email")
+    conflict = _uniqueness_conflict(
+        new_username if new_username not in (None, user.username) else None,
+        new_email if new_email not in (None, user.email) else None,
+        exclude_id=user_id,
+    )
+    if conflict:
+        return jsonify({"message": conflict}), 400
+
     # Update basic info
     user.name = data.get("name", user.name)
     user.username = data.get("username", user.username)
@@ -76,9 +169,20 @@ def update_user(user_id):
 
     # Update password only if provided
     if data.get("password"):
-        user.set_password(data["password"])
+        try:
+            user.password_hash = hash_password(data["password"])
+        except HashingBusy:
+            db.session.rollback()
+            return jsonify({"message": "Server busy, please try again shortly"}), 503
 
-    db.session.commit()
+    # listings embed the owner's name
+    listing_cache.bump()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"message": "Username or email already exists"}), 400
+    identity.invalidate(user_id)
     return jsonify({"message": "User updated successfully"}), 200
 
 
@@ -94,7 +198,9 @@ def delete_user(user_id):
 
     try:
         db.session.delete(user)
+        listing_cache.bump()
         db.session.commit()
+        identity.invalidate(user_id)
         return jsonify({"message": "Admin deleted successfully"}), 200
 
     except IntegrityError:
@@ -113,11 +219,58 @@ def delete_user(user_id):
         )
     
 
+# Password hashing / login throttling counters
+@admin.route("/api/admin/auth_metrics", methods=["GET"])
+def get_auth_metrics():
+    return jsonify(hash_metrics.snapshot()), 200
+
+
+# -------------------------
+# Activity counts per day/owner/action (from rollups, not raw history)
+# -------------------------
+@admin.route("/api/admin/activity_stats", methods=["GET"])
+def get_activity_stats():
+    """?from=YYYY-MM-DD&to=YYYY-MM-DD&owner_id=N (all optional); a few minutes behind, more while a backlog is rolled up."""
+    try:
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+        owner_id = int(request.args["owner_id"]) if request.args.get("owner_id") else None
+    except ValueError:
+        return jsonify({"message": "Invalid 'from', 'to' or 'owner_id'"}), 400
+
+    # fold in at most one chunk per request; a larger backlog is left to the
+    # activity_retention job rather than held against this request
+    update_rollups(max_rows=ROLLUP_CHUNK)
+
+    q = ActivityDailyRollup.query
+    if start:
+        q = q.filter(ActivityDailyRollup.day >= start)
+    if end:
+        q = q.filter(ActivityDailyRollup.day <= end)
+    if owner_id is not None:
+        q = q.filter(ActivityDailyRollup.owner_id == owner_id)
+    rows = q.order_by(ActivityDailyRollup.day, ActivityDailyRollup.owner_id, ActivityDailyRollup.action).all()
+    return jsonify({"stats": [r.to_json() for r in rows]}), 200
+
+
 # -------------------------
 # NEW: Get all owner's activity feed
 # -------------------------
 @admin.route("/api/sdaowner/activities", methods=["GET"])
+@read_only
 def get_all_owners_activities():
-    activities = Activity.query.all()
-    json_activity = [a.to_json() for a in activities]
-    return jsonify({"activities": json_activity}), 200
\ No newline at end of file
+    # newest first, keyset-paginated: ?limit, ?cursor, ?since, ?stream=1 (see activity_feed.py)
+    try:
+        result = activity_feed(default_limit=100)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if not isinstance(result, dict):
+        return result  # streamed
+    return jsonify(result), 200
+
+
+# Event stream (SSE) of every owner's activity and listing changes
+@admin.route("/api/admin/events", methods=["GET"])
+def get_all_owners_events():
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    return sse_response(current_app, last_event_id=last_event_id)
@@ -1,12 +1,13 @@
 # sda_owner_routes.py
+import math
 import os
 import shutil
-import uuid
-from datetime import datetime
+import time
 from pathlib import Path
 
 from flask import Blueprint, request, jsonify, current_app, url_for
 from werkzeug.utils import secure_filename
+from sqlalchemy import func, insert
 
 from models import (
     db,
@@ -14,17 +15,77 @@ from models import (
     AccommodationFeature,
     AccommodationAmenity,
     AccommodationImage,
-    User,
+    Room,
     Image,
-    Activity,
+    ImageVariant,
+    Job,
 )
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from cache import listing_cache
+from streaming import stream_json_array, wants_stream
+from search import search_accommodation_ids
+from geo import bbox_around, cells_for_bbox, haversine_km
+import bulk_import
+from jobs import job_queue
+import image_variants
+import blobs
+from identity import current_identity
+from activity_log import activity_log
+from activity_feed import activity_feed
+from events import issue_stream_token, publish_after_commit, read_stream_token, sse_response
+from db_routing import read_only
 
 sda_owner = Blueprint("sda_owner", __name__)
 
 # Allowed image extensions
 ALLOWED_EXT = {"jpg", "jpeg", "png", "webp", "gif", "bmp"}
 
+# Public listing page size (default / hard cap)
+PUBLIC_PAGE_SIZE = 50
+PUBLIC_MAX_PAGE_SIZE = 100
+# listing statuses the public site shows as available
+AVAILABLE_STATUSES = ("available", "vacant")
+
+# Upper bound for proximity searches
+MAX_RADIUS_KM = 200
+
+
+def _apply_coordinates(accommodation, data):
+    """Set lat/lon from the payload, or geocode accommodation.location.
+
+    Explicit latitude/longitude (null clears them) take priority over the
+    configured geocoder. A geocoder miss or failure is logged and keeps the
+    existing coordinates. Returns True if coordinates were changed; raises
+    ValueError on invalid input.
+    """
+    if "latitude" in data or "longitude" in data:
+        lat, lon = data.get("latitude"), data.get("longitude")
+        if lat is None and lon is None:
+            accommodation.set_coordinates(None, None)
+            return True
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid coordinates")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError("Invalid coordinates")
+        accommodation.set_coordinates(lat, lon)
+        return True
+
+    geocoder = current_app.extensions.get("geocoder")
+    if geocoder is None:
+        return False
+    try:
+        coords = geocoder.geocode(accommodation.location)
+    except Exception:
+        current_app.logger.exception("Geocoding failed for %r", accommodation.location)
+        return False
+    if not coords:
+        current_app.logger.warning("No geocoding result for %r", accommodation.location)
+        return False
+    accommodation.set_coordinates(*coords)
+    return True
+
 
 def _get_owner_id():
     identity = get_jwt_identity()
@@ -37,7 +98,13 @@ def _get_owner_id():
         return int(identity)
     except (TypeError, ValueError):
         return None
-    
+
+
+def _get_owner_username(owner_id):
+    # from the token claims; no users-table round-trip unless the user changed
+    identity = current_identity()
+    return identity.username if identity else f"user_{owner_id}"
+
 
 # --------------------------------------------------------------------
 # Helper: generate absolute URL for any DB image path
@@ -68,17 +135,80 @@ def _public_image_url(rel_path):
 
 
 
+def _sync_links(model, target_col, accommodation_id, wanted):
+    """Make model's link rows for accommodation_id match the wanted target ids.
+
+    Only rows that differ are deleted/inserted (one DELETE ... IN and one
+    executemany INSERT at most). If the kept ids were merely reordered, the
+    links are rewritten so the stored order follows the request. Returns
+    None when nothing changed, otherwise the set of target ids removed.
+    """
+    target = getattr(model, target_col)
+    current = (
+        db.session.query(model.id, target)
+        .filter(model.accommodation_id == accommodation_id)
+        .order_by(model.id)
+        .all()
+    )
+    current_ids = [t for _, t in current]
+    wanted = list(dict.fromkeys(wanted))  # dedupe, keep order
+    if current_ids == wanted:
+        return None
+
+    current_set, wanted_set = set(current_ids), set(wanted)
+    kept_current_order = [t for t in current_ids if t in wanted_set]
+    kept_wanted_order = [t for t in wanted if t in current_set]
+    if kept_current_order != kept_wanted_order:
+        # reordered (or legacy duplicate links): rewrite the whole collection
+        drop = [link_id for link_id, _ in current]
+        add = wanted
+    else:
+        drop = [link_id for link_id, t in current if t not in wanted_set]
+        add = [t for t in wanted if t not in current_set]
+
+    if drop:
+        model.query.filter(model.id.in_(drop)).delete(synchronize_session=False)
+    if add:
+        db.session.execute(
+            insert(model),
+            [{"accommodation_id": accommodation_id, target_col: t} for t in add],
+        )
+    return current_set - wanted_set
+
+
+def _orphan_image_ids(image_ids):
+    """Subset of image_ids no longer referenced by any accommodation (one grouped query)."""
+    image_ids = {i for i in image_ids if i is not None}
+    if not image_ids:
+        return set()
+    referenced = {
+        image_id
+        for image_id, _ in db.session.query(AccommodationImage.image_id, func.count(AccommodationImage.id))
+        .filter(AccommodationImage.image_id.in_(image_ids))
+        .group_by(AccommodationImage.image_id)
+    }
+    return image_ids - referenced
+
+
+def _publish_listing_change(owner_id, accommodation_id, change, fields=None, status=None):
+    # pushed to dashboards over SSE once the caller commits
+    publish_after_commit("listing", {
+        "accommodationId": accommodation_id,
+        "change": change,
+        "fields": fields or [],
+        "status": status,
+    }, owner_id=owner_id)
+
+
 def _create_activity(owner_id, action, accommodation_id=None, accommodation_title=None, details=None):
-    act = Activity(
+    # recorded with the caller's commit (or write-behind after it; see activity_log.py)
+    return activity_log.record(
         owner_id=owner_id,
         action=action,
-        accommodation_id=accommodation_id if accommodation_id is not None else None,
+        accommodation_id=accommodation_id,
         accommodation_title=accommodation_title,
         details=details,
-        timestamp=datetime.utcnow(),
     )
-    db.session.add(act)
-    return act
 
 
 # -------------------------
@@ -86,13 +216,30 @@ def _create_activity(owner_id, action, accommodation_id=None, accommodation_titl
 # -------------------------
 @sda_owner.route("/api/sdaowner/get_accommodations", methods=["GET"])
 @jwt_required()
+@read_only
 def get_accommodations():
     owner_id = _get_owner_id()
     if not owner_id:
         return jsonify({"message": "Unauthorized"}), 401
 
-    accommodations = Accommodation.query.filter_by(owner_id=owner_id).all()
-    json_accommodations = [a.to_json() for a in accommodations]
+    try:
+        include_rooms = _bool_arg(request.args, "include_rooms", default=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    q = (
+        Accommodation.query
+        .options(*Accommodation.listing_options(include_rooms))
+        .filter_by(owner_id=owner_id)
+        .order_by(Accommodation.id.asc())
+    )
+    if wants_stream():
+        return stream_json_array(
+            "accommodations", q,
+            serialize_chunk=lambda rows: _listings_json(rows, include_rooms),
+        )
+
+    json_accommodations = _listings_json(q.all(), include_rooms)
     return jsonify({"accommodations": json_accommodations}), 200
 
 
@@ -106,8 +253,7 @@ def add_accommodation():
     if not owner_id:
         return jsonify({"message": "Unauthorized"}), 401
 
-    user = User.query.get(owner_id)
-    username = user.username if user else f"user_{owner_id}"
+    username = _get_owner_username(owner_id)
 
     data = request.get_json() or {}
 
@@ -139,8 +285,13 @@ def add_accommodation():
         owner_id=owner_id,
     )
 
+    try:
+        _apply_coordinates(new_accommodation, data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     db.session.add(new_accommodation)
-    db.session.commit()  # need id to link relationships
+    db.session.flush()  # need id to link relationships
 
     features = data.get("features", [])
     amenities = data.get("amenities", [])
@@ -158,25 +309,19 @@ def add_accommodation():
             AccommodationAmenity(accommodation_id=new_accommodation.id, amenity_id=amenity_id)
         )
 
-    uploads_root = current_app.config.get("UPLOAD_FOLDER")
     for image_id in images:
         db.session.add(
             AccommodationImage(accommodation_id=new_accommodation.id, image_id=image_id)
         )
-        img = Image.query.get(image_id)
-        if img:
-            try:
-                _move_image_to_accommodation(
-                    img=img,
-                    username=username,
-                    accommodation_id=new_accommodation.id,
-                    uploads_root=uploads_root,
-                )
-                db.session.add(img)  # mark updated image for commit
-            except Exception as e:
-                current_app.logger.exception("Failed to move image %s: %s", image_id, e)
 
-    db.session.commit()
+    # Moving the files into the accommodation folder happens in the background
+    job = None
+    if images:
+        job = job_queue.enqueue(
+            "move_images",
+            {"username": username, "moves": [[new_accommodation.id, i] for i in images]},
+            owner_id=owner_id,
+        )
 
     # Log activity
     _create_activity(
@@ -186,9 +331,95 @@ def add_accommodation():
         accommodation_title=new_accommodation.title,
         details="Created accommodation",
     )
+    _publish_listing_change(owner_id, new_accommodation.id, "created", status=new_accommodation.status)
+    listing_cache.bump()
+
     db.session.commit()
+    job_queue.notify()
 
-    return jsonify({"message": "Accommodation created successfully", "id": new_accommodation.id}), 201
+    return jsonify({
+        "message": "Accommodation created successfully",
+        "id": new_accommodation.id,
+        "jobId": job.id if job else None,
+    }), 201
+
+
+# -------------------------
+# Bulk import accommodations
+# -------------------------
+@sda_owner.route("/api/sdaowner/bulk_import", methods=["POST"])
+@jwt_required()
+def bulk_import_accommodations():
+    """Import many accommodations from CSV or NDJSON in one transaction.
+
+    Send the data as the request body (Content-Type text/csv or
+    application/x-ndjson) or as a "file" upload (.csv / .ndjson / .jsonl);
+    ?format=csv|ndjson overrides detection. Every row is validated first:
+    by default any invalid row aborts the import (400 with per-row errors);
+    with ?partial=1 valid rows are imported and the errors are reported,
+    unless no row is valid, which is a 400 as well.
+    """
+    owner_id = _get_owner_id()
+    if not owner_id:
+        return jsonify({"message": "Unauthorized"}), 401
+
+    file = request.files.get("file")
+    fmt = (request.args.get("format") or "").lower()
+    if file:
+        if not fmt:
+            ext = (file.filename or "").rsplit(".", 1)[-1].lower()
+            fmt = "ndjson" if ext in ("ndjson", "jsonl") else ext
+        raw = file.read()
+    else:
+        if not fmt:
+            mimetype = request.mimetype or ""
+            fmt = "csv" if "csv" in mimetype else "ndjson" if ("ndjson" in mimetype or "jsonl" in mimetype) else ""
+        raw = request.get_data()
+
+    try:
+        rows = bulk_import.parse_rows(raw.decode("utf-8-sig"), fmt)
+    except UnicodeDecodeError:
+        return jsonify({"message": "File must be UTF-8 encoded"}), 400
+    except bulk_import.BulkImportError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if not rows:
+        return jsonify({"message": "No rows to import"}), 400
+
+    try:
+        partial = _bool_arg(request.args, "partial", default=False)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    clean, errors = bulk_import.validate_rows(rows)
+    if errors and (not partial or not clean):
+        # with ?partial=1 and no valid row there is nothing to insert, cache-bust or announce
+        return jsonify({"message": "Validation failed; nothing imported", "errors": errors}), 400
+
+    job = None
+    try:
+        ids = bulk_import.insert_rows(owner_id, clean)
+        # linked images still live in the owner's staging folder; move them like add_accommodation does
+        moves = [[acc_id, image_id] for acc_id, r in zip(ids, clean) for image_id in r["images"]]
+        if moves:
+            job = job_queue.enqueue("move_images", {"username": _get_owner_username(owner_id), "moves": moves}, owner_id=owner_id)
+        publish_after_commit("listing", {"accommodationIds": ids, "change": "imported"}, owner_id=owner_id)
+        listing_cache.bump()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Bulk import failed for owner %s", owner_id)
+        return jsonify({"message": "Failed to import accommodations"}), 500
+
+    job_queue.notify()
+
+    return jsonify({
+        "message": f"Imported {len(ids)} accommodations",
+        "created": len(ids),
+        "ids": ids,
+        "errors": errors,
+        "jobId": job.id if job else None,
+    }), 201
 
 
 # -------------------------
@@ -218,6 +449,7 @@ def update_accommodation(accommodation_id):
         "status",
     ]
 
+    previous_location = accommodation.location
     changed_fields = []
     for field in updatable_fields:
         if field in data:
@@ -228,61 +460,32 @@ def update_accommodation(accommodation_id):
         accommodation.accommodation_type = data["accommodationType"]
         changed_fields.append("accommodationType")
 
-    # Update features
+    # the form sends every field on save; only a new location is worth a geocoder round trip
+    location_changed = "location" in data and data["location"] != previous_location
+    if location_changed or "latitude" in data or "longitude" in data:
+        try:
+            if _apply_coordinates(accommodation, data):
+                changed_fields.append("coordinates")
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+    # Link collections: only the rows that actually changed are touched
     if "features" in data:
-        AccommodationFeature.query.filter_by(accommodation_id=accommodation_id).delete()
-        for feature_id in data["features"]:
-            db.session.add(
-                AccommodationFeature(accommodation_id=accommodation_id, feature_id=feature_id)
-            )
-        changed_fields.append("features")
+        if _sync_links(AccommodationFeature, "feature_id", accommodation_id, data["features"]) is not None:
+            changed_fields.append("features")
 
-    # Update amenities
     if "amenities" in data:
-        AccommodationAmenity.query.filter_by(accommodation_id=accommodation_id).delete()
-        for amenity_id in data["amenities"]:
-            db.session.add(
-                AccommodationAmenity(accommodation_id=accommodation_id, amenity_id=amenity_id)
-            )
-        changed_fields.append("amenities")
+        if _sync_links(AccommodationAmenity, "amenity_id", accommodation_id, data["amenities"]) is not None:
+            changed_fields.append("amenities")
 
-    # Replace images: ensure we remove old links and optionally clean orphaned images
     if "images" in data:
-        # Gather previous image ids BEFORE deletion to allow safe orphan cleanup
-        prev_links = AccommodationImage.query.filter_by(accommodation_id=accommodation_id).all()
-        prev_image_ids = [li.image_id for li in prev_links if li.image_id is not None]
-
-        # Delete previous links
-        AccommodationImage.query.filter_by(accommodation_id=accommodation_id).delete(synchronize_session=False)
-
-        # Add new links
-        for image_id in data["images"]:
-            db.session.add(
-                AccommodationImage(accommodation_id=accommodation_id, image_id=image_id)
-            )
-        changed_fields.append("images")
-
-        # Clean up orphan images that were previously linked to this accommodation and now have zero references
-        for img_id in prev_image_ids:
-            if img_id is None:
-                continue
-            refs_other = AccommodationImage.query.filter(
-                AccommodationImage.image_id == img_id
-            ).count()
-            if refs_other == 0:
-                img = Image.query.get(img_id)
-                if img:
-                    try:
-                        db.session.delete(img)
-                    except Exception:
-                        current_app.logger.exception("Failed to delete orphan Image DB row id=%s", img_id)
-
-    try:
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        current_app.logger.exception("Failed to commit update for accommodation %s", accommodation_id)
-        return jsonify({"message": "Failed to update accommodation"}), 500
+        removed = _sync_links(AccommodationImage, "image_id", accommodation_id, data["images"])
+        if removed is not None:
+            changed_fields.append("images")
+            # Clean up images that were unlinked here and now have zero references
+            paths = blobs.delete_images(_orphan_image_ids(removed))
+            if paths:
+                _enqueue_file_deletes(paths, owner_id)
 
     # Activity log
     details = "Updated fields: " + (", ".join(changed_fields) if changed_fields else "none")
@@ -293,7 +496,16 @@ def update_accommodation(accommodation_id):
         accommodation_title=accommodation.title,
         details=details,
     )
-    db.session.commit()
+    _publish_listing_change(owner_id, accommodation.id, "updated", changed_fields, accommodation.status)
+
+    listing_cache.bump()
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Failed to commit update for accommodation %s", accommodation_id)
+        return jsonify({"message": "Failed to update accommodation"}), 500
+    job_queue.notify()
 
     return jsonify({"message": "Accommodation updated successfully"}), 200
 
@@ -312,71 +524,40 @@ def delete_accommodation(accommodation_id):
     if not accommodation:
         return jsonify({"message": "Accommodation not found"}), 404
 
-    user = User.query.get(owner_id)
-    username = user.username if user else f"user_{owner_id}"
+    username = _get_owner_username(owner_id)
     title = accommodation.title
 
-    uploads_root = current_app.config.get("UPLOAD_FOLDER")
-    if uploads_root:
-        acc_folder_abs = os.path.join(uploads_root, username, str(accommodation_id))
-        try:
-            if os.path.isdir(acc_folder_abs):
-                shutil.rmtree(acc_folder_abs)
-                current_app.logger.info("Removed accommodation folder: %s", acc_folder_abs)
-        except Exception:
-            current_app.logger.exception("Failed to remove accommodation folder %s", acc_folder_abs)
-
-    # 1) Collect linked image ids BEFORE deleting linking rows
+    # 1) Remove linking rows, then 2) delete images nothing else references
+    #    (dropping their blob references) in the same transaction
     try:
-        acc_images = AccommodationImage.query.filter_by(accommodation_id=accommodation_id).all()
-        image_ids = [ai.image_id for ai in acc_images if ai.image_id is not None]
-
-        # For each image, count references in OTHER accommodations (exclude current)
-        image_ref_counts = {}
-        for img_id in image_ids:
-            refs_other = AccommodationImage.query.filter(
-                AccommodationImage.image_id == img_id,
-                AccommodationImage.accommodation_id != accommodation_id
-            ).count()
-            image_ref_counts[img_id] = refs_other
-
-        # Now delete linking rows for this accommodation
+        image_ids = [
+            image_id for (image_id,) in
+            db.session.query(AccommodationImage.image_id).filter_by(accommodation_id=accommodation_id)
+        ]
+
         AccommodationFeature.query.filter_by(accommodation_id=accommodation_id).delete(synchronize_session=False)
         AccommodationAmenity.query.filter_by(accommodation_id=accommodation_id).delete(synchronize_session=False)
         AccommodationImage.query.filter_by(accommodation_id=accommodation_id).delete(synchronize_session=False)
 
-        db.session.commit()  # commit link deletions
-    except Exception:
-        db.session.rollback()
-        current_app.logger.exception("Failed to remove linking rows for accommodation %s", accommodation_id)
-        # continue — try to delete accommodation below
-
-    # 2) Delete orphan Image rows only if no other references exist
-    try:
-        for img_id, refs_other in image_ref_counts.items():
-            if refs_other == 0:
-                img = Image.query.get(img_id)
-                if img:
-                    try:
-                        db.session.delete(img)
-                    except Exception:
-                        current_app.logger.exception("Failed to delete Image DB row id=%s", img_id)
+        paths = blobs.delete_images(_orphan_image_ids(image_ids))
+        if paths:
+            _enqueue_file_deletes(paths, owner_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
-        current_app.logger.exception("Error cleaning up Image rows for accommodation %s", accommodation_id)
+        current_app.logger.exception("Failed to remove linking rows/images for accommodation %s", accommodation_id)
+        # continue — try to delete accommodation below
 
-    # 3) Finally delete the accommodation row itself
+    # 3) Finally delete the accommodation row itself; the upload folder is
+    #    removed by a background job and the activity (no FK on deleted rows)
+    #    logged, both in the same transaction
     try:
         db.session.delete(accommodation)
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        current_app.logger.exception("Failed to delete accommodation DB row id=%s", accommodation_id)
-        return jsonify({"message": "Failed to delete accommodation"}), 500
-
-    # 4) Log activity (no FK on deleted rows)
-    try:
+        job = job_queue.enqueue(
+            "remove_upload_dir",
+            {"path": os.path.join(username, str(accommodation_id))},
+            owner_id=owner_id,
+        )
         _create_activity(
             owner_id=owner_id,
             action="delete",
@@ -384,12 +565,16 @@ def delete_accommodation(accommodation_id):
             accommodation_title=title,
             details="Deleted accommodation",
         )
+        _publish_listing_change(owner_id, accommodation_id, "deleted")
+        listing_cache.bump()
         db.session.commit()
     except Exception:
-        current_app.logger.exception("Failed to create activity log for deletion of accommodation %s", accommodation_id)
         db.session.rollback()
+        current_app.logger.exception("Failed to delete accommodation DB row id=%s", accommodation_id)
+        return jsonify({"message": "Failed to delete accommodation"}), 500
+    job_queue.notify()
 
-    return jsonify({"message": "Accommodation deleted successfully"}), 200
+    return jsonify({"message": "Accommodation deleted successfully", "jobId": job.id}), 200
 
 
 def _move_image_to_accommodation(img: Image, username: str, accommodation_id: int, uploads_root: str):
@@ -397,6 +582,9 @@ def _move_image_to_accommodation(img: Image, username: str, accommodation_id: in
     Move an Image record's file into uploads/<username>/<accommodation_id>/images/
     Update img.name (relative path stored in DB) if moved. If file missing, still update DB name to expected path.
     """
+    if img.blob_id is not None:
+        return  # content-addressed: the shared blob never moves
+
     current_rel = img.name or ""
     current_basename = os.path.basename(current_rel)
 
@@ -426,6 +614,144 @@ def _move_image_to_accommodation(img: Image, username: str, accommodation_id: in
         current_app.logger.exception("Error moving image %s -> %s", current_abs, dest_abs)
         img.name = (Path("uploads") / username / str(accommodation_id) / "images" / current_basename).as_posix()
 
+    # Derived variants sit next to the original and follow it
+    for variant in img.variants:
+        _move_upload_file(variant, dest_dir_abs, uploads_root)
+
+
+def _move_upload_file(row, dest_dir_abs, uploads_root):
+    """Move the file behind a row with a ``name`` upload path into dest_dir_abs and update row.name."""
+    basename = os.path.basename(row.name)
+    src_abs = _upload_abs_path(row.name, uploads_root)
+    dest_abs = os.path.join(dest_dir_abs, basename)
+    try:
+        if os.path.abspath(src_abs) != os.path.abspath(dest_abs) and os.path.exists(src_abs):
+            shutil.move(src_abs, dest_abs)
+    except Exception:
+        current_app.logger.exception("Error moving file %s -> %s", src_abs, dest_abs)
+    rel_dir = os.path.relpath(dest_dir_abs, uploads_root)
+    row.name = (Path("uploads") / rel_dir / basename).as_posix()
+
+
+def _upload_abs_path(rel_path, uploads_root):
+    """Absolute path for a path relative to UPLOAD_FOLDER (optionally 'uploads/'-prefixed).
+
+    Raises ValueError if it would escape the uploads root.
+    """
+    rel = (rel_path or "").lstrip("/")
+    if rel.startswith("uploads/"):
+        rel = rel[len("uploads/"):]
+    root = os.path.abspath(uploads_root)
+    target = os.path.abspath(os.path.join(root, rel))
+    if target == root or os.path.commonpath([root, target]) != root:
+        raise ValueError(f"Refusing to touch path outside uploads: {rel_path!r}")
+    return target
+
+
+@job_queue.handler("move_images")
+def _move_images_job(payload):
+    """Move linked images into uploads/<username>/<accommodation_id>/images/."""
+    uploads_root = current_app.config.get("UPLOAD_FOLDER")
+    moves = payload.get("moves") or []
+    images = {img.id: img for img in Image.query.filter(Image.id.in_({i for _, i in moves}))}
+    for accommodation_id, image_id in moves:
+        img = images.get(image_id)
+        if img:
+            _move_image_to_accommodation(
+                img=img,
+                username=payload["username"],
+                accommodation_id=accommodation_id,
+                uploads_root=uploads_root,
+            )
+    # listings serialize image paths
+    listing_cache.bump()
+    db.session.commit()
+
+
+@job_queue.handler("image_variants")
+def _image_variants_job(payload):
+    """Render thumbnail/WebP variants (in the process pool, unless IMAGE_WORKERS is 0) and record them on the Image."""
+    if not image_variants.enabled():
+        return
+    uploads_root = current_app.config.get("UPLOAD_FOLDER")
+    img = db.session.get(Image, payload["image_id"])
+    if img is None:
+        return
+    src_rel = img.name
+    src_abs = _upload_abs_path(src_rel, uploads_root)
+    db.session.rollback()  # don't hold a transaction open while rendering
+
+    results = image_variants.render(src_abs, current_app.config.get("IMAGE_WORKERS", 2))
+
+    img = db.session.get(Image, payload["image_id"])
+    rendered_dir = os.path.dirname(src_abs)
+    if img is None:
+        for r in results:
+            path = os.path.join(rendered_dir, os.path.basename(image_variants.variant_rel_path(src_rel, r["size"])))
+            if os.path.isfile(path):
+                os.remove(path)
+        return
+
+    existing = {(v.size, v.format): v for v in img.variants}
+    for r in results:
+        variant = existing.get((r["size"], r["format"]))
+        if variant is None:
+            variant = ImageVariant(image=img, size=r["size"], format=r["format"])
+            db.session.add(variant)
+        variant.name = image_variants.variant_rel_path(src_rel, r["size"])
+        variant.width, variant.height, variant.bytes = r["width"], r["height"], r["bytes"]
+        if img.name != src_rel:
+            # the original was moved while we were rendering; follow it
+            _move_upload_file(variant, os.path.dirname(_upload_abs_path(img.name, uploads_root)), uploads_root)
+    db.session.commit()
+
+
+@job_queue.handler("remove_upload_dir")
+def _remove_upload_dir_job(payload):
+    target = _upload_abs_path(payload["path"], current_app.config.get("UPLOAD_FOLDER"))
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+        current_app.logger.info("Removed upload folder: %s", target)
+
+
+def _enqueue_file_deletes(paths, owner_id):
+    # queued_at lets the job spot blob files that a later upload wrote again
+    return job_queue.enqueue("delete_files", {"paths": paths, "queued_at": time.time()}, owner_id=owner_id)
+
+
+@job_queue.handler("delete_files")
+def _delete_files_job(payload):
+    uploads_root = current_app.config.get("UPLOAD_FOLDER")
+    paths = payload.get("paths") or []
+    queued_at = payload.get("queued_at")
+    # the same content may have been uploaded again since the delete was queued
+    live = blobs.referenced_paths(paths)
+    for rel_path in paths:
+        if rel_path in live:
+            continue
+        target = _upload_abs_path(rel_path, uploads_root)
+        if not os.path.isfile(target):
+            continue
+        if queued_at is not None and os.path.getmtime(target) >= queued_at:
+            continue  # rewritten by an upload whose Blob row is not committed yet
+        os.remove(target)
+
+
+# -------------------------
+# Background job status
+# -------------------------
+@sda_owner.route("/api/sdaowner/jobs/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    owner_id = _get_owner_id()
+    if not owner_id:
+        return jsonify({"message": "Unauthorized"}), 401
+
+    job = Job.query.filter_by(id=job_id, owner_id=owner_id).first()
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+    return jsonify({"job": job.to_json()}), 200
+
 
 # -------------------------
 # Upload image
@@ -441,9 +767,6 @@ def upload_image():
     if not file:
         return jsonify({"message": "No file provided"}), 400
 
-    user = User.query.get(owner_id)
-    username = user.username if user else f"user_{owner_id}"
-
     orig_filename = secure_filename(os.path.basename(file.filename))
     if not orig_filename:
         return jsonify({"message": "Invalid filename"}), 400
@@ -472,30 +795,36 @@ def upload_image():
     if not uploads_root:
         return jsonify({"message": "Server misconfiguration: UPLOAD_FOLDER not set"}), 500
 
-    # Create unique filename to avoid collisions
-    unique_name = f"{uuid.uuid4().hex}_{orig_filename}"
-
-    if accommodation_id:
-        user_folder_abs = os.path.join(uploads_root, username, str(accommodation_id), "images")
-        os.makedirs(user_folder_abs, exist_ok=True)
-        rel_path = (Path("uploads") / username / str(accommodation_id) / "images" / unique_name).as_posix()
-    else:
-        user_folder_abs = os.path.join(uploads_root, username)
-        os.makedirs(user_folder_abs, exist_ok=True)
-        rel_path = (Path("uploads") / username / unique_name).as_posix()
-
-    abs_path = os.path.join(user_folder_abs, unique_name)
-
+    # Store by content hash; a repeat upload only gains a reference to the existing blob
     try:
-        file.save(abs_path)
+        blob, created = blobs.store_upload(file.stream, ext, uploads_root)
     except Exception:
-        current_app.logger.exception("Failed to save uploaded file to %s", abs_path)
+        db.session.rollback()
+        current_app.logger.exception("Failed to store uploaded file %s", orig_filename)
         return jsonify({"message": "Failed to save file"}), 500
 
-    # Store DB record
-    img = Image(name=rel_path)
+    rel_path = blob.name
+    img = Image(name=rel_path, blob_id=blob.id)
     db.session.add(img)
+
+    # Thumbnails / WebP variants: reuse those already rendered for this blob,
+    # otherwise render them in the background
+    variants_job = None
+    existing_variants = {} if created else {
+        (v.size, v.format): v
+        for v in ImageVariant.query.join(Image).filter(Image.blob_id == blob.id)
+    }
+    for v in existing_variants.values():
+        db.session.add(ImageVariant(
+            image=img, size=v.size, format=v.format, name=v.name,
+            width=v.width, height=v.height, bytes=v.bytes,
+        ))
+    if not existing_variants and image_variants.enabled():
+        db.session.flush()
+        variants_job = job_queue.enqueue("image_variants", {"image_id": img.id}, owner_id=owner_id, max_attempts=3)
+    listing_cache.bump()
     db.session.commit()
+    job_queue.notify()
 
     # Build public URL if app serves uploads via a route named 'serve_uploads'
     try:
@@ -503,49 +832,367 @@ def upload_image():
     except Exception:
         public_url = None
 
-    return jsonify({"id": img.id, "path": rel_path, "url": public_url}), 201
+    return jsonify({
+        "id": img.id,
+        "path": rel_path,
+        "url": public_url,
+        "deduplicated": not created,
+        "variantsJobId": variants_job.id if variants_job else None,
+    }), 201
 
 
 # -------------------------
 # PUBLIC: Get ALL accommodations (no owner filter)
 # -------------------------
 @sda_owner.route("/api/public/accommodations", methods=["GET"])
+@read_only
 def get_all_accommodations():
-    accommodations = Accommodation.query.all()
+    """Filtered, keyset-paginated public listing.
 
-    out = []
-    for a in accommodations:
-        j = a.to_json()
+    Query params (all optional):
+      location, gender, accommodation_type, min_capacity, bedrooms,
+      bathrooms, available (true/false, by listing status),
+      has_vacancy (true/false, by rooms), include_rooms (default true),
+      cursor (last id of previous page), limit.
+    Response includes ``nextCursor`` (null on the last page).
 
-        imgs = j.get("images", [])
-        if isinstance(imgs, str):
-            j["images"] = [_public_image_url(imgs)]
-        else:
-            j["images"] = [_public_image_url(p) for p in imgs]
+    With ``stream=1`` the whole filtered result (from ``cursor`` on) is
+    streamed instead of paged; streamed responses are not cached.
+
+    Bodies are cached per query string and data version, and carry an ETag
+    so repeat requests can be answered with 304 after a single version
+    lookup instead of rebuilding the page.
+    """
+    if wants_stream():
+        try:
+            q = _public_listing_query(request.args)
+            cursor = _int_arg(request.args, "cursor")
+            include_rooms = _bool_arg(request.args, "include_rooms", default=True)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        if cursor:
+            q = q.filter(Accommodation.id > cursor)
+        q = q.options(*Accommodation.listing_options(include_rooms)).order_by(Accommodation.id.asc())
+        return stream_json_array(
+            "accommodations", q,
+            serialize_chunk=lambda rows: _listings_json(rows, include_rooms, public=True),
+        )
+
+    cache_key = (request.host_url, tuple(sorted(request.args.items(multi=True))))
+    version = listing_cache.current_version()
+    cached = listing_cache.get(cache_key, version)
+    if cached:
+        etag, body = cached
+        return _cached_json_response(etag, body)
+
+    try:
+        q = _public_listing_query(request.args)
+        cursor = _int_arg(request.args, "cursor")
+        limit = _int_arg(request.args, "limit") or PUBLIC_PAGE_SIZE
+        include_rooms = _bool_arg(request.args, "include_rooms", default=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    limit = max(1, min(limit, PUBLIC_MAX_PAGE_SIZE))
+
+    if cursor:
+        q = q.filter(Accommodation.id > cursor)
+
+    # fetch one extra row to know whether another page exists
+    accommodations = (
+        q.options(*Accommodation.listing_options(include_rooms))
+        .order_by(Accommodation.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(accommodations) > limit
+    accommodations = accommodations[:limit]
+
+    out = _listings_json(accommodations, include_rooms, public=True)
+
+    next_cursor = accommodations[-1].id if (has_more and accommodations) else None
+    body = current_app.json.dumps({"accommodations": out, "nextCursor": next_cursor}).encode("utf-8")
+    etag = listing_cache.set(cache_key, body, version, current_app.config.get("LISTING_CACHE_TTL", 30))
+    return _cached_json_response(etag, body)
 
-        out.append(j)
+
+# -------------------------
+# PUBLIC: Keyword search
+# -------------------------
+@sda_owner.route("/api/public/accommodations/search", methods=["GET"])
+@read_only
+def search_accommodations():
+    """Ranked full-text search over title, location, type and description.
+
+    Query params: q (required), page (1-based, default 1), limit.
+    Response includes ``nextPage`` (null on the last page).
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"message": "Missing search query"}), 400
+
+    try:
+        page = max(1, _int_arg(request.args, "page") or 1)
+        limit = _int_arg(request.args, "limit") or PUBLIC_PAGE_SIZE
+        include_rooms = _bool_arg(request.args, "include_rooms", default=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    limit = max(1, min(limit, PUBLIC_MAX_PAGE_SIZE))
+
+    ids = search_accommodation_ids(q, limit + 1, (page - 1) * limit)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+
+    by_id = {
+        a.id: a
+        for a in Accommodation.query
+        .options(*Accommodation.listing_options(include_rooms))
+        .filter(Accommodation.id.in_(ids))
+    } if ids else {}
+    accommodations = [by_id[i] for i in ids if i in by_id]
+
+    return jsonify({
+        "accommodations": _listings_json(accommodations, include_rooms, public=True),
+        "page": page,
+        "nextPage": page + 1 if has_more else None,
+    }), 200
+
+
+# -------------------------
+# PUBLIC: Proximity search
+# -------------------------
+@sda_owner.route("/api/public/accommodations/nearby", methods=["GET"])
+@read_only
+def nearby_accommodations():
+    """Listings within radius_km of (lat, lon), nearest first, or inside a bbox.
+
+    Query params: lat, lon, radius_km (default 10, max MAX_RADIUS_KM)
+    or bbox=min_lat,min_lon,max_lat,max_lon; limit; include_rooms.
+    Candidates come from the indexed grid cells overlapping the box, or from
+    a range scan on the latitude index when the box spans too many cells;
+    exact distances are computed only for those.
+    """
+    args = request.args
+    try:
+        limit = max(1, min(_int_arg(args, "limit") or PUBLIC_PAGE_SIZE, PUBLIC_MAX_PAGE_SIZE))
+        include_rooms = _bool_arg(args, "include_rooms", default=True)
+        if args.get("bbox"):
+            try:
+                box = tuple(float(v) for v in args["bbox"].split(","))
+            except ValueError:
+                box = ()
+            if len(box) != 4 or not all(map(math.isfinite, box)) or box[0] > box[2] or box[1] > box[3]:
+                raise ValueError("Invalid value for 'bbox'")
+            if not (-90 <= box[0] and box[2] <= 90 and -180 <= box[1] and box[3] <= 180):
+                raise ValueError("bbox must lie within latitude -90..90 and longitude -180..180")
+            center = radius_km = None
+        else:
+            lat, lon = _float_arg(args, "lat"), _float_arg(args, "lon")
+            if lat is None or lon is None:
+                raise ValueError("lat and lon (or bbox) are required")
+            if not -90 <= lat <= 90:
+                raise ValueError("lat must be between -90 and 90")
+            if not -180 <= lon <= 180:
+                raise ValueError("lon must be between -180 and 180")
+            radius_km = _float_arg(args, "radius_km") or 10.0
+            if not 0 < radius_km <= MAX_RADIUS_KM:
+                raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+            center = (lat, lon)
+            box = bbox_around(lat, lon, radius_km)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    q = db.session.query(Accommodation.id, Accommodation.latitude, Accommodation.longitude).filter(
+        Accommodation.latitude.between(box[0], box[2]),
+        Accommodation.longitude.between(box[1], box[3]),
+    )
+    cells = cells_for_bbox(*box)
+    if cells is not None:
+        q = q.filter(Accommodation.geo_cell.in_(cells))
+
+    if center:
+        hits = []
+        for acc_id, lat, lon in q:
+            d = haversine_km(center[0], center[1], lat, lon)
+            if d <= radius_km:
+                hits.append((d, acc_id))
+        hits.sort()
+    else:
+        hits = sorted((0.0, acc_id) for acc_id, _, _ in q)
+    hits = hits[:limit]
+
+    ids = [acc_id for _, acc_id in hits]
+    by_id = {
+        a.id: a
+        for a in Accommodation.query
+        .options(*Accommodation.listing_options(include_rooms))
+        .filter(Accommodation.id.in_(ids))
+    } if ids else {}
+    accommodations = [by_id[i] for i in ids if i in by_id]
+
+    out = _listings_json(accommodations, include_rooms, public=True)
+    if center:
+        distances = {acc_id: d for d, acc_id in hits}
+        for j in out:
+            j["distanceKm"] = round(distances[j["id"]], 2)
 
     return jsonify({"accommodations": out}), 200
 
 
+def _listings_json(accommodations, include_rooms, public=False):
+    """Serialize a batch of listings.
+
+    Without rooms, vacancy counts for the whole batch come from one GROUP BY
+    over rooms instead of loading every Room row.
+    """
+    counts = {} if include_rooms else Accommodation.room_counts([a.id for a in accommodations])
+    if public:
+        return [_public_listing_json(a, include_rooms, counts.get(a.id)) for a in accommodations]
+    return [a.to_json(include_rooms, counts.get(a.id)) for a in accommodations]
+
+
+def _public_listing_json(a, include_rooms=True, room_counts=None):
+    j = a.to_json(include_rooms, room_counts)
+
+    imgs = j.get("images", [])
+    if isinstance(imgs, str):
+        j["images"] = [_public_image_url(imgs)]
+    else:
+        j["images"] = [_public_image_url(p) for p in imgs]
+
+    return j
+
+
+def _cached_json_response(etag, body):
+    resp = current_app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    # clients may store it but must revalidate with If-None-Match
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+
+def _int_arg(args, name):
+    """Parse an optional integer query param; raises ValueError with a client-facing message."""
+    raw = args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}'")
+
+
+def _float_arg(args, name):
+    """Parse an optional float query param; raises ValueError with a client-facing message."""
+    raw = args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}'")
+    if value != value or value in (float("inf"), float("-inf")):
+        raise ValueError(f"Invalid value for '{name}'")
+    return value
+
+
+def _bool_arg(args, name, default=None):
+    """Parse an optional boolean query param (1/0, true/false, yes/no)."""
+    raw = (args.get(name) or "").strip().lower()
+    if not raw:
+        return default
+    if raw in ("1", "true", "yes"):
+        return True
+    if raw in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Invalid value for '{name}'")
+
+
+def _public_listing_query(args):
+    """Build the filtered (unordered, unpaginated) Accommodation query for the public listing."""
+    q = Accommodation.query
+
+    location = (args.get("location") or "").strip()
+    if location:
+        q = q.filter(Accommodation.location.ilike(f"%{location}%"))
+
+    gender = (args.get("gender") or "").strip()
+    if gender:
+        q = q.filter(func.lower(Accommodation.gender) == gender.lower())
+
+    accommodation_type = (args.get("accommodation_type") or "").strip()
+    if accommodation_type:
+        q = q.filter(func.lower(Accommodation.accommodation_type) == accommodation_type.lower())
+
+    min_capacity = _int_arg(args, "min_capacity")
+    if min_capacity is not None:
+        q = q.filter(Accommodation.capacity >= min_capacity)
+
+    bedrooms = _int_arg(args, "bedrooms")
+    if bedrooms is not None:
+        q = q.filter(Accommodation.bedrooms == bedrooms)
+
+    bathrooms = _int_arg(args, "bathrooms")
+    if bathrooms is not None:
+        q = q.filter(Accommodation.bathrooms == bathrooms)
+
+    available = _bool_arg(args, "available")
+    if available is not None:
+        is_available = func.lower(Accommodation.status).in_(AVAILABLE_STATUSES)
+        q = q.filter(is_available if available else ~is_available)
+
+    has_vacancy = _bool_arg(args, "has_vacancy")
+    if has_vacancy is True:
+        q = q.filter(Accommodation.rooms.any(Room.status == "vacant"))
+    elif has_vacancy is False:
+        q = q.filter(~Accommodation.rooms.any(Room.status == "vacant"))
+
+    return q
+
+
 @sda_owner.route("/api/sda_owner/activities", methods=['GET'])
 @jwt_required()
+@read_only
 def get_owner_activities():
     owner_id = _get_owner_id()
     if not owner_id:
         return jsonify({"message": "Unauthorized"}), 401
 
-    # optionally accept a limit query param
+    # newest first, keyset-paginated: ?limit, ?cursor, ?since (see activity_feed.py)
     try:
-        limit = int(request.args.get("limit") or 0)
-    except ValueError:
-        limit = 0
+        result = activity_feed(owner_id=owner_id)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if not isinstance(result, dict):
+        return result  # streamed
+    return jsonify(result), 200
 
-    q = Activity.query.filter_by(owner_id=owner_id).order_by(Activity.timestamp.desc())
-    if limit and limit > 0:
-        q = q.limit(limit)
 
-    activities = q.all()
-    json_activity = [a.to_json() for a in activities]
+# -------------------------
+# Owner event stream (SSE): own activity + listing changes as they commit
+# -------------------------
+@sda_owner.route("/api/sda_owner/events/token", methods=["POST"])
+@jwt_required()
+def owner_events_token():
+    owner_id = _get_owner_id()
+    if not owner_id:
+        return jsonify({"message": "Unauthorized"}), 401
+    return jsonify({
+        "token": issue_stream_token(current_app, owner_id),
+        "expiresIn": current_app.config.get("SSE_TOKEN_SECONDS", 60),
+    }), 200
+
+
+@sda_owner.route("/api/sda_owner/events", methods=["GET"])
+@jwt_required(optional=True)
+def owner_events():
+    # EventSource can't set headers: it passes ?token=<stream token> from
+    # POST /api/sda_owner/events/token instead of the access token
+    token = request.args.get("token")
+    owner_id = read_stream_token(current_app, token) if token else _get_owner_id()
+    if not owner_id:
+        return jsonify({"message": "Unauthorized"}), 401
 
-    return jsonify({"activities": json_activity}), 200
\ No newline at end of file
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    return sse_response(current_app, owner_id=owner_id, last_event_id=last_event_id)
@@ -6,10 +6,11 @@ from flask_jwt_extended import (
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
-    get_jwt,
 )
 from datetime import timedelta
 from models import db, User
+from identity import current_identity
+from passwords import HashingBusy, check_password, login_limiter
 
 user = Blueprint('user', __name__)
 
@@ -17,19 +18,33 @@ user = Blueprint('user', __name__)
 # LOGIN
 @user.route("/api/auth/login", methods=["POST"])
 def login():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
 
     username = data.get("username")
     password = data.get("password")
 
     if not username or not password:
         return jsonify({"message": "Missing username or password"}), 400
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({"message": "Username and password must be strings"}), 400
+
+    retry_after = login_limiter.check(username, request.remote_addr)
+    if retry_after:
+        return _retry_later("Too many login attempts, please try again later", 429, retry_after)
 
     user_obj = User.query.filter_by(username=username).first()
+    # don't hold a pooled connection while the hash runs
+    if user_obj:
+        db.session.expunge(user_obj)
+    db.session.rollback()
 
-    # Assuming your User model has check_password method
-    if not user_obj or not user_obj.check_password(password):
-        return jsonify({"message": "Invalid credentials"}), 401
+    try:
+        if not user_obj or not check_password(user_obj.password_hash, password):
+            return jsonify({"message": "Invalid credentials"}), 401
+    except HashingBusy:
+        return _retry_later("Server busy, please try again shortly", 503, 1)
 
     # identity MUST be a string for PyJWT
     identity = str(user_obj.id)
@@ -66,20 +81,28 @@ def login():
     }), 200
 
 
+def _retry_later(message, status, seconds):
+    resp = jsonify({"message": message})
+    resp.headers["Retry-After"] = str(max(1, int(seconds + 0.999)))
+    return resp, status
+
+
 # REFRESH TOKEN
 @user.route("/api/auth/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh():
     # identity is the string user id
     identity = get_jwt_identity()
-    # existing claims on the refresh token
-    claims = get_jwt()
+    # claims from the refresh token, or the current row if the user changed since it was issued
+    current = current_identity()
+    if current is None:
+        return jsonify({"message": "User not found"}), 401
 
     additional_claims = {
-        "role": claims.get("role"),
-        "name": claims.get("name"),
-        "username": claims.get("username"),
-        "status": claims.get("status"),
+        "role": current.role,
+        "name": current.name,
+        "username": current.username,
+        "status": current.status,
     }
 
     new_access_token = create_access_token(
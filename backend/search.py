@@ -0,0 +1,110 @@
+# backend/search.py
+"""Keyword search over accommodations.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers;
+Postgres uses a generated tsvector column with a GIN index. Either way the
+index follows every INSERT/UPDATE/DELETE on accommodations, including the
+ones made by add_accommodation / update_accommodation / delete_accommodation,
+without the routes having to do anything.
+"""
+import re
+
+from sqlalchemy import inspect, text
+
+from models import db
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS accommodations_fts USING fts5(
+        title, location, accommodation_type, description,
+        content='accommodations', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodations_fts_ai AFTER INSERT ON accommodations BEGIN
+        INSERT INTO accommodations_fts(rowid, title, location, accommodation_type, description)
+        VALUES (new.id, new.title, new.location, new.accommodation_type, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodations_fts_ad AFTER DELETE ON accommodations BEGIN
+        INSERT INTO accommodations_fts(accommodations_fts, rowid, title, location, accommodation_type, description)
+        VALUES ('delete', old.id, old.title, old.location, old.accommodation_type, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodations_fts_au AFTER UPDATE ON accommodations BEGIN
+        INSERT INTO accommodations_fts(accommodations_fts, rowid, title, location, accommodation_type, description)
+        VALUES ('delete', old.id, old.title, old.location, old.accommodation_type, old.description);
+        INSERT INTO accommodations_fts(rowid, title, location, accommodation_type, description)
+        VALUES (new.id, new.title, new.location, new.accommodation_type, new.description);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE accommodations ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(accommodation_type, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_accommodations_search_vector ON accommodations USING GIN (search_vector)",
+]
+
+
+def ensure_search_index(engine):
+    """Create the FTS table/column and its sync machinery if missing (idempotent)."""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for ddl in _POSTGRES_DDL:
+                conn.exec_driver_sql(ddl)
+        return
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    is_new = "accommodations_fts" not in inspect(engine).get_table_names()
+    with engine.begin() as conn:
+        for ddl in _SQLITE_DDL:
+            conn.exec_driver_sql(ddl)
+        if is_new:
+            # backfill rows that existed before the index did
+            conn.exec_driver_sql("INSERT INTO accommodations_fts(accommodations_fts) VALUES ('rebuild')")
+
+
+def _terms(q):
+    return re.findall(r"\w+", q or "")[:16]
+
+
+def search_accommodation_ids(q, limit, offset=0):
+    """Ids of accommodations matching every word of q (prefix match), best first."""
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    params = {"limit": limit, "offset": offset}
+    if db.engine.dialect.name == "postgresql":
+        params["tsq"] = " & ".join(f"{t}:*" for t in terms)
+        sql = """
+            SELECT id FROM accommodations
+            WHERE search_vector @@ to_tsquery('english', :tsq)
+            ORDER BY ts_rank(search_vector, to_tsquery('english', :tsq)) DESC, id
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # quote each term so user input can't inject FTS5 query syntax;
+        # bm25 weights: title > location > type > description
+        params["match"] = " ".join('"%s"*' % t for t in terms)
+        sql = """
+            SELECT rowid FROM accommodations_fts
+            WHERE accommodations_fts MATCH :match
+            ORDER BY bm25(accommodations_fts, 10.0, 5.0, 2.0, 1.0), rowid
+            LIMIT :limit OFFSET :offset
+        """
+
+    return [row[0] for row in db.session.execute(text(sql), params)]
@@ -0,0 +1,41 @@
+# backend/streaming.py
+from itertools import islice
+
+from flask import current_app, request, stream_with_context
+
+# Rows fetched per round-trip when streaming
+STREAM_CHUNK_SIZE = 200
+
+
+def wants_stream():
+    """True when the client asked for a streamed response (?stream=1)."""
+    return (request.args.get("stream") or "").strip().lower() in ("1", "true", "yes")
+
+
+def stream_json_array(key, query, serialize=None, chunk_size=STREAM_CHUNK_SIZE, serialize_chunk=None):
+    """Stream ``{"<key>": [...]}`` while iterating query in chunks.
+
+    Rows are pulled with yield_per() and written as each chunk arrives, so
+    memory stays flat and the first byte goes out before the whole result
+    set is read. Pass ``serialize`` (row -> dict) or, when a chunk needs a
+    batched lookup first, ``serialize_chunk`` (list of rows -> list of dicts).
+    """
+    if serialize_chunk is None:
+        def serialize_chunk(rows):
+            return [serialize(r) for r in rows]
+
+    def generate():
+        dumps = current_app.json.dumps
+        rows = iter(query.yield_per(chunk_size))
+        yield '{"%s": [' % key
+        first = True
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            for item in serialize_chunk(chunk):
+                yield ("" if first else ",") + dumps(item)
+                first = False
+        yield "]}"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
@@ -0,0 +1,36 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+
+# the backend uses flat imports (from models import ...); Config reads the
+# environment at import time, so point it at a throwaway database first
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.mkdtemp(prefix="sda-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_tmp, "test.db"))
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("HASH_WORKERS", "0")
+os.environ.setdefault("IMAGE_WORKERS", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    """An app on the shared test database, with its own upload folder; jobs run via run_pending()."""
+    from init_db import init_db
+    from jobs import job_queue
+    from main import create_app
+
+    app = create_app(start_workers=False)
+    app.config["UPLOAD_FOLDER"] = tempfile.mkdtemp(prefix="sda-uploads-")
+    init_db(app)
+    job_queue.app = app
+    return app
+
+
+@pytest.fixture(scope="module")
+def auth_headers(app):
+    r = app.test_client().post("/api/auth/login", json={"username": "owner", "password": "ownerpassword123"})
+    assert r.status_code == 200, r.data
+    return {"Authorization": "Bearer " + r.json["access"]}
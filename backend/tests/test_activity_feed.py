@@ -0,0 +1,69 @@
+# backend/tests/test_activity_feed.py
+"""?since= polling must not step past ids that commit out of order."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from activity_feed import SINCE_SETTLE
+from models import db, Activity, User
+
+OLD = timedelta(hours=1)
+
+
+@pytest.fixture
+def owner_id(app):
+    with app.app_context():
+        Activity.query.delete()
+        db.session.commit()
+        return User.query.filter_by(username="owner").one().id
+
+
+def _add(app, owner_id, activity_id, age, title):
+    with app.app_context():
+        db.session.add(Activity(
+            id=activity_id, owner_id=owner_id, action="add", accommodation_title=title,
+            timestamp=datetime.utcnow() - age,
+        ))
+        db.session.commit()
+
+
+def _poll(app, headers, since):
+    r = app.test_client().get(f"/api/sdaowner/activities?since={since}", headers=headers)
+    assert r.status_code == 200, r.data
+    return [a["accommodationTitle"] for a in r.json["activities"]], r.json["latestCursor"]
+
+
+def test_since_waits_for_lower_ids_to_commit(app, auth_headers, owner_id):
+    _add(app, owner_id, 1, OLD, "one")
+    # id 3 commits first, just recorded; id 2 belongs to a transaction still open
+    _add(app, owner_id, 3, timedelta(0), "three")
+
+    titles, cursor = _poll(app, auth_headers, 0)
+    assert (titles, cursor) == (["one"], "1")
+
+    _add(app, owner_id, 2, timedelta(0), "two")  # the slow transaction commits
+    with app.app_context():
+        for a in Activity.query:
+            a.timestamp -= SINCE_SETTLE
+        db.session.commit()
+
+    titles, cursor = _poll(app, auth_headers, cursor)
+    assert (titles, cursor) == (["two", "three"], "3")
+    assert _poll(app, auth_headers, cursor) == ([], "3")
+
+
+def test_first_page_cursor_stops_before_unsettled(app, auth_headers, owner_id):
+    _add(app, owner_id, 1, OLD, "one")
+    _add(app, owner_id, 3, timedelta(0), "three")
+
+    r = app.test_client().get("/api/sdaowner/activities", headers=auth_headers)
+    assert [a["accommodationTitle"] for a in r.json["activities"]] == ["three", "one"]
+    assert r.json["latestCursor"] == "2"
+
+
+def test_buffered_row_with_old_timestamp_is_delivered(app, auth_headers, owner_id):
+    _add(app, owner_id, 1, OLD, "one")
+    titles, cursor = _poll(app, auth_headers, 0)
+    # a buffered entry: recorded long ago, inserted (higher id) just now
+    _add(app, owner_id, 2, OLD * 2, "late")
+    assert _poll(app, auth_headers, cursor) == (["late"], "2")
@@ -0,0 +1,135 @@
+# backend/tests/test_blobs.py
+"""Content-addressed uploads: dedup, reference counting, and deletes racing a re-upload."""
+import io
+import os
+import time
+
+import pytest
+
+import blobs
+from image_variants import variant_rel_path
+from jobs import job_queue
+from models import db, Blob, Image, Job
+from routes.sda_owner_routes import _upload_abs_path
+
+PIL = pytest.importorskip("PIL.Image")
+
+LISTING = dict(
+    title="Blobs", location="Sydney", capacity=2, description="d", accommodationType="House",
+    bedrooms=2, bathrooms=1, gender="Any", status="available",
+)
+
+
+def _png(color):
+    buf = io.BytesIO()
+    PIL.new("RGB", (40, 30), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _upload(app, headers, data):
+    r = app.test_client().post(
+        "/api/sdaowner/upload_image", headers=headers,
+        data={"file": (io.BytesIO(data), "photo.png")}, content_type="multipart/form-data",
+    )
+    assert r.status_code in (200, 201), r.data
+    return r.json["id"]
+
+
+def _blob_file(app, image_id):
+    with app.app_context():
+        blob = db.session.get(Blob, db.session.get(Image, image_id).blob_id)
+        return _upload_abs_path(blob.name, app.config["UPLOAD_FOLDER"])
+
+
+def _drain(app):
+    with app.app_context():
+        job_queue.run_pending()
+        failed = Job.query.filter(Job.status != "done").all()
+        assert not failed, [(j.kind, j.last_error) for j in failed]
+
+
+def test_reupload_shares_one_blob(app, auth_headers):
+    data = _png((1, 2, 3))
+    first, second = _upload(app, auth_headers, data), _upload(app, auth_headers, data)
+
+    with app.app_context():
+        a, b = db.session.get(Image, first), db.session.get(Image, second)
+        assert a.blob_id == b.blob_id is not None
+        assert db.session.get(Blob, a.blob_id).ref_count == 2
+    path = _blob_file(app, first)
+    assert os.path.isfile(path)
+    assert [n for n in os.listdir(os.path.dirname(path)) if n.endswith(".png")] == [os.path.basename(path)]
+
+
+def test_delete_images_drops_one_reference_at_a_time(app, auth_headers):
+    data = _png((4, 5, 6))
+    first, second = _upload(app, auth_headers, data), _upload(app, auth_headers, data)
+    _drain(app)  # render the variants
+
+    with app.app_context():
+        blob_id, blob_name = db.session.get(Image, first).blob_id, db.session.get(Image, first).name
+
+        assert blobs.delete_images([first]) == []  # the other image still uses the content
+        db.session.commit()
+        assert db.session.get(Blob, blob_id).ref_count == 1
+
+        paths = blobs.delete_images([second])
+        db.session.commit()
+        assert db.session.get(Blob, blob_id) is None
+        assert blob_name in paths
+        assert variant_rel_path(blob_name, "thumb") in paths
+
+
+def test_deleting_a_listing_removes_its_blob_file(app, auth_headers):
+    image_id = _upload(app, auth_headers, _png((7, 8, 9)))
+    path = _blob_file(app, image_id)
+    client = app.test_client()
+    r = client.post("/api/sdaowner/add_accommodation", json={**LISTING, "images": [image_id]}, headers=auth_headers)
+    assert r.status_code == 201, r.data
+    _drain(app)
+
+    r = client.delete(f"/api/sdaowner/delete_accommodation/{r.json['id']}", headers=auth_headers)
+    assert r.status_code == 200, r.data
+    _drain(app)
+    assert not os.path.exists(path)
+
+
+def test_reupload_before_queued_delete_runs_keeps_the_file(app, auth_headers):
+    data = _png((10, 11, 12))
+    image_id = _upload(app, auth_headers, data)
+    path = _blob_file(app, image_id)
+    client = app.test_client()
+    r = client.post("/api/sdaowner/add_accommodation", json={**LISTING, "images": [image_id]}, headers=auth_headers)
+    _drain(app)
+
+    # the delete drops the last reference and queues the file for removal ...
+    r = client.delete(f"/api/sdaowner/delete_accommodation/{r.json['id']}", headers=auth_headers)
+    assert r.status_code == 200, r.data
+    # ... but the same content is uploaded again before the job runs
+    again = _upload(app, auth_headers, data)
+    assert _blob_file(app, again) == path
+
+    _drain(app)
+    assert os.path.isfile(path)
+
+
+def test_queued_delete_spares_a_file_rewritten_before_its_blob_commits(app):
+    rel = "uploads/_blobs/cc/" + "c" * 64 + ".png"
+    with app.app_context():
+        path = _upload_abs_path(rel, app.config["UPLOAD_FOLDER"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        stale = time.time() - 60
+        os.utime(path, (stale, stale))
+
+        # no Blob row yet (the re-upload's transaction is still open), but the
+        # file was written after the delete was queued
+        job_queue.enqueue("delete_files", {"paths": [rel], "queued_at": stale - 1})
+        db.session.commit()
+        job_queue.run_pending()
+        assert os.path.isfile(path)
+
+        job_queue.enqueue("delete_files", {"paths": [rel], "queued_at": time.time()})
+        db.session.commit()
+        job_queue.run_pending()
+        assert not os.path.exists(path)
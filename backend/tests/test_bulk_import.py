@@ -0,0 +1,71 @@
+# backend/tests/test_bulk_import.py
+"""Bulk import: partial imports, and nothing happening when no row is valid."""
+import json
+
+import pytest
+
+from cache import listing_cache
+from events import broadcaster
+from models import db, Accommodation, User
+
+URL = "/api/sdaowner/bulk_import"
+ROW = dict(
+    title="Bulk", location="Sydney", capacity=2, description="d", accommodationType="House",
+    bedrooms=2, bathrooms=1, gender="Any", status="available",
+)
+
+
+def _ndjson(*rows):
+    return "\n".join(json.dumps(r) for r in rows)
+
+
+@pytest.fixture
+def watch(app):
+    """Yields a callable returning (listing count, cache version, owner events seen) so far."""
+    with app.app_context():
+        owner_id = User.query.filter_by(username="owner").one().id
+    sub, _, _ = broadcaster.subscribe(owner_id)
+
+    def state():
+        with app.app_context():
+            return Accommodation.query.count(), listing_cache.current_version(), sub.queue.qsize()
+
+    try:
+        yield state
+    finally:
+        broadcaster.unsubscribe(sub)
+
+
+def _post(app, headers, body, query=""):
+    return app.test_client().post(
+        URL + query, data=body, headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+
+
+def test_partial_import_with_no_valid_rows_is_a_400(app, auth_headers, watch):
+    before = watch()
+    r = _post(app, auth_headers, _ndjson({**ROW, "title": ""}, {**ROW, "capacity": "many"}), "?partial=1")
+
+    assert r.status_code == 400, r.data
+    assert [e["row"] for e in r.json["errors"]] == [1, 2]
+    assert watch() == before  # no rows, no cache bump, no event
+
+
+def test_partial_import_inserts_the_valid_rows(app, auth_headers, watch):
+    count, version, _ = watch()
+    r = _post(app, auth_headers, _ndjson({**ROW, "title": ""}, {**ROW, "title": "Valid"}), "?partial=1")
+
+    assert r.status_code == 201, r.data
+    assert (r.json["created"], [e["row"] for e in r.json["errors"]]) == (1, [1])
+    assert watch() == (count + 1, version + 1, 1)
+    with app.app_context():
+        assert db.session.get(Accommodation, r.json["ids"][0]).title == "Valid"
+
+
+def test_invalid_row_aborts_a_strict_import(app, auth_headers, watch):
+    before = watch()
+    r = _post(app, auth_headers, _ndjson({**ROW, "title": "Fine"}, {**ROW, "bedrooms": None}))
+
+    assert r.status_code == 400, r.data
+    assert [e["row"] for e in r.json["errors"]] == [2]
+    assert watch() == before
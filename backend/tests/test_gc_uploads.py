@@ -0,0 +1,130 @@
+# backend/tests/test_gc_uploads.py
+"""gc_uploads removes only files and Image rows that nothing needs."""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from gc_uploads import collect_garbage
+from models import db, Accommodation, AccommodationImage, Blob, Image, ImageVariant, User
+
+MIN_AGE = 3600
+OLD = MIN_AGE * 2
+
+
+@pytest.fixture
+def root(app):
+    """An empty uploads tree and no image rows."""
+    with app.app_context():
+        for model in (AccommodationImage, ImageVariant, Image, Blob):
+            model.query.delete()
+        db.session.commit()
+    return tempfile.mkdtemp(prefix="sda-gc-")
+
+
+def _file(root, rel, age=OLD):
+    path = os.path.join(root, *rel.split("/")[1:])  # rel is "uploads/..."
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _image(name, linked=False, age=OLD, blob=None):
+    img = Image(name=name, blob_id=blob.id if blob else None, created_at=datetime.utcnow() - timedelta(seconds=age))
+    db.session.add(img)
+    db.session.flush()
+    if linked:
+        owner = User.query.filter_by(username="owner").one()
+        a = Accommodation(
+            owner_id=owner.id, title="GC", location="Sydney", capacity=1, description="d",
+            accommodation_type="House", bedrooms=1, bathrooms=1, gender="Any",
+        )
+        db.session.add(a)
+        db.session.flush()
+        db.session.add(AccommodationImage(accommodation_id=a.id, image_id=img.id))
+    return img
+
+
+def _gc(app, root, **kwargs):
+    with app.app_context():
+        return collect_garbage(root, min_age=MIN_AGE, **kwargs)
+
+
+def test_referenced_rows_and_files_survive(app, root):
+    kept = _file(root, "uploads/owner/1/images/kept.jpg")
+    variant = _file(root, "uploads/owner/1/images/kept.thumb.webp")
+    unlinked = _file(root, "uploads/owner/unlinked.jpg")
+    orphan = _file(root, "uploads/owner/orphan.jpg")
+    with app.app_context():
+        img = _image("uploads/owner/1/images/kept.jpg", linked=True)
+        db.session.add(ImageVariant(
+            image_id=img.id, size="thumb", format="webp", name="uploads/owner/1/images/kept.thumb.webp",
+            width=1, height=1, bytes=10,
+        ))
+        _image("uploads/owner/unlinked.jpg")
+        db.session.commit()
+
+    stats = _gc(app, root)
+
+    assert (stats["images"], stats["deleted"], stats["done"]) == (1, 2, True)
+    assert os.path.exists(kept) and os.path.exists(variant)
+    assert not os.path.exists(unlinked) and not os.path.exists(orphan)
+    with app.app_context():
+        assert [i.name for i in Image.query] == ["uploads/owner/1/images/kept.jpg"]
+
+
+def test_young_files_and_rows_survive(app, root):
+    young = _file(root, "uploads/owner/young.jpg", age=0)
+    with app.app_context():
+        _image("uploads/owner/young.jpg", age=0)
+        _image("uploads/owner/gone.jpg", age=0)  # file already removed; row still in its grace period
+        db.session.commit()
+
+    stats = _gc(app, root)
+
+    assert (stats["images"], stats["orphans"]) == (0, 0)
+    assert os.path.exists(young)
+    with app.app_context():
+        assert Image.query.count() == 2
+
+
+def test_dry_run_deletes_nothing(app, root):
+    orphan = _file(root, "uploads/owner/orphan.jpg")
+    unlinked = _file(root, "uploads/owner/unlinked.jpg")
+    with app.app_context():
+        _image("uploads/owner/unlinked.jpg")
+        db.session.commit()
+
+    stats = _gc(app, root, dry_run=True)
+
+    assert (stats["images"], stats["orphans"], stats["deleted"]) == (1, 1, 0)
+    assert os.path.exists(orphan) and os.path.exists(unlinked)
+    with app.app_context():
+        assert Image.query.count() == 1
+
+
+def test_blob_files_kept_while_referenced(app, root):
+    live_rel = "uploads/_blobs/aa/" + "a" * 64 + ".jpg"
+    dead_rel = "uploads/_blobs/bb/" + "b" * 64 + ".jpg"
+    live, live_variant = _file(root, live_rel), _file(root, live_rel[:-4] + ".thumb.webp")
+    dead = _file(root, dead_rel)
+    with app.app_context():
+        blob = Blob(sha256="a" * 64, name=live_rel, size=10, ref_count=2)
+        db.session.add(blob)
+        db.session.flush()
+        _image(live_rel, linked=True, blob=blob)
+        _image(live_rel, blob=blob)  # a second, unlinked reference to the same content
+        db.session.commit()
+
+    stats = _gc(app, root)
+
+    assert stats["images"] == 1
+    assert os.path.exists(live) and os.path.exists(live_variant)
+    assert not os.path.exists(dead)  # no Blob row: nothing references it
+    with app.app_context():
+        assert Blob.query.one().ref_count == 1
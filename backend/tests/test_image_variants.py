@@ -0,0 +1,38 @@
+# backend/tests/test_image_variants.py
+"""The image_variants job, with IMAGE_WORKERS = 0 (render inline)."""
+import io
+import os
+
+import pytest
+
+from jobs import job_queue
+from models import db, Image, Job
+from routes.sda_owner_routes import _upload_abs_path
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def _png(color):
+    buf = io.BytesIO()
+    PIL.new("RGB", (40, 30), color).save(buf, "PNG")
+    buf.seek(0)
+    return buf
+
+
+def test_variants_render_inline_without_workers(app, auth_headers):
+    assert app.config["IMAGE_WORKERS"] == 0
+    r = app.test_client().post(
+        "/api/sdaowner/upload_image", headers=auth_headers,
+        data={"file": (_png((10, 20, 30)), "photo.png")}, content_type="multipart/form-data",
+    )
+    assert r.status_code in (200, 201), r.data
+
+    with app.app_context():
+        assert job_queue.run_pending() >= 1
+        job = Job.query.filter_by(kind="image_variants").order_by(Job.id.desc()).first()
+        assert (job.status, job.last_error) == ("done", None)
+
+        img = db.session.get(Image, r.json["id"])
+        assert {v.size for v in img.variants} == {"thumb", "medium", "large"}
+        for v in img.variants:
+            assert os.path.isfile(_upload_abs_path(v.name, app.config["UPLOAD_FOLDER"]))
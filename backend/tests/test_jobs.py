@@ -0,0 +1,143 @@
+# backend/tests/test_jobs.py
+"""JobQueue retries, dead-lettering, heartbeats and stale-claim recovery, driven through run_once()."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+import jobs
+from jobs import JobQueue
+from models import db, Job
+
+
+@pytest.fixture
+def queue(app):
+    """A queue of its own (test handlers only) over an empty jobs table."""
+    q = JobQueue()
+    q.app = app
+    with app.app_context():
+        Job.query.delete()
+        db.session.commit()
+        yield q
+
+
+def _enqueue(queue, kind, payload=None, **kwargs):
+    job = queue.enqueue(kind, payload, **kwargs)
+    db.session.commit()
+    return job.id
+
+
+def _job(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def _make_due(job_id):
+    _job(job_id).run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_failure_retries_with_backoff_then_dead_letters(queue):
+    calls = []
+
+    @queue.handler("flaky")
+    def _flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    job_id = _enqueue(queue, "flaky", {"n": 1}, max_attempts=3)
+
+    assert queue.run_once()
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.last_error) == ("pending", 1, "RuntimeError: boom")
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=1)  # 2 ** 1 s backoff
+    assert not queue.run_once()  # not due yet
+
+    _make_due(job_id)
+    assert queue.run_once()
+    job = _job(job_id)
+    assert (job.status, job.attempts) == ("pending", 2)
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=3)  # 2 ** 2 s
+
+    _make_due(job_id)
+    assert queue.run_once()
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.last_error) == ("failed", 3, "RuntimeError: boom")
+    assert calls == [{"n": 1}] * 3
+
+    _make_due(job_id)
+    assert not queue.run_once()  # dead-lettered jobs are never claimed again
+
+
+def test_success_after_retry_clears_the_error(queue):
+    outcomes = [RuntimeError("once"), None]
+
+    @queue.handler("once")
+    def _once(payload):
+        outcome = outcomes.pop(0)
+        if outcome:
+            raise outcome
+
+    job_id = _enqueue(queue, "once")
+    queue.run_once()
+    _make_due(job_id)
+    queue.run_once()
+
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.last_error) == ("done", 2, None)
+
+
+def test_unknown_kind_fails_like_a_handler_error(queue, app):
+    db.session.add(Job(kind="nobody-handles-this", max_attempts=1))
+    db.session.commit()
+
+    assert queue.run_once()
+    job = Job.query.one()
+    assert job.status == "failed"
+    assert "No handler registered" in job.last_error
+
+
+def test_heartbeat_keeps_a_long_job_from_being_requeued(queue, app, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL", 0.05)
+    seen = {}
+
+    @queue.handler("slow")
+    def _slow(payload):
+        with Session(db.engine) as session:
+            started = session.get(Job, payload["id"]).updated_at
+            time.sleep(0.4)
+            seen["beat"] = session.get(Job, payload["id"]).updated_at > started
+        # a sweep with a threshold shorter than the run, longer than the interval
+        seen["requeued"] = queue.requeue_stale(older_than=timedelta(seconds=0.3))
+
+    job = queue.enqueue("slow")
+    db.session.flush()
+    job.payload = '{"id": %d}' % job.id
+    db.session.commit()
+
+    assert queue.run_once()
+    assert seen == {"beat": True, "requeued": 0}
+    assert _job(job.id).status == "done"
+
+
+def test_requeue_stale_recovers_a_job_whose_worker_died(queue):
+    ran = []
+
+    @queue.handler("orphaned")
+    def _orphaned(payload):
+        ran.append(payload)
+
+    job_id = _enqueue(queue, "orphaned")
+    assert queue._claim() == job_id  # a worker claims it, then its process dies
+
+    assert queue.requeue_stale() == 0  # still within STALE_AFTER
+    _job(job_id).updated_at = datetime.utcnow() - jobs.STALE_AFTER - timedelta(minutes=1)
+    db.session.commit()
+
+    assert queue.requeue_stale() == 1
+    assert _job(job_id).status == "pending"
+    assert queue.run_once()
+    job = _job(job_id)
+    assert (job.status, job.attempts) == ("done", 2)
+    assert ran == [{}]
@@ -0,0 +1,99 @@
+# backend/tests/test_listing_queries.py
+"""Listing endpoints must cost a constant number of queries, however many rows they return."""
+import contextlib
+
+import pytest
+from sqlalchemy import event
+
+from cache import listing_cache
+from init_db import init_db
+from main import create_app
+from models import (
+    db, Accommodation, AccommodationAmenity, AccommodationFeature, AccommodationImage,
+    Amenity, Feature, Image, Room, User,
+)
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = create_app(start_workers=False)
+    init_db(app)
+    with app.app_context():
+        db.session.add_all([Feature(name="Ramp"), Amenity(name="Wifi")])
+        db.session.commit()
+    return app
+
+
+@pytest.fixture(scope="module")
+def auth_headers(app):
+    r = app.test_client().post("/api/auth/login", json={"username": "owner", "password": "ownerpassword123"})
+    assert r.status_code == 200, r.data
+    return {"Authorization": "Bearer " + r.json["access"]}
+
+
+def _seed(app, n):
+    """Add n fully linked listings for the owner and invalidate the listing cache."""
+    with app.app_context():
+        owner = User.query.filter_by(username="owner").one()
+        feature, amenity = Feature.query.first(), Amenity.query.first()
+        for i in range(n):
+            a = Accommodation(
+                owner_id=owner.id, title=f"Listing {i}", location="Sydney", capacity=2,
+                description="d", accommodation_type="House", bedrooms=2, bathrooms=1, gender="Any",
+            )
+            image = Image(name=f"uploads/owner/{i}.jpg")
+            db.session.add_all([a, image])
+            db.session.flush()
+            db.session.add_all([
+                AccommodationFeature(accommodation_id=a.id, feature_id=feature.id),
+                AccommodationAmenity(accommodation_id=a.id, amenity_id=amenity.id),
+                AccommodationImage(accommodation_id=a.id, image_id=image.id),
+                Room(accommodation_id=a.id, status="vacant"),
+                Room(accommodation_id=a.id, status="occupied"),
+            ])
+        listing_cache.bump()
+        db.session.commit()
+        return Accommodation.query.count()
+
+
+@contextlib.contextmanager
+def _count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _queries_for(app, url, headers, expected_rows):
+    client = app.test_client()
+    with _count_queries(app) as statements:
+        r = client.get(url, headers=headers)
+    assert r.status_code == 200, r.data
+    assert len(r.json["accommodations"]) == expected_rows
+    return len(statements)
+
+
+@pytest.mark.parametrize("url, authenticated", [
+    ("/api/public/accommodations?limit=100", False),
+    ("/api/public/accommodations?limit=100&include_rooms=false", False),
+    ("/api/sdaowner/get_accommodations", True),
+    ("/api/sdaowner/get_accommodations?include_rooms=false", True),
+])
+def test_listing_query_count_is_flat(app, auth_headers, url, authenticated):
+    headers = auth_headers if authenticated else {}
+    with app.app_context():
+        Accommodation.query.delete()
+        db.session.commit()
+
+    small = _queries_for(app, url, headers, _seed(app, 3))
+    large = _queries_for(app, url, headers, _seed(app, 30))
+
+    assert small == large
@@ -0,0 +1,65 @@
+# backend/tests/test_nearby.py
+"""Proximity search: coordinate validation and the wide-box query path."""
+import pytest
+from sqlalchemy import event
+
+from geo import bbox_around, cells_for_bbox
+from models import db, Accommodation, User
+
+URL = "/api/public/accommodations/nearby"
+SYDNEY = (-33.8688, 151.2093)
+
+
+@pytest.fixture(scope="module")
+def listings(app):
+    with app.app_context():
+        owner = User.query.filter_by(username="owner").one()
+        for title, lat, lon in (("Near", -33.87, 151.21), ("Penrith", -33.75, 150.69), ("Perth", -31.95, 115.86)):
+            a = Accommodation(
+                owner_id=owner.id, title=title, location=title, capacity=1, description="d",
+                accommodation_type="House", bedrooms=1, bathrooms=1, gender="Any",
+            )
+            a.set_coordinates(lat, lon)
+            db.session.add(a)
+        db.session.commit()
+
+
+@pytest.mark.parametrize("query, message", [
+    ("lat=100&lon=151", "lat must be between -90 and 90"),
+    ("lat=-90.5&lon=151", "lat must be between -90 and 90"),
+    ("lat=-33&lon=181", "lon must be between -180 and 180"),
+    ("bbox=-95,150,-33,152", "bbox must lie within"),
+    ("bbox=-34,150,-33,200", "bbox must lie within"),
+])
+def test_out_of_range_coordinates_are_rejected(app, query, message):
+    r = app.test_client().get(f"{URL}?{query}")
+    assert r.status_code == 400, r.data
+    assert r.json["message"].startswith(message)
+
+
+def test_box_over_the_cell_cap_range_scans_the_index(app, listings):
+    radius_km = 150
+    assert cells_for_bbox(*bbox_around(*SYDNEY, radius_km)) is None  # more than MAX_GRID_CELLS
+
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "accommodations.latitude BETWEEN" in statement:
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        r = app.test_client().get(f"{URL}?lat={SYDNEY[0]}&lon={SYDNEY[1]}&radius_km={radius_km}")
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    assert r.status_code == 200, r.data
+    titles = [a["title"] for a in r.json["accommodations"]]
+    assert titles[:2] == ["Near", "Penrith"] and "Perth" not in titles
+
+    (statement, parameters), = statements
+    with engine.connect() as conn:
+        plan = " | ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+    assert "ix_accommodations_latitude_longitude" in plan, plan
@@ -0,0 +1,32 @@
+# backend/tests/test_owner_events.py
+"""The owner event stream opens with a short-lived stream token, never an access token in the URL."""
+import events
+
+
+def test_stream_token_opens_only_its_owners_stream(app, auth_headers):
+    client = app.test_client()
+    r = client.post("/api/sda_owner/events/token", headers=auth_headers)
+    assert r.status_code == 200, r.data
+    token = r.json["token"]
+
+    r = client.get(f"/api/sda_owner/events?token={token}")
+    assert r.status_code == 200
+    assert r.mimetype == "text/event-stream"
+    assert next(r.response) == b"retry: 3000\n\n"
+    r.close()
+
+    assert events.read_stream_token(app, token) is not None
+    assert events.read_stream_token(app, token + "x") is None
+
+
+def test_access_token_in_query_string_is_refused(app, auth_headers):
+    access = auth_headers["Authorization"].split()[1]
+    client = app.test_client()
+    assert client.get(f"/api/sda_owner/events?jwt={access}").status_code == 401
+    assert client.get(f"/api/sda_owner/events?token={access}").status_code == 401
+
+
+def test_expired_stream_token_is_refused(app, auth_headers, monkeypatch):
+    token = app.test_client().post("/api/sda_owner/events/token", headers=auth_headers).json["token"]
+    monkeypatch.setitem(app.config, "SSE_TOKEN_SECONDS", -1)
+    assert app.test_client().get(f"/api/sda_owner/events?token={token}").status_code == 401
@@ -0,0 +1,98 @@
+# backend/tests/test_read_replica.py
+"""@read_only views read the replica, except for a client that has just written."""
+import os
+import tempfile
+
+import pytest
+
+from config import Config
+from db_routing import RW_COOKIE, sync_sqlite_replica
+from init_db import init_db
+from main import create_app
+from models import db, Feature
+
+LISTING = dict(
+    title="T", location="Sydney", capacity=2, description="d", accommodationType="House",
+    bedrooms=2, bathrooms=1, gender="Any", status="available",
+)
+
+
+@pytest.fixture(scope="module")
+def replica_app():
+    tmp = tempfile.mkdtemp(prefix="sda-replica-")
+    primary, replica = os.path.join(tmp, "primary.db"), os.path.join(tmp, "replica.db")
+    saved = Config.SQLALCHEMY_DATABASE_URI, Config.SQLALCHEMY_BINDS, Config.ACTIVITY_LOG_MODE
+    # buffered activity adds nothing to the request's session, so a links-only
+    # update writes through session.execute alone and never flushes
+    Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + primary
+    Config.SQLALCHEMY_BINDS = {"replica": "sqlite:///" + replica}
+    Config.ACTIVITY_LOG_MODE = "buffered"
+    try:
+        app = create_app(start_workers=False)
+    finally:
+        Config.SQLALCHEMY_DATABASE_URI, Config.SQLALCHEMY_BINDS, Config.ACTIVITY_LOG_MODE = saved
+    init_db(app)
+    with app.app_context():
+        db.session.add(Feature(name="Ramp"))
+        db.session.commit()
+        feature_id = Feature.query.one().id
+
+    def replicate():
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        sync_sqlite_replica(primary, replica)
+
+    replicate()
+    r = app.test_client().post("/api/auth/login", json={"username": "owner", "password": "ownerpassword123"})
+    assert r.status_code == 200, r.data
+    headers = {"Authorization": "Bearer " + r.json["access"]}
+    return app, headers, feature_id, replicate
+
+
+def _titles(client, headers):
+    r = client.get("/api/sdaowner/get_accommodations", headers=headers)
+    assert r.status_code == 200, r.data
+    return {a["title"]: a for a in r.json["accommodations"]}
+
+
+def test_writer_reads_primary_others_read_replica(replica_app):
+    app, headers, _, replicate = replica_app
+    writer, other = app.test_client(), app.test_client()
+
+    r = writer.post("/api/sdaowner/add_accommodation", json={**LISTING, "title": "New"}, headers=headers)
+    assert r.status_code == 201, r.data
+    assert writer.get_cookie(RW_COOKIE) is not None
+
+    assert "New" in _titles(writer, headers)
+    assert "New" not in _titles(other, headers)  # same owner, but no pin: replica
+
+    replicate()
+    assert "New" in _titles(other, headers)
+
+
+def test_links_only_update_pins_the_writer(replica_app):
+    app, headers, feature_id, replicate = replica_app
+    r = app.test_client().post("/api/sdaowner/add_accommodation", json={**LISTING, "title": "Links"}, headers=headers)
+    assert r.status_code == 201, r.data
+    accommodation_id = r.json["id"]
+    replicate()
+
+    writer, other = app.test_client(), app.test_client()
+    r = writer.put(f"/api/sdaowner/update_accommodation/{accommodation_id}", json={"features": [feature_id]}, headers=headers)
+    assert r.status_code == 200, r.data
+    assert writer.get_cookie(RW_COOKIE) is not None
+
+    assert _titles(writer, headers)["Links"]["features"]
+    assert not _titles(other, headers)["Links"]["features"]
+
+
+def test_forged_pin_is_ignored(replica_app):
+    app, headers, _, _ = replica_app
+    r = app.test_client().post("/api/sdaowner/add_accommodation", json={**LISTING, "title": "Forged"}, headers=headers)
+    assert r.status_code == 201, r.data
+
+    reader = app.test_client()
+    reader.set_cookie(RW_COOKIE, "9999999999")  # further out than one window
+    assert "Forged" not in _titles(reader, headers)
@@ -0,0 +1,89 @@
+# backend/uploads.py
+"""Serving of files under UPLOAD_FOLDER for the /uploads/<path> route.
+
+Upload names never change once written (content-hash blobs, uuid-prefixed
+legacy files and their derived variants), so those responses are marked
+``Cache-Control: public, max-age=31536000, immutable``. Blobs get a strong
+ETag derived from their hash; everything else uses Werkzeug's
+size/mtime/name tag. Range and conditional requests are handled by
+send_from_directory.
+
+Config.UPLOADS_SENDFILE can hand the byte transfer to a fronting server:
+"x-sendfile" (Apache/lighttpd, via Flask's USE_X_SENDFILE) or
+"x-accel-redirect" (nginx), where the response only carries headers and an
+internal redirect to Config.UPLOADS_ACCEL_PREFIX + <path>.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+import image_variants
+
+IMMUTABLE_MAX_AGE = 31536000  # one year
+
+# <sha256>.<ext>[.<size>.webp] under _blobs/
+_BLOB_RE = re.compile(r"(?:^|/)_blobs/[0-9a-f]{2}/(?P<sha>[0-9a-f]{64})\.[^/]+$")
+# <uuid hex>_<original name>[.<size>.webp]
+_UUID_RE = re.compile(r"(?:^|/)[0-9a-f]{32}_[^/]+$")
+
+
+def is_immutable(path):
+    return bool(_BLOB_RE.search(path) or _UUID_RE.search(path))
+
+
+def serve_upload(filename):
+    uploads_root = current_app.config.get("UPLOAD_FOLDER")
+    if not uploads_root:
+        return "Uploads disabled", 404
+
+    # ?size=thumb|medium|large serves the WebP variant when it has been rendered;
+    # until then the original is returned, and must not be cached as the variant
+    path, immutable = filename, is_immutable(filename)
+    size = request.args.get("size")
+    if size in image_variants.VARIANT_SIZES:
+        variant = image_variants.variant_rel_path(filename, size)
+        variant_abs = safe_join(uploads_root, variant)
+        if variant_abs and os.path.isfile(variant_abs):
+            path = variant
+        else:
+            immutable = False
+
+    match = _BLOB_RE.search(path)
+    etag = True
+    if match:
+        etag = match.group("sha") + ("" if path == filename else "." + size)
+
+    mode = (current_app.config.get("UPLOADS_SENDFILE") or "").lower()
+    if mode == "x-accel-redirect":
+        resp = _accel_redirect(uploads_root, path, etag)
+    else:
+        resp = send_from_directory(uploads_root, path, conditional=True, etag=etag)
+
+    resp.cache_control.public = True
+    if immutable:
+        resp.cache_control.no_cache = None
+        resp.cache_control.max_age = IMMUTABLE_MAX_AGE
+        resp.cache_control.immutable = True
+    else:
+        # cacheable, but revalidated with the ETag on every use
+        resp.cache_control.no_cache = True
+    return resp
+
+
+def _accel_redirect(uploads_root, path, etag):
+    """Headers-only response that tells nginx to stream the file itself."""
+    abs_path = safe_join(uploads_root, path)
+    if not abs_path or not os.path.isfile(abs_path):
+        abort(404)
+
+    resp = current_app.response_class()
+    resp.headers["X-Accel-Redirect"] = quote(current_app.config["UPLOADS_ACCEL_PREFIX"].rstrip("/") + "/" + path)
+    resp.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if isinstance(etag, str):
+        resp.set_etag(etag)
+    # nginx keeps upstream Cache-Control and handles Range itself
+    return resp
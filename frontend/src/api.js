@@ -1,8 +1,9 @@
 import axios from "axios";
-import { ACCESS_TOKEN } from "./constants";
+import { ACCESS_TOKEN, API_BASE_URL } from "./constants";
 
 const api = axios.create({
-  baseURL: import.meta.env.VITE_API_BASE_URL || "http://localhost:8000",
+  baseURL: API_BASE_URL,
+  withCredentials: true,
 });
 
 api.interceptors.request.use(
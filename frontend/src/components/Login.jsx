@@ -12,6 +12,7 @@ import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import logo from "@/assets/White logo.svg";
 import NavBar from "@/pages/Client/components/Navigationbar";
+import { API_BASE_URL } from "@/constants";
 
 function Login() {
   const [username, setUsername] = useState("");
@@ -41,7 +42,7 @@ function Login() {
     setError("");
 
     try {
-      const res = await fetch("http://127.0.0.1:5000/api/auth/login", {
+      const res = await fetch(`${API_BASE_URL}/api/auth/login`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -22,6 +22,7 @@ import {
 } from "@/components/ui/select";
 import { Switch } from "@/components/ui/switch";
 import { X, Image as ImageIcon } from "lucide-react";
+import { API_BASE_URL } from "@/constants";
 
 const PREDEFINED_FEATURES = [
   "Wheelchair Access",
@@ -167,8 +168,8 @@ function AccommodationModal({ open, onClose, accommodation, onSuccess }) {
     }
 
     const url = isEdit
-      ? `http://localhost:5000/api/sdaowner/update_accommodation/${accommodation.id}`
-      : "http://localhost:5000/api/sdaowner/add_accommodation";
+      ? `${API_BASE_URL}/api/sdaowner/update_accommodation/${accommodation.id}`
+      : `${API_BASE_URL}/api/sdaowner/add_accommodation`;
 
     const method = isEdit ? "PUT" : "POST";
 
@@ -208,6 +209,7 @@ function AccommodationModal({ open, onClose, accommodation, onSuccess }) {
     try {
       const response = await fetch(url, {
         method,
+        credentials: "include", // carries the read-your-writes cookie
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
@@ -271,8 +273,9 @@ function AccommodationModal({ open, onClose, accommodation, onSuccess }) {
         const formDataFile = new FormData();
         formDataFile.append("file", file);
 
-        const res = await fetch("http://localhost:5000/api/sdaowner/upload_image", {
+        const res = await fetch(`${API_BASE_URL}/api/sdaowner/upload_image`, {
           method: "POST",
+          credentials: "include", // carries the read-your-writes cookie
           headers: {
             Authorization: `Bearer ${token}`,
           },
@@ -18,6 +18,7 @@ import {
   SelectTrigger,
   SelectValue,
 } from "@/components/ui/select";
+import { API_BASE_URL } from "@/constants";
 
 function AdminModal({ open, onClose, admin, onSuccess }) {
   const isEdit = Boolean(admin);
@@ -66,14 +67,15 @@ function AdminModal({ open, onClose, admin, onSuccess }) {
     setLoading(true);
 
     const url = isEdit
-      ? `http://127.0.0.1:5000/api/admin/update_user/${admin.id}`
-      : "http://127.0.0.1:5000/api/admin/add_user";
+      ? `${API_BASE_URL}/api/admin/update_user/${admin.id}`
+      : `${API_BASE_URL}/api/admin/add_user`;
 
     const method = isEdit ? "PUT" : "POST";
 
     try {
       const response = await fetch(url, {
         method,
+        credentials: "include", // carries the read-your-writes cookie
         headers: {
           "Content-Type": "application/json",
         },
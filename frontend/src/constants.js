@@ -1,2 +1,6 @@
 export const ACCESS_TOKEN = "access";
 export const REFRESH_TOKEN = "refresh";
+
+// every backend call goes to this one origin, so cookies it sets (e.g. the
+// read-your-writes pin) come back on later requests
+export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://localhost:5000";
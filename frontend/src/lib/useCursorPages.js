@@ -0,0 +1,59 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+
+// Load a paginated endpoint one page at a time.
+// fetchPage(cursor) must resolve to { items, nextCursor } (cursor is null for
+// the first page). loadMore() appends the next page; a change in `deps`
+// (search text, filters) starts over from the first page.
+export function useCursorPages(fetchPage, deps) {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(null);
+
+  const fetchRef = useRef(fetchPage);
+  fetchRef.current = fetchPage;
+  // responses for superseded params are dropped
+  const generation = useRef(0);
+
+  const load = useCallback(async (cursor) => {
+    const gen = generation.current;
+    setLoading(true);
+    setError(null);
+    try {
+      const page = await fetchRef.current(cursor);
+      if (gen !== generation.current) return;
+      setItems((prev) => (cursor ? [...prev, ...page.items] : page.items));
+      setNextCursor(page.nextCursor ?? null);
+    } catch (err) {
+      if (gen !== generation.current) return;
+      console.error("Error fetching page:", err);
+      setError(err.message || "Unknown error");
+    } finally {
+      if (gen === generation.current) setLoading(false);
+    }
+  }, []);
+
+  const reload = useCallback(() => {
+    generation.current += 1;
+    return load(null);
+  }, [load]);
+
+  const loadMore = useCallback(() => {
+    if (nextCursor !== null && !loading) load(nextCursor);
+  }, [nextCursor, loading, load]);
+
+  useEffect(() => {
+    reload();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, deps);
+
+  return {
+    items,
+    setItems,
+    hasMore: nextCursor !== null,
+    loading,
+    error,
+    loadMore,
+    reload,
+  };
+}
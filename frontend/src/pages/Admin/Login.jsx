@@ -5,6 +5,7 @@ import { Button } from "@/components/ui/button";
 import { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import logo from "@/assets/logo.png";
+import { API_BASE_URL } from "@/constants";
 
 function Login() {
     const [username, setUsername] = useState("");
@@ -20,7 +21,7 @@ function Login() {
         setLoading(true);
 
         try {
-            const response = await fetch("http://localhost:5000/api/admin/login", {
+            const response = await fetch(`${API_BASE_URL}/api/admin/login`, {
                 method: "POST",
                 headers: {"Content-Type": "application/json"},
                 credentials: "include", // to handle session cookies
@@ -2,6 +2,7 @@ import { useState } from "react";
 import { useNavigate } from "react-router-dom";
 import logo from "@/assets/logo.png";
 import { Home, Activity, Users, LogOut } from "lucide-react";
+import { API_BASE_URL } from "@/constants";
 
 function Sidebar({ currentPage, onNavigate, isOpen, onToggle }) {
   const navigate = useNavigate();
@@ -15,7 +16,7 @@ function Sidebar({ currentPage, onNavigate, isOpen, onToggle }) {
 
   const handleLogout = async () => {
     try {
-      await fetch("http://localhost:5000/api/admin/logout", {
+      await fetch(`${API_BASE_URL}/api/admin/logout`, {
         method: "POST",
         credentials: "include", // required to clear Flask session
       });
@@ -17,33 +17,44 @@ import { Badge } from "@/components/ui/badge";
 
 import AdminModal from "@/components/modal/AdminModal";
 import DeleteConfirmDialog from "@/components/modal/DeleteConfirmDialog";
+import { useCursorPages } from "@/lib/useCursorPages";
+import { API_BASE_URL } from "@/constants";
+
+const PAGE_SIZE = 50;
 
 function ManageUsers() {
-  const [admin, setAdmin] = useState([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [query, setQuery] = useState("");
   const [openModal, setOpenModal] = useState(false);
   const [selectedAdmin, setSelectedAdmin] = useState(null);
   const [openDeleteDialog, setOpenDeleteDialog] = useState(false);
   const [selectedId, setSelectedId] = useState(null);
 
-  // Filter accommodation with search bar
-  const filteredAdmins = admin.filter((acc) => {
-    const term = searchTerm.toLowerCase();
-    return (
-      acc.name.toLowerCase().includes(term) ||
-      acc.username.toLowerCase().includes(term) ||
-      acc.role.toLowerCase().includes(term) ||
-      acc.status.toLowerCase().includes(term)
-    );
-  });
-
-  // Fetch accommodation
-  const fetchAdmins = async () => {
-    try {
+  // search runs on the server; wait for a pause in typing before asking
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Fetch users, one page at a time
+  const {
+    items: admin,
+    hasMore,
+    loading,
+    loadMore,
+    reload: fetchAdmins,
+  } = useCursorPages(
+    async (cursor) => {
       const token = localStorage.getItem("access"); // get token
 
-      const response = await fetch("http://127.0.0.1:5000/api/admin/get_users", {
+      const url = new URL(`${API_BASE_URL}/api/admin/get_users`);
+      url.searchParams.set("limit", String(PAGE_SIZE));
+      if (query) url.searchParams.set("q", query);
+      if (cursor) url.searchParams.set("cursor", cursor);
+
+      const response = await fetch(url, {
         method: "GET",
+        credentials: "include", // carries the read-your-writes cookie
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,    // ← REQUIRED!
@@ -53,16 +64,10 @@ function ManageUsers() {
       if (!response.ok) throw new Error("Failed to fetch admins");
 
       const data = await response.json();
-      setAdmin(data.users || []);
-    } catch (error) {
-      console.error("Error fetching admins:", error);
-    }
-  };
-
-
-  useEffect(() => {
-    fetchAdmins();
-  }, []);
+      return { items: data.users || [], nextCursor: data.nextCursor };
+    },
+    [query]
+  );
 
   // Add new admin
   const handleAddNew = () => {
@@ -85,8 +90,9 @@ function ManageUsers() {
   // Confirm delete
   const handleConfirmDelete = async () => {
     try {
-      const response = await fetch(`http://127.0.0.1:5000/api/admin/delete_user/${selectedId}`, {
+      const response = await fetch(`${API_BASE_URL}/api/admin/delete_user/${selectedId}`, {
           method: "DELETE",
+          credentials: "include", // carries the read-your-writes cookie
           headers: { "Content-Type": "application/json" },
       });
 
@@ -111,7 +117,7 @@ function ManageUsers() {
             <div className="relative flex-1 max-w-md">
               <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-4 w-4 text-gray-400" />
               <Input
-                placeholder="Search users..."
+                placeholder="Search by name, username or email..."
                 className="px-10"
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
@@ -155,17 +161,17 @@ function ManageUsers() {
                 </TableRow>
               </TableHeader>
               <TableBody>
-                {filteredAdmins.length === 0 ? (
+                {admin.length === 0 ? (
                   <TableRow>
                     <TableCell
                       colSpan="8"
                       className="text-center text-gray-500 py-8"
                     >
-                      No admins found
+                      {loading ? "Loading..." : "No admins found"}
                     </TableCell>
                   </TableRow>
                 ) : (
-                  filteredAdmins.map((acc) => (
+                  admin.map((acc) => (
                     <TableRow
                       key={acc.id}
                       className="text-center text-gray-600"
@@ -228,6 +234,13 @@ function ManageUsers() {
               </TableBody>
             </Table>
           </div>
+          {hasMore && (
+            <div className="flex justify-center mt-4">
+              <Button variant="outline" onClick={loadMore} disabled={loading}>
+                {loading ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
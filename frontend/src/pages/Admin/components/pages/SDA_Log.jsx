@@ -1,7 +1,9 @@
-import { useEffect, useState } from "react";
+import { useEffect } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
+import { Button } from "@/components/ui/button";
 import { ScrollArea } from "@/components/ui/scroll-area";
+import { useCursorPages } from "@/lib/useCursorPages";
 
 import {
   Plus,
@@ -12,42 +14,56 @@ import {
   Building2,
   AlertCircle,
 } from "lucide-react";
+import { API_BASE_URL } from "@/constants";
 
-function SDA_Log() {
-  // initialize as empty array to avoid crashes before fetch completes
-  const [activities, setActivities] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchActivities = async () => {
-      setLoading(true);
-      setError(null);
+const PAGE_SIZE = 50;
 
-      try {
-        const res = await fetch("http://127.0.0.1:5000/api/sdaowner/activities");
+function SDA_Log() {
+  // the feed is paginated (newest first); older pages load on demand
+  const {
+    items: activities,
+    setItems: setActivities,
+    hasMore,
+    loading,
+    error,
+    loadMore,
+    reload,
+  } = useCursorPages(async (cursor) => {
+    const url = new URL(`${API_BASE_URL}/api/sdaowner/activities`);
+    url.searchParams.set("limit", String(PAGE_SIZE));
+    if (cursor) url.searchParams.set("cursor", cursor);
 
-        // helpful debugging: if unauthorized, throw with message
-        if (!res.ok) {
-          const text = await res.text().catch(() => "");
-          throw new Error(`Fetch failed (${res.status}): ${text || res.statusText}`);
-        }
+    const res = await fetch(url, { credentials: "include" });
 
-        const data = await res.json();
+    // helpful debugging: if unauthorized, throw with message
+    if (!res.ok) {
+      const text = await res.text().catch(() => "");
+      throw new Error(`Fetch failed (${res.status}): ${text || res.statusText}`);
+    }
 
-        // the backend returns an array payload — ensure we set an array
-        setActivities(Array.isArray(data) ? data : data.activities || []);
-      } catch (err) {
-        console.error("Error fetching activities:", err);
-        setError(err.message || "Unknown error");
-      } finally {
-        setLoading(false);
-      }
+    const data = await res.json();
+    return {
+      items: Array.isArray(data) ? data : data.activities || [],
+      nextCursor: data.nextCursor,
     };
-
-    fetchActivities();
   }, []);
 
+  useEffect(() => {
+    // new activity is pushed over SSE instead of re-downloading the feed
+    const events = new EventSource(`${API_BASE_URL}/api/admin/events`);
+    events.addEventListener("activity", (e) => {
+      const data = JSON.parse(e.data);
+      setActivities((prev) => [
+        { ...data, id: e.lastEventId, ownerName: data.ownerName || `Owner #${data.ownerId}` },
+        ...prev,
+      ]);
+    });
+    // the server could not resume from our last event: reload the first page
+    events.addEventListener("reset", () => reload());
+
+    return () => events.close();
+  }, [setActivities, reload]);
+
   // --- NEW: sort activities newest-first before grouping ---
   const sortedActivities = (activities || []).slice().sort((a, b) => {
     const ta = a?.timestamp ? new Date(a.timestamp).getTime() : 0;
@@ -156,13 +172,14 @@ function SDA_Log() {
           <div className="flex items-center justify-between">
             <CardTitle className="text-gray-900">Activity History</CardTitle>
             <Badge variant="outline" className="text-xs">
-              {(activities || []).length} {(activities || []).length === 1 ? "activity" : "activities"}
+              {(activities || []).length}
+              {hasMore ? "+" : ""} {(activities || []).length === 1 && !hasMore ? "activity" : "activities"}
             </Badge>
           </div>
         </CardHeader>
 
         <CardContent>
-          {loading ? (
+          {loading && (activities || []).length === 0 ? (
             <div className="p-6">Loading activities…</div>
           ) : error ? (
             <div className="p-6 text-sm text-rose-600">Error: {error}</div>
@@ -248,6 +265,13 @@ function SDA_Log() {
                   </div>
                 ))}
               </div>
+              {hasMore && (
+                <div className="flex justify-center pb-6">
+                  <Button variant="outline" onClick={loadMore} disabled={loading}>
+                    {loading ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </ScrollArea>
           )}
         </CardContent>
@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
+import { API_BASE_URL } from "@/constants";
 
-const API_URL = "http://localhost:5000/api/accommodations";
+const API_URL = `${API_BASE_URL}/api/accommodations`;
 
 export default function CheckAccommodationForm() {
   const [allVacant, setAllVacant] = useState([]); // only Vacant from backend
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState } from "react";
 import { useNavigate } from "react-router-dom";
 
 import { Button } from "@/components/ui/button";
@@ -10,137 +10,138 @@ import NavBar from "../components/NavigationBar";
 import FilterPanel from "../components/FilterPanel";
 
 import Footer from "../components/Footer";
+import { useCursorPages } from "@/lib/useCursorPages";
+import { API_BASE_URL } from "@/constants";
+
+const PAGE_SIZE = 24;
+
+const EMPTY_FILTERS = {
+  propertyType: "all",
+  rooms: "",
+  bathrooms: "",
+  suburb: "",
+  availability: "all",
+};
+
+// FilterPanel state -> /api/public/accommodations query params
+function listingParams(filters) {
+  const params = {};
+  const isSet = (v) => v && v !== "all";
+  if (isSet(filters.propertyType)) params.accommodation_type = filters.propertyType;
+  if (isSet(filters.rooms)) params.bedrooms = filters.rooms;
+  if (isSet(filters.bathrooms)) params.bathrooms = filters.bathrooms;
+  if (filters.suburb.trim()) params.location = filters.suburb.trim();
+  if (isSet(filters.availability)) params.available = String(filters.availability === "available");
+  return params;
+}
+
+function toProperty(a) {
+  const imagesArray = a.images || [];
+
+  // Normalize + remove empty values
+  const validImages = imagesArray
+    .map((img) =>
+      typeof img === "string" ? img : img?.url || img?.path || null
+    )
+    .filter(Boolean); // removes "", null, undefined
+
+  const status = (a.status || "").toLowerCase();
+  const isAvailable =
+    a.available !== undefined
+      ? a.available
+      : status === "available" || status === "vacant";
+
+  return {
+    id: a.id,
+    title: a.title,
+    location: a.location,
+    capacity: a.capacity,
+    gender: a.gender,
+    images: validImages,
+    description: a.description,
+    features: a.features || [],
+    propertyType:
+      a.propertyType ||
+      a.accommodationType ||
+      a.accommodation_type ||
+      "House",
+    amenities: a.amenities || [],
+    bedrooms: a.bedrooms,
+    bathrooms: a.bathrooms,
+    available: isAvailable,
+    status: a.status,
+  };
+}
 
 function Properties() {
   const [viewMode, setViewMode] = useState("grid");
   const [openFilter, setOpenFilter] = useState(false);
 
-  // all properties from backend
-  const [allProperties, setAllProperties] = useState([]);
-  const [filteredProperties, setFilteredProperties] = useState([]);
+  // filter state (as edited in the panel / as last applied)
+  const [filters, setFilters] = useState(EMPTY_FILTERS);
+  const [appliedFilters, setAppliedFilters] = useState(EMPTY_FILTERS);
 
-  // filter state
-  const [filters, setFilters] = useState({
-    propertyType: "all",
-    rooms: "",
-    bathrooms: "",
-    suburb: "",
-    availability: "all",
-  });
+  // keyword search (ranked full-text search endpoint); empty = browse listings
+  const [searchInput, setSearchInput] = useState("");
+  const [searchQuery, setSearchQuery] = useState("");
 
   const navigate = useNavigate();
 
-  // Fetch ALL accommodations from backend on mount
-  useEffect(() => {
-    const fetchProperties = async () => {
-      try {
-        const res = await fetch(
-          "http://127.0.0.1:5000/api/public/accommodations"
-        );
-        const data = await res.json();
-
-        const accommodations = data.accommodations || [];
-
-        const mapped = accommodations.map((a) => {
-          const imagesArray = a.images || [];
-
-          // Normalize + remove empty values
-          const validImages = imagesArray
-            .map((img) =>
-              typeof img === "string" ? img : img?.url || img?.path || null
-            )
-            .filter(Boolean); // removes "", null, undefined
-
-          const status = (a.status || "").toLowerCase();
-          const isAvailable =
-            a.available !== undefined
-              ? a.available
-              : status === "available" || status === "vacant";
-
-          return {
-            id: a.id,
-            title: a.title,
-            location: a.location,
-            capacity: a.capacity,
-            gender: a.gender,
-            images: validImages,
-            description: a.description,
-            features: a.features || [],
-            propertyType:
-              a.propertyType ||
-              a.accommodationType ||
-              a.accommodation_type ||
-              "House",
-            amenities: a.amenities || [],
-            bedrooms: a.bedrooms,
-            bathrooms: a.bathrooms,
-            available: isAvailable,
-            status: a.status,
-          };
-        });
-
-        setAllProperties(mapped);
-        setFilteredProperties(mapped);
-      } catch (error) {
-        console.error("Error fetching accommodations:", error);
+  // One page at a time: filters and search run on the server
+  const {
+    items: properties,
+    hasMore,
+    loading,
+    loadMore,
+  } = useCursorPages(
+    async (cursor) => {
+      let url;
+      if (searchQuery) {
+        url = new URL(`${API_BASE_URL}/api/public/accommodations/search`);
+        url.searchParams.set("q", searchQuery);
+        if (cursor) url.searchParams.set("page", cursor);
+      } else {
+        url = new URL(`${API_BASE_URL}/api/public/accommodations`);
+        const params = listingParams(appliedFilters);
+        Object.entries(params).forEach(([k, v]) => url.searchParams.set(k, v));
+        if (cursor) url.searchParams.set("cursor", cursor);
       }
-    };
-
-    fetchProperties();
-  }, []);
+      url.searchParams.set("limit", String(PAGE_SIZE));
+
+      // an owner who just edited a listing reads it back from the primary
+      const res = await fetch(url, { credentials: "include" });
+      if (!res.ok) throw new Error(`Fetch failed (${res.status})`);
+      const data = await res.json();
+
+      return {
+        items: (data.accommodations || []).map(toProperty),
+        nextCursor: searchQuery ? data.nextPage : data.nextCursor,
+      };
+    },
+    [appliedFilters, searchQuery]
+  );
 
   const handleFilterChange = (name, value) => {
     setFilters((prev) => ({ ...prev, [name]: value }));
   };
 
   const handleApplyFilters = () => {
-    const filtered = allProperties.filter((p) => {
-      const matchType =
-        filters.propertyType === "all" ||
-        p.propertyType.toLowerCase() === filters.propertyType.toLowerCase();
-
-      const matchRooms =
-        !filters.rooms || p.bedrooms === parseInt(filters.rooms, 10);
-
-      const matchBathrooms =
-        !filters.bathrooms || p.bathrooms === parseInt(filters.bathrooms, 10);
-
-      const matchSuburb =
-        !filters.suburb ||
-        p.location.toLowerCase().includes(filters.suburb.toLowerCase());
-
-      const matchAvailability =
-        filters.availability === "all" ||
-        (filters.availability === "available" && p.available) ||
-        (filters.availability === "unavailable" && !p.available);
-
-      return (
-        matchType &&
-        matchRooms &&
-        matchBathrooms &&
-        matchSuburb &&
-        matchAvailability
-      );
-    });
-
-    setFilteredProperties(filtered);
+    setAppliedFilters(filters);
+    setSearchQuery("");
+    setSearchInput("");
     setOpenFilter(false);
   };
 
   const handleResetFilters = () => {
-    setFilters({
-      propertyType: "all",
-      rooms: "",
-      bathrooms: "",
-      suburb: "",
-      availability: "all",
-    });
-    setFilteredProperties(allProperties);
+    setFilters(EMPTY_FILTERS);
+    setAppliedFilters(EMPTY_FILTERS);
+    setSearchQuery("");
+    setSearchInput("");
   };
 
+  // search results are ranked by text only; the panel filters apply to browsing
   const handleSearch = () => {
-    // optional: you can hook this into filters or a separate keyword state
-    console.log("search clicked");
+    setSearchQuery(searchInput.trim());
   };
 
   const slugify = (title) =>
@@ -176,6 +177,9 @@ function Properties() {
                 type="text"
                 placeholder="Search title, location, or type"
                 className="border-none focus-visible:ring-0 text-gray-700"
+                value={searchInput}
+                onChange={(e) => setSearchInput(e.target.value)}
+                onKeyDown={(e) => e.key === "Enter" && handleSearch()}
               />
               <Button
                 onClick={handleSearch}
@@ -233,21 +237,39 @@ function Properties() {
           </div>
 
           {/* Properties Grid/List */}
-          {filteredProperties.length > 0 ? (
-            <div
-              className={
-                viewMode === "grid"
-                  ? "grid md:grid-cols-2 xl:grid-cols-3 gap-6"
-                  : "space-y-4"
-              }
-            >
-              {filteredProperties.map((property) => (
-                <PropertyCard
-                  key={property.id}
-                  property={property}
-                  onClick={() => handlePropertySelect(property)}
-                />
-              ))}
+          {properties.length > 0 ? (
+            <>
+              <div
+                className={
+                  viewMode === "grid"
+                    ? "grid md:grid-cols-2 xl:grid-cols-3 gap-6"
+                    : "space-y-4"
+                }
+              >
+                {properties.map((property) => (
+                  <PropertyCard
+                    key={property.id}
+                    property={property}
+                    onClick={() => handlePropertySelect(property)}
+                  />
+                ))}
+              </div>
+              {hasMore && (
+                <div className="flex justify-center mt-8">
+                  <Button
+                    variant="outline"
+                    onClick={loadMore}
+                    disabled={loading}
+                    className="rounded-full border-[#D2138C] text-[#D2138C] hover:bg-pink-50"
+                  >
+                    {loading ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
+            </>
+          ) : loading ? (
+            <div className="bg-white rounded-2xl p-12 text-center text-gray-600">
+              Loading properties...
             </div>
           ) : (
             <div className="bg-white rounded-2xl p-12 text-center">
@@ -11,6 +11,7 @@ import { Label } from "@/components/ui/label";
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import logo from "@/assets/White logo.svg";
+import { API_BASE_URL } from "@/constants";
 
 function ForgotPassword() {
   const [email, setEmail] = useState("");
@@ -25,7 +26,7 @@ function ForgotPassword() {
     setMessage("");
 
     try {
-      const res = await fetch("http://127.0.0.1:5000/api/auth/forgot-password", {
+      const res = await fetch(`${API_BASE_URL}/api/auth/forgot-password`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ email }),
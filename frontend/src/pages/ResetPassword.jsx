@@ -5,6 +5,7 @@ import { Label } from "@/components/ui/label";
 import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import logo from "@/assets/logo.png";
+import { API_BASE_URL } from "@/constants";
 
 function ResetPassword() {
     const { token } = useParams();
@@ -27,7 +28,7 @@ function ResetPassword() {
 
         setLoading(true);
         try {
-            const res = await fetch("http//127.0.0.1:5000/api/auth/reset-password", {
+            const res = await fetch(`${API_BASE_URL}/api/auth/reset-password`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ token, password }),
@@ -14,6 +14,7 @@ import { Label } from "@/components/ui/label";
 import { Button } from "@/components/ui/button";
 import Logo from "@/assets/logo.png";
 import NavBar from "../Client/components/Navigationbar";
+import { API_BASE_URL } from "@/constants";
 
 function SdaRegister() {
   const navigate = useNavigate();
@@ -56,7 +57,7 @@ function SdaRegister() {
       };
 
       // ✅ use Flask backend URL (port 5000)
-      const res = await fetch("http://127.0.0.1:5000/api/admin/add_user", {
+      const res = await fetch(`${API_BASE_URL}/api/admin/add_user`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload),
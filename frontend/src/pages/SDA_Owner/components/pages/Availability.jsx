@@ -19,6 +19,7 @@ import {
   DoorOpen,
   DoorClosed,
 } from "lucide-react";
+import { API_BASE_URL } from "@/constants";
 
 function Availability() {
   const [accommodations, setAccommodations] = useState([]);
@@ -33,9 +34,10 @@ function Availability() {
       }
 
       const res = await fetch(
-        "http://localhost:5000/api/sdaowner/get_accommodations",
+        `${API_BASE_URL}/api/sdaowner/get_accommodations`,
         {
           method: "GET",
+          credentials: "include", // carries the read-your-writes cookie
           headers: {
             Authorization: `Bearer ${token}`,
             "Content-Type": "application/json",
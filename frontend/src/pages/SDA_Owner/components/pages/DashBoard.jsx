@@ -19,6 +19,7 @@ import {
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Progress } from "@/components/ui/progress";
+import { API_BASE_URL } from "@/constants";
 
 function OwnerDashboard({ onAddAccommodation, onGoToAccommodations }) {
   const [accommodations, setAccommodations] = useState([]);
@@ -40,8 +41,9 @@ function OwnerDashboard({ onAddAccommodation, onGoToAccommodations }) {
         return;
       }
 
-      const res = await fetch("http://127.0.0.1:5000/api/sdaowner/activities?limit=4", {
+      const res = await fetch(`${API_BASE_URL}/api/sda_owner/activities?limit=4`, {
         method: "GET",
+        credentials: "include", // carries the read-your-writes cookie
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${accessToken}`,
@@ -83,9 +85,10 @@ function OwnerDashboard({ onAddAccommodation, onGoToAccommodations }) {
       }
 
       const response = await fetch(
-        "http://127.0.0.1:5000/api/sdaowner/get_accommodations",
+        `${API_BASE_URL}/api/sdaowner/get_accommodations`,
         {
           method: "GET",
+          credentials: "include", // carries the read-your-writes cookie
           headers: {
             "Content-Type": "application/json",
             Authorization: `Bearer ${accessToken}`,
@@ -114,13 +117,70 @@ function OwnerDashboard({ onAddAccommodation, onGoToAccommodations }) {
   useEffect(() => {
     fetchAccommodations();
     fetchActivities();
-    
-    // poll for new activities every 10 seconds (adjust to taste)
-    const interval = setInterval(() => {
-      fetchActivities();
-    }, 10000);
 
-    return () => clearInterval(interval);
+    // new activity and listing changes are pushed over SSE instead of polled
+    let events = null;
+    let retryTimer = null;
+    let lastEventId = null;
+    let closed = false;
+
+    const connect = async () => {
+      const accessToken =
+        localStorage.getItem("accessToken") ||
+        sessionStorage.getItem("accessToken");
+      if (!accessToken || closed) return;
+
+      try {
+        // EventSource can't send headers: trade the access token for a
+        // short-lived stream token rather than putting it in the URL
+        const res = await fetch(`${API_BASE_URL}/api/sda_owner/events/token`, {
+          method: "POST",
+          headers: { Authorization: `Bearer ${accessToken}` },
+        });
+        if (!res.ok) throw new Error(`Failed to open event stream: ${res.status}`);
+        const { token } = await res.json();
+        if (closed) return;
+
+        const url = new URL(`${API_BASE_URL}/api/sda_owner/events`);
+        url.searchParams.set("token", token);
+        if (lastEventId) url.searchParams.set("lastEventId", lastEventId);
+        events = new EventSource(url);
+      } catch (err) {
+        console.error("event stream error:", err);
+        retryTimer = setTimeout(connect, 10000);
+        return;
+      }
+
+      events.addEventListener("activity", (e) => {
+        lastEventId = e.lastEventId;
+        const data = JSON.parse(e.data);
+        setActivities((prev) => [{ ...data, id: e.lastEventId }, ...prev].slice(0, 4));
+      });
+      events.addEventListener("listing", (e) => {
+        lastEventId = e.lastEventId;
+        fetchAccommodations();
+      });
+      // the server could not resume from our last event: reload once
+      events.addEventListener("reset", () => {
+        fetchActivities();
+        fetchAccommodations();
+      });
+      // the browser retries a dropped stream with the same URL; once the
+      // stream token has expired that fails for good, so fetch a fresh one
+      events.onerror = () => {
+        if (events.readyState === EventSource.CLOSED && !closed) {
+          retryTimer = setTimeout(connect, 3000);
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (events) events.close();
+    };
   }, []);
 
   // helper to parse date fallback
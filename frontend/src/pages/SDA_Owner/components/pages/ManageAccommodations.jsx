@@ -16,6 +16,7 @@ import { Badge } from "@/components/ui/badge";
 import AccommodationModal from "@/components/modal/AccommodationModal";
 import DeleteConfirmDialog from "@/components/modal/DeleteConfirmDialog";
 import ViewAccommodationModal from "@/components/modal/ViewAccommodationModal";
+import { API_BASE_URL } from "@/constants";
 
 function ManageAccommodations({ openAddFromDashboard, onAddHandled }) {
   const [accommodations, setAccommodations] = useState([]);
@@ -37,9 +38,10 @@ function ManageAccommodations({ openAddFromDashboard, onAddHandled }) {
       }
 
       const res = await fetch(
-        "http://localhost:5000/api/sdaowner/get_accommodations",
+        `${API_BASE_URL}/api/sdaowner/get_accommodations`,
         {
           method: "GET",
+          credentials: "include", // carries the read-your-writes cookie
           headers: {
             Authorization: `Bearer ${token}`,
             "Content-Type": "application/json",
@@ -122,9 +124,10 @@ function ManageAccommodations({ openAddFromDashboard, onAddHandled }) {
       }
 
       const res = await fetch(
-        `http://localhost:5000/api/sdaowner/delete_accommodation/${selectedId}`,
+        `${API_BASE_URL}/api/sdaowner/delete_accommodation/${selectedId}`,
         {
           method: "DELETE",
+          credentials: "include", // carries the read-your-writes cookie
           headers: {
             Authorization: `Bearer ${token}`,
             "Content-Type": "application/json",